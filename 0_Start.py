@@ -1,7 +1,7 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 from src.config import MARKET_INDICES
+from src.market_pulse import get_market_pulse
 
 st.set_page_config(page_title="Smart Portfolio Studio", layout="wide", page_icon="📈")
 
@@ -11,29 +11,35 @@ st.markdown("### Centrum dowodzenia Twoimi finansami")
 # --- SZYBKI PODGLĄD RYNKU ---
 st.markdown("---")
 st.markdown("#### 🌍 Puls Rynku (Na żywo)")
-col1, col2, col3, col4 = st.columns(4)
 
 
-def get_market_change(ticker):
+def get_market_change(ticker, snapshot):
     try:
-        data = yf.Ticker(ticker).fast_info
-        change = ((data.last_price - data.previous_close) / data.previous_close) * 100
-        return data.last_price, change
+        data = snapshot[ticker]
+        return data["price"], data["change"]
     except:
         return 0.0, 0.0
 
 
-cols = [col1, col2, col3, col4]
-for (name, ticker), col in zip(MARKET_INDICES.items(), cols):
-    price, change = get_market_change(ticker)
+# Migawka odświeżana w tle - wejście na stronę tylko czyta ją z pamięci
+market_snapshot, market_updated = get_market_pulse().get()
+if market_updated:
+    st.caption(f"Ostatnia aktualizacja: {pd.Timestamp.fromtimestamp(market_updated):%H:%M:%S}")
 
-    with col:
-        with st.container(border=True):
-            st.metric(
-                label=name,
-                value=f"{price:,.2f}",
-                delta=f"{change:+.2f}%"
-            )
+# Dowolna liczba indeksów - po 4 kafelki w wierszu
+items = list(MARKET_INDICES.items())
+for row in range(0, len(items), 4):
+    cols = st.columns(4)
+    for (name, ticker), col in zip(items[row:row + 4], cols):
+        price, change = get_market_change(ticker, market_snapshot)
+
+        with col:
+            with st.container(border=True):
+                st.metric(
+                    label=name,
+                    value=f"{price:,.2f}",
+                    delta=f"{change:+.2f}%"
+                )
 
 st.markdown("---")
 
@@ -51,6 +57,9 @@ with c1:
         * 🔗 **Korelacje:** Mapa powiązań między Twoimi aktywami.
         * 🕹️ **Symulator:** Testowanie strategii na danych historycznych.
         * 🧠 **Optymalizator:** Algorytm Markowitza do budowy idealnego portfela.
+        * 🔎 **Skaner:** Ranking całej listy spółek wg sygnałów technicznych i fundamentów.
+        * 🧪 **Strategie:** Przeszukiwanie parametrów strategii technicznych (backtest z kosztami).
+        * 🧺 **Koszyki:** Backtest koszyków ETF z okresowym rebalansowaniem (w PLN, z kosztami).
         """)
 
 with c2:
@@ -0,0 +1,70 @@
+"""
+Porównanie wydajności: wskaźniki liczone pętlą po tickerach (StockAnalyzer)
+kontra tryb panelowy (PanelAnalyzer) na syntetycznym uniwersum.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.panel_indicators --tickers 300 --days 2520
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer import PanelAnalyzer, StockAnalyzer
+
+
+def synthetic_close(n_tickers, n_days, seed=0):
+    """Losowe błądzenie cen (daty x tickery)."""
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_days, n_tickers)), axis=0))
+    dates = pd.bdate_range("2015-01-01", periods=n_days)
+    return pd.DataFrame(prices, index=dates, columns=[f"T{i:04d}" for i in range(n_tickers)])
+
+
+def per_ticker_loop(close):
+    """Dotychczasowy sposób - osobny DataFrame i StockAnalyzer dla każdego tickera."""
+    result = {}
+    for t in close.columns:
+        analyzer = StockAnalyzer(close[[t]].rename(columns={t: "Close"}))
+        analyzer.calculate_returns()
+        analyzer.calculate_volatility()
+        analyzer.calculate_ema(short_window=12, long_window=26)
+        analyzer.calculate_macd()
+        analyzer.calculate_rsi()
+        result[t] = (analyzer.df, analyzer.get_risk_metrics())
+    return result
+
+
+def panel(close):
+    return PanelAnalyzer(close).compute()
+
+
+def timeit(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    close = synthetic_close(args.tickers, args.days)
+    loop_time = timeit(per_ticker_loop, close, repeat=args.repeat)
+    panel_time = timeit(panel, close, repeat=args.repeat)
+
+    print(f"Uniwersum: {args.tickers} tickerów x {args.days} sesji")
+    print(f"Pętla StockAnalyzer: {loop_time * 1000:8.1f} ms")
+    print(f"PanelAnalyzer:       {panel_time * 1000:8.1f} ms")
+    print(f"Przyspieszenie:      {loop_time / panel_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
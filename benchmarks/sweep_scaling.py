@@ -0,0 +1,55 @@
+"""
+Skalowanie przeszukiwania siatki parametrów (ParameterSweep) z liczbą procesów roboczych
+na syntetycznej historii cen. Czas obejmuje start puli procesów i pamięci współdzielonej.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.sweep_scaling --days 2520 --workers 1,2,4 --strategy EMA
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.sweep import ParameterSweep, SWEEP_STRATEGIES
+
+
+def synthetic_prices(n_days, seed=0):
+    """Losowe błądzenie ceny zamknięcia jednego tickera."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.012, n_days)))
+    return pd.DataFrame({"Close": close}, index=pd.bdate_range("2010-01-01", periods=n_days))
+
+
+def timeit(fn, repeat=1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--workers", default=",".join(str(w) for w in (1, 2, 4) if w <= (os.cpu_count() or 1)))
+    parser.add_argument("--strategy", default="EMA", choices=list(SWEEP_STRATEGIES))
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    data = synthetic_prices(args.days)
+    workers = [int(w) for w in args.workers.split(",")]
+    combos = len(ParameterSweep(data, strategy=args.strategy))
+
+    print(f"Strategia {args.strategy}: {combos} kombinacji x {args.days} sesji (CPU: {os.cpu_count()})")
+    base = None
+    for w in workers:
+        elapsed = timeit(lambda: ParameterSweep(data, strategy=args.strategy, max_workers=w).run(), args.repeat)
+        base = base or elapsed
+        print(f"Procesy: {w:2d}  {elapsed:8.2f} s  {combos / elapsed:8.1f} komb./s  przyspieszenie: {base / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.express as px
+from src.config import PRETTY_NAMES, BASKET_1_STRATEGY, BASKET_2_STRATEGY
+from src.data import StockData
+from src.instruments import get_instrument_index
+from src.basket import BasketBacktester, REBALANCE_FREQUENCIES, convert_matrix
+
+st.set_page_config(page_title="Backtest Koszyków", layout="wide")
+st.title("🧺 Backtest Koszyków z Rebalansowaniem")
+st.markdown("Jak zachowałby się koszyk ETF-ów przy okresowym przywracaniu wag docelowych (wartości w PLN, z kosztami).")
+
+BASKETS = {
+    "Koszyk 1 (Globalny)": BASKET_1_STRATEGY,
+    "Koszyk 2 (Polska + EM)": BASKET_2_STRATEGY,
+}
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_prices_pln(tickers, period):
+    """Macierz cen składników przeliczona na PLN kursem z dnia każdej sesji."""
+    matrix = StockData().get_price_matrix(tickers, period=period)
+    if matrix.empty:
+        return matrix
+    currencies = get_instrument_index().currencies(list(matrix.tickers))
+    return convert_matrix(matrix, currencies, "PLN")
+
+
+# --- OPCJE ---
+st.sidebar.header("⚙️ Ustawienia")
+basket_name = st.sidebar.selectbox("Koszyk", options=list(BASKETS))
+period = st.sidebar.selectbox("Okres danych", options=["5y", "10y", "max"], index=1)
+frequency = st.sidebar.selectbox("Rebalansowanie", options=list(REBALANCE_FREQUENCIES), index=2)
+threshold_pct = st.sidebar.number_input("Próg odchylenia wagi (pp, 0 = wyłączony):", min_value=0.0, max_value=50.0,
+                                        value=0.0, step=1.0)
+capital = st.sidebar.number_input("Kapitał początkowy (PLN):", min_value=100.0, value=10000.0, step=1000.0)
+commission_pct = st.sidebar.number_input("Prowizja (%):", min_value=0.0, max_value=5.0, value=0.1, step=0.05)
+slippage_pct = st.sidebar.number_input("Poślizg cenowy (%):", min_value=0.0, max_value=5.0, value=0.05, step=0.05)
+
+weights = BASKETS[basket_name]
+with st.spinner("Pobieranie notowań składników..."):
+    prices = load_prices_pln(tuple(sorted(weights)), period)
+
+if prices.empty:
+    st.warning("Brak danych dla składników koszyka.")
+    st.stop()
+
+missing = [t for t in weights if t not in prices.tickers]
+if missing:
+    st.warning(f"Brak notowań: {', '.join(missing)} - wagi pozostałych składników zostały przeskalowane.")
+
+costs = {"initial_capital": capital, "commission": commission_pct / 100, "slippage": slippage_pct / 100}
+result = BasketBacktester(prices, weights, frequency=REBALANCE_FREQUENCIES[frequency],
+                          threshold=threshold_pct / 100 or None, **costs).run()
+# Punkt odniesienia: ten sam koszyk kupiony raz, bez rebalansowania
+passive = BasketBacktester(prices, weights, frequency=None, **costs).run()
+if result is None:
+    st.warning("Za mało wspólnych notowań składników.")
+    st.stop()
+
+# --- WYNIKI ---
+m, p = result["metrics"], passive["metrics"]
+k1, k2, k3, k4, k5 = st.columns(5)
+k1.metric("Wartość końcowa", f"{m['final_value']:,.0f} PLN", f"{m['total_return']:.2f}%")
+k2.metric("CAGR", f"{m['cagr']:.2f}%", f"{m['cagr'] - p['cagr']:.2f} pp vs bez rebalansu")
+k3.metric("Sharpe", f"{m['sharpe_ratio']:.2f}", f"{m['sharpe_ratio'] - p['sharpe_ratio']:.2f}")
+k4.metric("Max Drawdown", f"{m['max_drawdown']:.2f}%")
+k5.metric("Rebalansowania", m["rebalances"], f"koszty: {m['fees']:,.0f} PLN", delta_color="off")
+
+fig = go.Figure()
+fig.add_trace(go.Scatter(x=result["equity"].index, y=result["equity"], name=f"Rebalansowanie: {frequency}"))
+fig.add_trace(go.Scatter(x=passive["equity"].index, y=passive["equity"], name="Bez rebalansowania",
+                         line=dict(dash="dot")))
+fig.update_layout(title="Wartość koszyka (PLN)", height=450, hovermode="x unified")
+st.plotly_chart(fig, use_container_width=True)
+
+weights_path = result["weights"].rename(columns=lambda t: PRETTY_NAMES.get(t, t))
+fig_w = px.area(weights_path * 100, labels={"value": "Waga (%)", "index": "Data", "variable": "Składnik"})
+fig_w.update_layout(title="Wagi składników w czasie", height=350)
+st.plotly_chart(fig_w, use_container_width=True)
+
+with st.expander("📋 Lista rebalansowań"):
+    st.dataframe(result["rebalances"].round(2), use_container_width=True)
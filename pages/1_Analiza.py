@@ -2,13 +2,19 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import yfinance as yf
 
 # Import wlasnych modolow zapisanych w innych plikach
 from src.data import StockData
-from src.analyzer import StockAnalyzer
+from src.analyzer import multi_timeframe, score_history, score_reasons, verdict
+from src.analytics_cache import get_analytics_cache
+from src.risk import rolling_risk, INTERVAL_RISK_WINDOWS
+from src.fundamentals import radar_scores, peer_comparison
+from src.screener import load_universe
 from src.database import WatchlistDB
-from src.backtester import SimpleBacktester
+from src.backtester import SignalBacktester, STRATEGIES
+from src.backtest_store import get_backtest_store
+from src.metadata import get_metadata_cache
+from src.price_store import get_price_store
 
 # Setup glownej strony
 st.set_page_config(page_title="Analiza Akcji", layout="wide")
@@ -18,7 +24,12 @@ st.title("📊 Smart Portfolio Studio - Analiza Akcji")
 st.sidebar.header("⚙️ Opcje użytkownika")
 
 if st.sidebar.button("Odśwież dane", help="Wymusza pobranie nowych danych z Yahoo Finance."):
+    # Magazyn notowań i metadanych serwuje świeże wpisy bez pytania API - oznaczamy je jako nieaktualne
+    get_price_store().invalidate()
+    get_metadata_cache().invalidate()
+    get_analytics_cache().clear()
     st.cache_data.clear()
+    StockData.clear_price_matrix()
     st.rerun()
 
 period = st.sidebar.selectbox("Wybierz okres analizy", options=["1mo", "3mo", "6mo", "1y", "2y", "5y", "10y"], index=2)
@@ -36,6 +47,10 @@ if source_option == "⭐ Moje Ulubione":
 else:
     current_list = ["AAPL", "NVDA", "MSFT", "TSLA", "BTC-USD", "ETH-USD", "CDPROJEKT.WA", "KGH.WA", "DNP.WA"]
 
+# Rozgrzewamy w tle cache metadanych dla całej listy - przełączanie spółek nie czeka na API
+# (spółki z stocks_list.csv służą też jako konkurencja przy porównaniu z sektorem)
+get_metadata_cache().prefetch(current_list + load_universe()["ticker"].tolist())
+
 selected_ticker_from_list = st.sidebar.selectbox("Wybierz spółkę:", options=current_list, index=0)
 custom_ticker = st.sidebar.text_input("Lub wpisz symbol ręcznie:", placeholder="np. PLTR, XTB.WA").upper().strip()
 ticker = custom_ticker if custom_ticker else selected_ticker_from_list
@@ -121,17 +136,19 @@ if df.empty:
     st.warning("Brak danych dla wybranej spółki.")
     st.stop()
 
-# Analiza techniczna
-analyzer = StockAnalyzer(df)
-analyzer.calculate_returns()
-analyzer.calculate_volatility()
-analyzer.calculate_ema(short_window=12, long_window=26)
-analyzer.calculate_macd()
-analyzer.calculate_rsi()
+# Analiza techniczna - wynik z cache, jeśli dane i parametry się nie zmieniły (np. przy zmianie kwoty w symulatorze)
+analytics_cache = get_analytics_cache()
+analysis = analytics_cache.analyze(df, rsi_window=14, short_window=12, long_window=26)
+df = analysis["df"]
+cache_stats = analytics_cache.stats()
+st.sidebar.caption(
+    f"Cache analityki: {cache_stats['hits'] + cache_stats['disk_hits']} trafień, "
+    f"{cache_stats['misses']} przeliczeń ({cache_stats['hit_rate']:.0%})"
+)
 
 # 2. STATYSTYKI W KAFELKACH
 st.subheader("📈 Statystyki Techniczne")
-stats = analyzer.basic_stats()
+stats = analysis["stats"]
 
 c1, c2, c3, c4 = st.columns(4)
 with c1:
@@ -142,56 +159,54 @@ with c2:
         st.metric("Mediana ceny", f"{float(stats['mediana ceny']):.2f} {currency}")
 with c3:
     with st.container(border=True):
-        st.metric("RSI (14)", f"{analyzer.rsi.iloc[-1]:.2f}")
+        st.metric("RSI (14)", f"{df['RSI'].iloc[-1]:.2f}")
 with c4:
     with st.container(border=True):
-        st.metric("Zmienność", f"{analyzer.volatility:.4f}")
+        st.metric("Zmienność", f"{analysis['volatility']:.4f}")
+
+# Wskaźniki dla kilku interwałów liczone z jednej historii dziennej (bez ponownego pobierania)
+with st.expander("🕒 Wskaźniki na wielu interwałach"):
+    frames = multi_timeframe(fetcher.get_data(ticker, period=period, interval="1d"))
+    mtf_rows = []
+    for tf, tf_df in frames.items():
+        if tf_df.empty:
+            continue
+        last = tf_df.iloc[-1]
+        mtf_rows.append({
+            "Interwał": tf,
+            "Świece": len(tf_df),
+            "Zamknięcie": last["Close"],
+            "RSI": last["RSI"],
+            "MACD": last["MACD"],
+            "Sygnał": last["MACD_signal"],
+            "Trend (EMA)": "📈 Wzrostowy" if last["EMA_short"] > last["EMA_long"] else "📉 Spadkowy",
+        })
+    st.dataframe(pd.DataFrame(mtf_rows).set_index("Interwał"), use_container_width=True)
+
+# Ryzyko w czasie - kroczący Sharpe i VaR dla kilku okien naraz
+with st.expander("📉 Ryzyko w czasie (Sharpe, VaR)"):
+    # Okna i annualizacja w świecach wybranego interwału (kwartał, pół roku, rok)
+    bars_per_year, risk_windows = INTERVAL_RISK_WINDOWS[interval]
+    rolling = rolling_risk(df["Returns"], windows=risk_windows, periods_per_year=bars_per_year)
+    var_horizon = {"1d": "dzienny", "1wk": "tygodniowy", "1mo": "miesięczny"}[interval]
+    fig_risk = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                             subplot_titles=("Sharpe kroczący", f"VaR 95% (historyczny, {var_horizon})"))
+    for window, metrics in rolling.items():
+        label = f"{window * 12 // bars_per_year}M"
+        fig_risk.add_trace(go.Scatter(x=metrics.index, y=metrics["sharpe"], mode="lines", name=f"Sharpe {label}"), row=1, col=1)
+        fig_risk.add_trace(go.Scatter(x=metrics.index, y=metrics["var_hist"] * 100, mode="lines", name=f"VaR {label} (%)"), row=2, col=1)
+    fig_risk.update_layout(height=450, margin=dict(l=20, r=20, t=40, b=20))
+    st.plotly_chart(fig_risk, use_container_width=True, key="rolling_risk")
 
 # --- SEKCJA WERDYKTU AI ---
 st.markdown("---")
 st.subheader("🤖 Werdykt Algorytmu (Analiza Techniczna)")
 
 
-def get_technical_score(df_tech):
-    score = 0
-    reasons = []
-    last_rsi = df_tech['RSI'].iloc[-1]
-    if last_rsi < 30:
-        score += 2; reasons.append(f"🟢 RSI ({last_rsi:.1f}) wskazuje wyprzedanie (okazja?)")
-    elif last_rsi > 70:
-        score -= 2; reasons.append(f"🔴 RSI ({last_rsi:.1f}) wskazuje wykupienie")
-    else:
-        reasons.append(f"⚪ RSI ({last_rsi:.1f}) jest neutralne")
-
-    if 'EMA_long' in df_tech.columns:
-        if df_tech['Close'].iloc[-1] > df_tech['EMA_long'].iloc[-1]:
-            score += 3; reasons.append("🟢 Cena powyżej długoterminowej średniej")
-        else:
-            score -= 3; reasons.append("🔴 Cena poniżej długoterminowej średniej")
-
-    if 'MACD' in df_tech.columns and 'MACD_signal' in df_tech.columns:
-        if df_tech['MACD'].iloc[-1] > df_tech['MACD_signal'].iloc[-1]:
-            score += 2; reasons.append("🟢 MACD przebiło linię sygnału od dołu")
-        elif df_tech['MACD'].iloc[-1] < df_tech['MACD_signal'].iloc[-1]:
-            score -= 2; reasons.append("🔴 MACD poniżej linii sygnału")
-
-    return score, reasons
-
-
 if len(df) > 30:
     with st.container(border=True):
-        total_score, rationale = get_technical_score(df)
-
-        if total_score >= 4:
-            verdict, color = "MOCNE KUPUJ 🚀", "#2E8B57"
-        elif total_score >= 1:
-            verdict, color = "KUPUJ ↗️", "#00CC96"
-        elif total_score > -1:
-            verdict, color = "NEUTRALNIE 😐", "#AB63FA"
-        elif total_score > -4:
-            verdict, color = "SPRZEDAWAJ ↘️", "#FFA15A"
-        else:
-            verdict, color = "MOCNE SPRZEDAWAJ 🔻", "#EF553B"
+        total_score, rationale = score_reasons(df)
+        verdict_label, color = verdict(total_score)
 
         v_col1, v_col2 = st.columns([1, 1])
         with v_col1:
@@ -207,9 +222,19 @@ if len(df) > 30:
             st.plotly_chart(fig_gauge, use_container_width=True, key="gauge_ai")
 
         with v_col2:
-            st.markdown(f"### Decyzja: <span style='color:{color}'>{verdict}</span>", unsafe_allow_html=True)
+            st.markdown(f"### Decyzja: <span style='color:{color}'>{verdict_label}</span>", unsafe_allow_html=True)
             st.write("**Dlaczego taka ocena?**")
             for r in rationale: st.caption(f"{r}")
+
+        # Historia sygnału - wynik dla każdej świecy
+        with st.expander("📜 Historia sygnału"):
+            history = score_history(df)
+            fig_score = go.Figure(go.Bar(
+                x=history.index, y=history["Score"], hovertext=history["Verdict"],
+                marker_color=["#2E8B57" if v > 0 else "#EF553B" if v < 0 else "#AB63FA" for v in history["Score"]]
+            ))
+            fig_score.update_layout(height=250, margin=dict(l=20, r=20, t=20, b=20), yaxis=dict(range=[-7, 7]))
+            st.plotly_chart(fig_score, use_container_width=True, key="score_history")
 else:
     st.warning("⚠️ Za mało danych historycznych, aby algorytm mógł podjąć decyzję.")
 
@@ -221,24 +246,15 @@ try:
     info = ticker_info
     if 'trailingPE' in info or 'totalRevenue' in info:
         pe = info.get('trailingPE', 50) or 50
-        score_value = max(0, min(100, 100 - (pe * 1.5)))
         margin = info.get('profitMargins', 0) or 0
-        score_profit = 90 if margin > 0.2 else max(0, min(100, margin * 100 * 2))
-        roe = info.get('returnOnEquity', 0) or 0
-        score_efficiency = max(0, min(100, roe * 100 * 2))
         debt_eq = info.get('debtToEquity', 100) or 100
-        score_health = max(0, min(100, 100 - (debt_eq / 2)))
-        current_p = info.get('currentPrice', 1)
-        target_p = info.get('targetMeanPrice', current_p)
-        score_growth = max(0, min(100,
-                                  50 + (((target_p - current_p) / current_p) * 100))) if target_p and current_p else 50
+        radar = radar_scores(info)
 
         with st.container(border=True):
             col_radar, col_desc = st.columns([1, 1])
             with col_radar:
-                categories = ['Wycena (Taniość)', 'Zyskowność', 'Efektywność (ROE)', 'Bezpieczeństwo',
-                              'Potencjał Wzrostu']
-                values = [score_value, score_profit, score_efficiency, score_health, score_growth]
+                categories = list(radar)
+                values = list(radar.values())
                 values += [values[0]];
                 categories += [categories[0]]
 
@@ -262,6 +278,16 @@ try:
                 avg_score = sum(values[:-1]) / 5
                 st.markdown("---")
                 st.metric("Ogólna Ocena Fundamentów", f"{avg_score:.0f}/100")
+
+        # Porównanie z konkurencją z sektora - z zapisanych metadanych (bez pobierania .info konkurentów)
+        peers = peer_comparison(ticker)
+        if peers and peers["peers"] > 1:
+            with st.expander(f"🏁 Na tle sektora: {peers['sector']} ({peers['peers']} spółek)"):
+                st.dataframe(pd.DataFrame({
+                    ticker: peers["scores"],
+                    "Mediana sektora": peers["sector_median"],
+                    "Percentyl w sektorze": peers["percentiles"],
+                }).round(1), use_container_width=True)
 except Exception as e:
     pass
 
@@ -375,32 +401,49 @@ with st.container(border=True):
     col_sim1, col_sim2 = st.columns([1, 2])
     with col_sim1:
         investment = st.number_input(f"Kwota inwestycji ({currency}):", min_value=100, value=10000, step=100)
-        run_sim = st.button("Oblicz zysk")
+        strategy_name = st.selectbox("Strategia:", options=list(STRATEGIES))
+        commission_pct = st.number_input("Prowizja (%):", min_value=0.0, max_value=5.0, value=0.1, step=0.05)
+        slippage_pct = st.number_input("Poślizg cenowy (%):", min_value=0.0, max_value=5.0, value=0.05, step=0.05)
+        fractional = st.checkbox("Ułamkowe akcje", value=True)
 
     with col_sim2:
-        if run_sim:
-            if len(df) < 30:
-                st.error("Za mało danych do symulacji.")
-            else:
-                backtester = SimpleBacktester(df, initial_capital=investment)
-                res = backtester.run_strategy()
-                if not res:
-                    start_price, end_price = df["Close"].iloc[0], df["Close"].iloc[-1]
-                    shares = investment / start_price
-                    res = {
-                        "final_value": shares * end_price,
-                        "profit": (shares * end_price) - investment,
-                        "roi": (((shares * end_price) - investment) / investment) * 100,
-                        "shares": shares,
-                        "start_date": df.index[0],
-                        "start_price": start_price
-                    }
-                    st.warning("Brak sygnałów technicznych. Pokazuję wynik strategii 'Kup i Trzymaj'.")
-
-                m1, m2, m3 = st.columns(3)
-                m1.metric("Wartość końcowa", f"{res['final_value']:.2f} {currency}")
-                m2.metric("Zysk/Strata", f"{res['profit']:.2f} {currency}", delta_color="normal")
-                m3.metric("ROI", f"{res['roi']:.2f}%", delta=f"{res['roi']:.2f}%")
+        if len(df) < 30:
+            st.error("Za mało danych do symulacji.")
+        else:
+            sim_params = {"initial_capital": investment, "commission": commission_pct / 100,
+                          "slippage": slippage_pct / 100, "fractional": fractional}
+            backtester = SignalBacktester(df, **sim_params)
+            # Ten sam backtest na tych samych notowaniach wczytywany jest z magazynu wyników
+            res = get_backtest_store().get_or_run(strategy_name, sim_params, ticker, df[["Close"]],
+                                                  lambda: backtester.run_named(strategy_name), interval=interval)
+            metrics, bench = res["metrics"], res["benchmark"]
+
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Wartość końcowa", f"{metrics['final_value']:.2f} {currency}")
+            m2.metric("Zysk/Strata", f"{metrics['profit']:.2f} {currency}", delta_color="normal")
+            m3.metric("ROI", f"{metrics['total_return']:.2f}%",
+                      delta=f"{metrics['total_return'] - bench['total_return']:.2f} pp vs Kup i Trzymaj")
+            m4, m5, m6 = st.columns(3)
+            m4.metric("Sharpe", f"{metrics['sharpe_ratio']:.2f}")
+            m5.metric("Max Drawdown", f"{metrics['max_drawdown']:.1f}%")
+            m6.metric("Transakcje", f"{metrics['trades']} (trafność {metrics['win_rate']:.0f}%)")
+
+            fig_eq = go.Figure()
+            fig_eq.add_trace(go.Scatter(x=res["equity"].index, y=res["equity"], mode="lines", name=strategy_name))
+            fig_eq.add_trace(go.Scatter(x=df.index, y=df["Close"] / df["Close"].iloc[0] * investment, mode="lines",
+                                        name="Kup i Trzymaj", line=dict(dash="dot", color="gray")))
+            fig_eq.update_layout(height=300, margin=dict(l=20, r=20, t=20, b=20), hovermode="x unified")
+            st.plotly_chart(fig_eq, use_container_width=True, key="equity_curve")
+
+            if not res["trades"].empty:
+                with st.expander(f"📒 Lista transakcji ({len(res['trades'])})"):
+                    st.dataframe(res["trades"].round(2), use_container_width=True)
+
+            stored_runs = get_backtest_store().runs(tickers=ticker)
+            if len(stored_runs) > 1:
+                with st.expander(f"🗂️ Zapisane backtesty {ticker} ({len(stored_runs)})"):
+                    st.dataframe(stored_runs.drop(columns=["tickers"]).round(2), use_container_width=True,
+                                 hide_index=True)
 
 # NEWSY
 st.markdown("---")
@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
 import plotly.express as px
 from datetime import datetime, timedelta
 import re
 from io import BytesIO
 from src.database import PortfolioDB
-from src.data import get_exchange_rate, get_historical_price
+from src.data import StockData, get_historical_prices
+from src.providers import get_provider
+from src.instruments import get_instrument_index
+from src.fx import get_fx_rates
 
 st.set_page_config(page_title="Mój Portfel", layout="wide")
 st.title("💼 Mój Portfel Inwestycyjny")
@@ -19,16 +21,9 @@ def get_batch_prices(tickers):
     if not tickers:
         return {}
     try:
-        data = yf.download(tickers, period="2d", progress=False)
-        if data.empty:
-            return {}
-        # Obsługa MultiIndex (nowe yfinance przy wielu tickerach)
-        if isinstance(data.columns, pd.MultiIndex):
-            close_data = data["Close"]
-        else:
-            close_data = data[["Close"]]
+        quotes = get_provider().get_quotes(list(tickers))
         # Zwracamy ostatnią dostępną cenę dla każdego tickera
-        return close_data.ffill().iloc[-1].to_dict()
+        return {t: q["last_price"] for t, q in quotes.items()}
     except Exception as e:
         st.toast(f"⚠️ Błąd pobierania cen zbiorczych: {e}", icon="⚠️")
         return {}
@@ -53,12 +48,9 @@ if mode == "➕ Akcje / ETF / Krypto":
         if st.form_submit_button("Zapisz"):
             final_price = price_input
             if is_pln:
-                if "-USD" in ticker or "USD" in ticker:
-                    rate = get_exchange_rate("USD", "PLN")
-                    final_price = price_input / rate
-                elif "-EUR" in ticker or ticker.endswith(".DE"):
-                    rate = get_exchange_rate("EUR", "PLN")
-                    final_price = price_input / rate
+                # Kurs waluty notowań (dla cen w pensach kurs uwzględnia już dzielnik 100)
+                rate = get_fx_rates("PLN").rate(get_instrument_index().currency(ticker))
+                final_price = price_input / rate
             db.add_position(ticker, qty, final_price)
             st.success("Dodano!")
             st.rerun()
@@ -112,6 +104,11 @@ elif mode == "🏦 Automat ETF":
             count = 0
             total_tickers = len(active_strategy)
             is_historical = buy_date < datetime.now().date()
+            # Notowania całego koszyka jednym zapytaniem, waluty z indeksu instrumentów
+            basket_quotes = {} if is_historical else get_provider().get_quotes(list(active_strategy))
+            basket_instruments = get_instrument_index().resolve_many(active_strategy)
+            # Ceny historyczne wszystkich składników - jedno pobranie zamiast zapytania na ETF
+            hist_prices = get_historical_prices([(t, buy_date) for t in active_strategy]) if is_historical else {}
 
             for ticker, weight in active_strategy.items():
                 count += 1
@@ -121,27 +118,23 @@ elif mode == "🏦 Automat ETF":
                 target_pln = total_pln * weight
 
                 try:
-                    etf = yf.Ticker(ticker)
-                    info = etf.fast_info
-                    currency = info.currency
-                    if not currency: currency = "USD"
-                    if ticker.endswith(".DE"): currency = "EUR"  # Wymuszamy Euro dla giełdy niemieckiej
+                    currency = basket_instruments[ticker]["currency"]
 
                     price_native = 0.0
 
                     if is_historical:
-                        price_native = get_historical_price(ticker, buy_date)
+                        price_native = hist_prices.get((ticker, buy_date))
                         if price_native is None:
                             st.sidebar.error(f"Brak danych dla {ticker} na {buy_date}")
                             continue
                     else:
-                        price_native = info.last_price
+                        price_native = basket_quotes.get(ticker, {}).get("last_price")
 
                     if not price_native:
                         st.sidebar.error(f"Błąd ceny dla {ticker}")
                         continue
 
-                    fx_rate = get_exchange_rate(currency, "PLN", buy_date if is_historical else None)
+                    fx_rate = get_fx_rates("PLN").rate(currency, buy_date if is_historical else None)
                     price_in_pln = price_native * fx_rate
                     qty = target_pln / price_in_pln
 
@@ -172,6 +165,9 @@ else:
     equity_tickers_list = [t for t in df['ticker'].unique() if not t.startswith("#")]
 
     batch_prices = get_batch_prices(tuple(equity_tickers_list))
+    # Waluty wszystkich pozycji z indeksu instrumentów (bez zapytań do API wiersz po wierszu)
+    instruments = get_instrument_index().resolve_many(equity_tickers_list)
+    fx_rates = get_fx_rates("PLN")
 
     for i, row in df.iterrows():
         try:
@@ -209,23 +205,15 @@ else:
                 val_pln = current_val_pln
 
             else:
-                # Waluta określana na podstawie symbolu — bez dodatkowego zapytania do API
-                currency = "USD"  # domyślna
-                # Próbujemy użyć ceny z batch fetcha, fallback do fast_info
+                # Waluta z indeksu instrumentów — bez dodatkowego zapytania do API
+                currency = instruments[t]["currency"]
+                # Cena z batch fetcha, fallback do ceny zakupu
                 cur_price = batch_prices.get(t, None)
                 if cur_price is None or cur_price == 0:
-                    cur_price = float(yf.Ticker(t).fast_info.last_price or avg_price)
-
-                if "-USD" in t:
-                    currency = "USD"
-                elif t.endswith(".WA"):
-                    currency = "PLN"
-                elif t.endswith(".DE"):
-                    currency = "EUR"
-                elif t == "GC=F":
-                    currency = "USD"
-
-                fx_rate = get_exchange_rate(currency, "PLN")
+                    cur_price = float(avg_price)
+
+                # Dla cen w pensach (GBp) kurs uwzględnia dzielnik 100
+                fx_rate = fx_rates.rate(currency)
                 val_pln = qty * cur_price * fx_rate
 
                 if t == "GC=F" and avg_price > 2000:
@@ -301,27 +289,20 @@ else:
                 equity_tickers = [t for t in df['ticker'].unique() if not t.startswith("#")]
 
                 if equity_tickers:
-                    end_date = datetime.now()
-                    start_date = end_date - timedelta(days=180)
-
-                    hist_all = yf.download(equity_tickers, start=start_date, progress=False)
+                    # Wspólna macierz cen portfela (współdzielona z Korelacjami i Optymalizatorem)
+                    matrix = StockData().get_price_matrix(tuple(equity_tickers), period="2y")
+                    prices_all = matrix.slice(start=datetime.now() - timedelta(days=180)).to_frame()
 
                     history_series = []  # ← dodaj tę linię
 
-                    if not hist_all.empty:
-                        if isinstance(hist_all.columns, pd.MultiIndex):
-                            prices_all = hist_all["Close"]
-                        else:
-                            prices_all = hist_all[["Close"]]
-                            prices_all.columns = equity_tickers
-
+                    if not prices_all.empty:
                         for t in equity_tickers:
                             if t not in prices_all.columns:
                                 continue
                             qty = df[df['ticker'] == t]['quantity'].sum()
-                            curr = "PLN" if t.endswith(".WA") else "EUR" if t.endswith(".DE") else "USD"
-                            fx = get_exchange_rate(curr, "PLN")
-                            asset_val = prices_all[t] * qty * fx
+                            # Wycena po kursie z każdego dnia (jedna tabela kursów na walutę)
+                            asset_val = fx_rates.convert(prices_all[t] * qty, instruments[t]["currency"],
+                                                         prices_all.index)
                             asset_val.name = t
                             history_series.append(asset_val)
 
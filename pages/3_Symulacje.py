@@ -1,9 +1,10 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import yfinance as yf
 from src.database import PortfolioDB
-from src.data import get_exchange_rate
+from src.providers import get_provider
+from src.instruments import get_instrument_index
+from src.fx import get_fx_rates
 
 # 1. Konfiguracja strony
 st.set_page_config(page_title="Symulator Przyszłości", layout="wide")
@@ -18,22 +19,23 @@ start_capital = 0.0
 
 if not df.empty:
     with st.spinner('Liczenie wartości Twojego obecnego portfela...'):
+        # Notowania wszystkich pozycji jednym zapytaniem, waluty z indeksu instrumentów
+        tickers = df['ticker'].unique().tolist()
+        try:
+            quotes = get_provider().get_quotes(tickers)
+        except Exception:
+            quotes = {}
+        instruments = get_instrument_index().resolve_many(tickers)
+        fx_rates = get_fx_rates("PLN")
         for i, row in df.iterrows():
             try:
                 t = row['ticker']
                 qty = float(row['quantity'])
-                stock = yf.Ticker(t)
-                price = stock.fast_info.last_price
-                if price is None: continue
-                price = float(price)
-                curr = stock.fast_info.currency
-                if "-USD" in t: curr = "USD"
-                if t.endswith(".WA"): curr = "PLN"
-                if t.endswith(".L"): curr = "USD"
-                if curr == "GBp":
-                    price = price / 100.0
-                    curr = "GBP"
-                fx_rate = get_exchange_rate(curr, "PLN")
+                quote = quotes.get(t)
+                if quote is None: continue
+                price = float(quote["last_price"])
+                # Kurs waluty notowań (dla GBp uwzględnia przeliczenie pensów na funty)
+                fx_rate = fx_rates.rate(instruments[t]["currency"])
                 val_pln = qty * price * fx_rate
                 start_capital += val_pln
             except Exception:
@@ -1,9 +1,9 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.express as px
 from datetime import datetime, timedelta
 from src.database import PortfolioDB
+from src.data import StockData
 
 st.set_page_config(page_title="Korelacje", layout="wide")
 st.title("🔗 Mapa Korelacji Aktywów")
@@ -36,28 +36,20 @@ else:
                 """)
 
 
-        @st.cache_data(ttl=3600)
         def get_prices(ticker_list):
-            start_date = datetime.now() - timedelta(days=365)
-            data = yf.download(ticker_list, start=start_date, progress=False)
-            if 'Adj Close' in data:
-                return data['Adj Close']
-            elif 'Close' in data:
-                return data['Close']
-            else:
-                return data.iloc[:, :len(ticker_list)]
+            # Wspólna macierz cen portfela (współdzielona z innymi stronami) - tu ostatni rok
+            matrix = StockData().get_price_matrix(tuple(ticker_list), period="2y")
+            return matrix.slice(start=datetime.now() - timedelta(days=365))
 
 
         with st.spinner('Pobieram dane i rysuję wykres...'):
             try:
-                df_prices = get_prices(tickers)
-                if isinstance(df_prices, pd.Series): df_prices = df_prices.to_frame()
-                df_prices = df_prices.dropna(axis=1, how='all').dropna()
+                prices = get_prices(tickers).drop_empty().align("dropna")
 
-                if df_prices.shape[1] < 2:
+                if prices.shape[1] < 2:
                     st.error("Brak wystarczających danych.")
                 else:
-                    returns = df_prices.pct_change().dropna()
+                    returns = prices.returns().to_frame(dtype=float)
                     corr_matrix = returns.corr()
 
                     # Duży kafelek z wykresem
@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from src.data import StockData
+from src.monte_carlo import simulate_paths, estimate_params
 
 st.set_page_config(page_title="Symulacja Monte Carlo", layout="wide")
 st.title("🎲 Symulator Scenariuszy (Monte Carlo)")
@@ -18,7 +18,12 @@ st.sidebar.header("🎛️ Parametry Symulacji")
 default_ticker = "BTC-USD"
 ticker = st.sidebar.text_input("Wpisz symbol (np. AAPL, BTC-USD):", value=default_ticker).upper().strip()
 days_to_predict = st.sidebar.slider("Horyzont czasowy (dni w przyszłość):", min_value=30, max_value=365, value=90)
-num_simulations = st.sidebar.slider("Liczba symulacji (scenariuszy):", min_value=10, max_value=500, value=200)
+num_simulations = st.sidebar.select_slider("Liczba symulacji (scenariuszy):",
+                                           options=[100, 1_000, 10_000, 100_000, 1_000_000], value=10_000,
+                                           format_func=lambda n: f"{n:,}".replace(",", " "))
+seed_input = st.sidebar.number_input("Ziarno losowania (0 = nowe przy każdym uruchomieniu):", min_value=0,
+                                     max_value=2 ** 31 - 1, value=0, step=1,
+                                     help="To samo ziarno i te same parametry dają identyczny wynik symulacji.")
 
 # Pobieranie danych historycznych
 fetcher = StockData()
@@ -29,40 +34,46 @@ if hist_data.empty:
     st.stop()
 
 # Matematyka
-log_returns = np.log(1 + hist_data["Close"].pct_change())
-u = log_returns.mean()
-var = log_returns.var()
-drift = u - (0.5 * var)
-stdev = log_returns.std()
+drift, stdev = estimate_params(hist_data["Close"])
 last_price = hist_data["Close"].iloc[-1]
 
-st.markdown("---")
 
-if st.button("🚀 Uruchom Symulację"):
-    with st.spinner("Generowanie alternatywnych wszechświatów... 🌌"):
-        daily_volatility = stdev * np.random.normal(size=(days_to_predict, num_simulations))
-        daily_returns = np.exp(drift + daily_volatility)
+# Wynik zależy od ziarna - cache zwraca ten sam przebieg tylko dla tego samego (jawnego) ziarna
+@st.cache_data(ttl=3600, show_spinner=False)
+def run_simulation(last_price, drift, stdev, days, n_paths, seed):
+    return simulate_paths(last_price, drift, stdev, days, n_paths, seed=seed)
 
-        price_paths = np.zeros((days_to_predict + 1, num_simulations))
-        price_paths[0] = last_price
 
-        for t in range(1, days_to_predict + 1):
-            price_paths[t] = price_paths[t - 1] * daily_returns[t - 1]
+st.markdown("---")
 
-        simulation_df = pd.DataFrame(price_paths)
+if st.button("🚀 Uruchom Symulację"):
+    # Bez podanego ziarna każde kliknięcie losuje nowe scenariusze
+    seed = int(seed_input) or int(np.random.SeedSequence().entropy % 2 ** 31) or 1
+    with st.spinner("Generowanie alternatywnych wszechświatów... 🌌"):
+        # Moduł zwraca tylko pasma percentyli, średnią i kilka przykładowych ścieżek
+        sim = run_simulation(float(last_price), drift, stdev, days_to_predict, num_simulations, seed)
+        bands = sim["bands"]
+    st.caption(f"Ziarno losowania: {seed} - wpisz je w panelu bocznym, aby odtworzyć ten wynik.")
 
     # Wykres w kafelku
     with st.container(border=True):
         fig = go.Figure()
-        limit_lines = min(num_simulations, 100)
-
-        for i in range(limit_lines):
+        for path in sim["samples"]:
             fig.add_trace(go.Scatter(
-                y=simulation_df[i], mode='lines', line=dict(width=1, color='rgba(100, 100, 255, 0.2)'),
+                y=path, mode='lines', line=dict(width=1, color='rgba(100, 100, 255, 0.2)'),
                 showlegend=False, hoverinfo='skip'
             ))
 
-        mean_path = simulation_df.mean(axis=1)
+        # Pasma 5-95% i 25-75% wszystkich scenariuszy
+        for low, high, color, name in [("p5", "p95", "rgba(0, 204, 150, 0.15)", "Przedział 5-95%"),
+                                       ("p25", "p75", "rgba(0, 204, 150, 0.3)", "Przedział 25-75%")]:
+            fig.add_trace(go.Scatter(y=bands[high], mode='lines', line=dict(width=0), showlegend=False,
+                                     hoverinfo='skip'))
+            fig.add_trace(go.Scatter(y=bands[low], mode='lines', line=dict(width=0), fill='tonexty',
+                                     fillcolor=color, name=name))
+        fig.add_trace(go.Scatter(y=bands["p50"], mode='lines', name='Mediana', line=dict(width=2, dash='dot')))
+
+        mean_path = sim["mean"]
         fig.add_trace(
             go.Scatter(y=mean_path, mode='lines', name='Średnia Oczekiwana', line=dict(width=4, color='white')))
         fig.add_annotation(x=0, y=last_price, text=f"Start: {last_price:.2f}", showarrow=True, arrowhead=1)
@@ -71,7 +82,8 @@ if st.button("🚀 Uruchom Symulację"):
                            arrowhead=1, ax=20)
 
         fig.update_layout(
-            title=f"Wizualizacja Ścieżek dla {ticker} ({days_to_predict} dni)",
+            title=f"Wizualizacja Ścieżek dla {ticker} ({days_to_predict} dni, {sim['paths']:,} scenariuszy)"
+            .replace(",", " "),
             xaxis_title="Dni w przyszłość", yaxis_title="Cena Symulowana",
             margin=dict(l=20, r=20, t=40, b=20)
         )
@@ -79,18 +91,21 @@ if st.button("🚀 Uruchom Symulację"):
 
     # Podsumowanie w kafelkach
     st.subheader("📊 Analiza Ryzyka (Wynik za N dni)")
-    final_prices = simulation_df.iloc[-1]
+    final = sim["final"]
 
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         with st.container(border=True):
-            st.metric("Pesymistyczny (5%)", f"{np.percentile(final_prices, 5):.2f}", delta_color="inverse")
+            st.metric("Pesymistyczny (5%)", f"{final['p5']:.2f}", delta_color="inverse")
     with col2:
         with st.container(border=True):
-            st.metric("Średni (Mediana)", f"{np.median(final_prices):.2f}")
+            st.metric("Średni (Mediana)", f"{final['p50']:.2f}")
     with col3:
         with st.container(border=True):
-            st.metric("Optymistyczny (95%)", f"{np.percentile(final_prices, 95):.2f}")
+            st.metric("Optymistyczny (95%)", f"{final['p95']:.2f}")
+    with col4:
+        with st.container(border=True):
+            st.metric("Szansa straty", f"{final['prob_loss']:.1f}%")
 
     with st.container(border=True):
         st.info(
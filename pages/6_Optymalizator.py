@@ -1,10 +1,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import plotly.express as px
-from datetime import datetime, timedelta
 from src.database import PortfolioDB
+from src.data import StockData
 
 try:
     from pypfopt import EfficientFrontier, risk_models, expected_returns
@@ -31,17 +30,15 @@ else:
             st.write(f"**Analizowane aktywa:** {', '.join(tickers)}")
 
 
-        @st.cache_data(ttl=3600)
         def get_historical_data(ticker_list):
-            start_date = datetime.now() - timedelta(days=365 * 2)
-            data = yf.download(ticker_list, start=start_date, progress=False)['Close']
-            return data
+            # Wspólna macierz cen portfela (2 lata), współdzielona z innymi stronami
+            matrix = StockData().get_price_matrix(tuple(ticker_list), period="2y")
+            return matrix.drop_empty().align("dropna").to_frame(dtype=float)
 
 
         with st.spinner("Przeliczanie wariancji i kowariancji..."):
             try:
                 df_prices = get_historical_data(tickers)
-                df_prices = df_prices.dropna(axis=1, how='all').dropna()
 
                 if df_prices.empty or df_prices.shape[1] < 2:
                     st.error("Za mało danych historycznych do analizy.")
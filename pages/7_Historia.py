@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime
 from src.database import PortfolioDB
@@ -16,40 +17,28 @@ if df.empty:
     st.stop()
 
 # --- CZYSZCZENIE DANYCH ---
-from src.data import get_exchange_rate
+from src.fx import get_fx_rates
+from src.instruments import get_instrument_index
 
 df['timestamp'] = pd.to_datetime(df['timestamp'])
 df['Nazwa'] = df['ticker'].map(PRETTY_NAMES).fillna(df['ticker'])
 
-# Przeliczenie wartości zakupu na PLN z uwzględnieniem waluty
-def oblicz_wartosc_pln(row):
-    t = row['ticker']
-    qty = row['quantity']
-    price = row['avg_price']
-    # Data zakupu do pobrania kursu historycznego
-    purchase_date = row['timestamp'].date() if pd.notna(row['timestamp']) else None
-
-    # Obligacje i złoto już są zapisane w PLN
-    if t.startswith("#OBLIGACJE"):
-        return qty * price
-    if t == "GC=F" and price > 2000:
-        return qty * price
-
-    # Waluta na podstawie tickera
-    if t.endswith(".WA"):
-        return qty * price  # PLN, bez przeliczenia
-    elif t.endswith(".L"):
-        currency = "GBP"
-    elif t.endswith(".DE"):
-        currency = "EUR"
-    else:
-        currency = "USD"
-
-    # Kurs z dnia zakupu, nie dzisiejszy
-    fx = get_exchange_rate(currency, "PLN", purchase_date)
-    return qty * price * fx
-
-df['Wartość zakupu (PLN)'] = df.apply(oblicz_wartosc_pln, axis=1)
+# Przeliczenie wartości zakupu na PLN z uwzględnieniem waluty - wektorowo dla całej tabeli
+def oblicz_wartosci_pln(df):
+    t = df['ticker']
+    price = df['avg_price']
+    wartosc = df['quantity'] * price
+
+    # Waluta z indeksu instrumentów (wspólnego dla wszystkich stron)
+    currency = np.array(get_instrument_index().currencies(t.tolist()), dtype=object)
+    # Obligacje i złoto są zapisane w PLN - nie wymagają przeliczenia
+    w_pln = t.str.startswith("#OBLIGACJE") | ((t == "GC=F") & (price > 2000))
+    currency = np.where(w_pln, "PLN", currency)
+
+    # Kurs z dnia zakupu, nie dzisiejszy (jedna tabela kursów na walutę zamiast zapytania na wiersz)
+    return get_fx_rates("PLN").convert(wartosc, currency, df['timestamp'])
+
+df['Wartość zakupu (PLN)'] = oblicz_wartosci_pln(df)
 
 # Czytelna nazwa dla obligacji
 def clean_name(name):
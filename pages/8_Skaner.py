@@ -0,0 +1,77 @@
+import streamlit as st
+import pandas as pd
+from src.screener import Screener, load_universe, filter_ranking
+from src.analyzer import SCORE_RANGE
+
+st.set_page_config(page_title="Skaner Rynku", layout="wide")
+st.title("🔎 Skaner Rynku")
+st.markdown("Ranking wszystkich spółek z listy (`stocks_list.csv`) wg wyniku technicznego i oceny fundamentów.")
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def run_screener(period, fundamentals):
+    return Screener().run(period=period, fundamentals=fundamentals)
+
+
+# --- OPCJE ---
+st.sidebar.header("⚙️ Opcje skanera")
+period = st.sidebar.selectbox("Okres danych", options=["6mo", "1y", "2y"], index=1)
+fundamentals = st.sidebar.checkbox("Ocena fundamentów (Radar)", value=True)
+
+universe = load_universe()
+with st.spinner(f"Skanowanie {len(universe)} spółek..."):
+    ranking = run_screener(period, fundamentals)
+
+if ranking.empty:
+    st.warning("Brak danych dla spółek z listy.")
+    st.stop()
+
+# --- FILTRY ---
+st.sidebar.header("🧹 Filtry")
+min_score = st.sidebar.slider("Minimalny wynik techniczny", SCORE_RANGE[0], SCORE_RANGE[1], SCORE_RANGE[0])
+rsi_range = st.sidebar.slider("Zakres RSI", 0, 100, (0, 100))
+sectors = None
+min_fundamentals = None
+if "Sektor" in ranking.columns:
+    sectors = st.sidebar.multiselect("Sektory", sorted(ranking["Sektor"].dropna().unique()))
+    min_fundamentals = st.sidebar.slider("Minimalna ocena fundamentów", 0, 100, 0)
+
+filtered = filter_ranking(
+    ranking, min_score=min_score, sectors=sectors,
+    rsi_range=None if rsi_range == (0, 100) else rsi_range, min_fundamentals=min_fundamentals or None
+)
+
+sort_col = st.sidebar.selectbox("Sortuj wg", options=list(filtered.columns.drop(["Nazwa", "Werdykt", "Sektor"], errors="ignore")))
+ascending = st.sidebar.checkbox("Rosnąco", value=False)
+filtered = filtered.sort_values(sort_col, ascending=ascending)
+
+# --- WYNIKI ---
+c1, c2, c3 = st.columns(3)
+with c1:
+    with st.container(border=True):
+        st.metric("Spółki w rankingu", f"{len(filtered)} / {len(ranking)}")
+with c2:
+    with st.container(border=True):
+        st.metric("Sygnały kupna", int((filtered["Wynik tech."] >= 1).sum()))
+with c3:
+    with st.container(border=True):
+        st.metric("Sygnały sprzedaży", int((filtered["Wynik tech."] <= -1).sum()))
+
+
+def color_score(val):
+    if pd.api.types.is_number(val):
+        if val > 0:
+            return 'color: #00CC96; font-weight: bold;'
+        elif val < 0:
+            return 'color: #EF553B; font-weight: bold;'
+    return 'color: gray;'
+
+
+st.dataframe(
+    filtered.style.map(color_score, subset=["Wynik tech."]).format(precision=2),
+    use_container_width=True, height=600
+)
+
+st.download_button(
+    "📥 Pobierz ranking (CSV)", filtered.to_csv().encode("utf-8"), file_name="skaner.csv", mime="text/csv"
+)
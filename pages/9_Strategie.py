@@ -0,0 +1,99 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from src.data import StockData
+from src.sweep import ParameterSweep, SWEEP_STRATEGIES, heatmap, WalkForward, WALK_FORWARD_TRAIN, WALK_FORWARD_TEST
+
+st.set_page_config(page_title="Optymalizacja Strategii", layout="wide")
+st.title("🧪 Optymalizacja Parametrów Strategii")
+st.markdown("Przeszukiwanie siatki parametrów strategii technicznych na danych historycznych (backtest z kosztami).")
+
+# --- OPCJE ---
+st.sidebar.header("⚙️ Ustawienia")
+ticker = st.sidebar.text_input("Ticker:", value="AAPL").upper().strip()
+period = st.sidebar.selectbox("Okres danych", options=["2y", "5y", "10y", "max"], index=2)
+strategy = st.sidebar.selectbox("Strategia", options=list(SWEEP_STRATEGIES))
+commission_pct = st.sidebar.number_input("Prowizja (%):", min_value=0.0, max_value=5.0, value=0.1, step=0.05)
+slippage_pct = st.sidebar.number_input("Poślizg cenowy (%):", min_value=0.0, max_value=5.0, value=0.05, step=0.05)
+metric = st.sidebar.selectbox("Kryterium rankingu", options=["sharpe_ratio", "total_return", "cagr", "max_drawdown"])
+
+df = StockData().get_data(ticker, period=period, interval="1d")
+if df.empty:
+    st.warning("Brak danych dla wybranego tickera.")
+    st.stop()
+
+sweep = ParameterSweep(df, strategy=strategy, commission=commission_pct / 100, slippage=slippage_pct / 100)
+with st.container(border=True):
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Kombinacje parametrów", len(sweep))
+    c2.metric("Sesje w danych", len(df))
+    c3.metric("Procesy robocze", sweep.max_workers)
+
+if st.button("▶️ Uruchom przeszukiwanie", type="primary"):
+    progress_bar = st.progress(0.0, text="Start...")
+    live_table = st.empty()
+    parts = []
+
+    # Wyniki spływają paczkami - ranking odświeżany na bieżąco (przycisk "Stop" Streamlit przerywa obliczenia)
+    for part in sweep.iter_results(
+            progress=lambda done, total: progress_bar.progress(done / total, text=f"{done} / {total} kombinacji")):
+        parts.append(part)
+        ranking = pd.concat(parts, ignore_index=True).sort_values(metric, ascending=False)
+        live_table.dataframe(ranking.head(20).round(2), use_container_width=True)
+
+    st.session_state["sweep_results"] = (ticker, strategy, pd.concat(parts, ignore_index=True))
+
+if "sweep_results" in st.session_state:
+    res_ticker, res_strategy, results = st.session_state["sweep_results"]
+    st.subheader(f"🏆 Najlepsze parametry: {res_ticker} / {res_strategy}")
+    st.dataframe(results.sort_values(metric, ascending=False).head(20).round(2), use_container_width=True)
+
+    params = [c for c in results.columns if c in SWEEP_STRATEGIES[res_strategy][1]]
+    if len(params) >= 2:
+        hx, hy = st.columns(2)
+        x = hx.selectbox("Oś X", options=params, index=0)
+        y = hy.selectbox("Oś Y", options=params, index=1)
+        if x != y:
+            table = heatmap(results, x, y, metric)
+            fig = px.imshow(table, text_auto=".2f", aspect="auto", color_continuous_scale="RdYlGn",
+                            labels=dict(x=x, y=y, color=metric))
+            st.plotly_chart(fig, use_container_width=True)
+
+# --- WALK-FORWARD ---
+st.divider()
+st.subheader("🚶 Walk-forward (ocena poza próbą)")
+st.caption("Parametry dobierane są na oknie treningowym i testowane na kolejnym, niewidzianym odcinku. "
+           "Wyniki odcinków testowych sklejane są w jedną krzywą kapitału.")
+w1, w2, w3 = st.columns(3)
+train_size = w1.number_input("Okno treningowe (sesje)", min_value=60, max_value=2520, value=WALK_FORWARD_TRAIN, step=21)
+test_size = w2.number_input("Okno testowe (sesje)", min_value=20, max_value=1260, value=WALK_FORWARD_TEST, step=21)
+anchored = w3.radio("Trening", options=["Kroczący", "Od początku historii"], horizontal=True) != "Kroczący"
+
+wf = WalkForward(df, strategy=strategy, train_size=int(train_size), test_size=int(test_size), anchored=anchored,
+                 metric=metric, commission=commission_pct / 100, slippage=slippage_pct / 100)
+if not len(wf):
+    st.info("Za mało danych na choćby jedno okno treningowe i testowe - skróć okna lub wydłuż okres danych.")
+elif st.button(f"▶️ Uruchom walk-forward ({len(wf)} okien)"):
+    wf_bar = st.progress(0.0, text="Start...")
+    st.session_state["walk_forward"] = (ticker, strategy, wf.run(
+        progress=lambda done, total: wf_bar.progress(done / total, text=f"{done} / {total} okien")))
+
+if st.session_state.get("walk_forward"):
+    wf_ticker, wf_strategy, wf_result = st.session_state["walk_forward"]
+    m, b = wf_result["metrics"], wf_result["benchmark"]
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Zwrot poza próbą", f"{m['total_return']:.2f}%", f"{m['total_return'] - b['total_return']:.2f} pp vs Kup i Trzymaj")
+    k2.metric("CAGR poza próbą", f"{m['cagr']:.2f}%")
+    k3.metric("Sharpe poza próbą", f"{m['sharpe_ratio']:.2f}")
+    k4.metric("Efektywność WF", f"{wf_result['efficiency']:.2f}" if pd.notna(wf_result["efficiency"]) else "-",
+              help="CAGR poza próbą / średni CAGR w oknach treningowych")
+
+    # Obie krzywe z zapisanego wyniku - niezależnie od bieżących ustawień w panelu bocznym
+    equity, benchmark = wf_result["equity"], wf_result["benchmark_equity"]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=equity.index, y=equity, name=f"Walk-forward ({wf_strategy})"))
+    fig.add_trace(go.Scatter(x=benchmark.index, y=benchmark, name="Kup i Trzymaj", line=dict(dash="dot")))
+    fig.update_layout(title=f"Kapitał poza próbą: {wf_ticker}", height=400, hovermode="x unified")
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(wf_result["windows"], use_container_width=True)
@@ -0,0 +1,192 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.analyzer import StockAnalyzer
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_store", "analytics")
+# Limity warstwy dyskowej - przy zapisie usuwane są wpisy starsze niż limit wieku,
+# a potem najdawniej używane (wg mtime), aż katalog zmieści się w limicie rozmiaru
+DISK_MAX_BYTES = 256 * 1024 * 1024
+DISK_MAX_AGE_DAYS = 30
+
+
+def fingerprint(df, **params):
+    """Skrót treści danych (indeks, kolumny, wartości) i parametrów - ten sam wynik dla tych samych danych."""
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update(repr(list(df.columns)).encode())
+    h.update(repr(sorted(params.items())).encode())
+    return h.hexdigest()
+
+
+class AnalyticsCache:
+    """
+    Cache wyników analityki (kolumny wskaźników, metryki) adresowany treścią danych wejściowych.
+    Pamięć: ograniczone LRU (max_entries); opcjonalnie druga warstwa na dysku (disk_dir),
+    ograniczona rozmiarem (disk_max_bytes) i wiekiem wpisów (disk_max_age_days).
+    Liczniki trafień/chybień pokazują, ile przeliczeń oszczędzają ponowne uruchomienia strony.
+    """
+    def __init__(self, max_entries=64, disk_dir=None, disk_max_bytes=DISK_MAX_BYTES, disk_max_age_days=DISK_MAX_AGE_DAYS):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_max_age_days = disk_max_age_days
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _load_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except OSError:
+            return None
+        except Exception:
+            # Uszkodzony lub niepełny plik (np. przerwany zapis, inna wersja bibliotek) - usuwamy go,
+            # wynik zostanie policzony i zapisany od nowa
+            self._remove_disk(path)
+            return None
+        try:
+            os.utime(path)  # mtime = ostatnie użycie - przycinanie usuwa najdawniej używane wpisy
+        except OSError:
+            pass
+        return value
+
+    @staticmethod
+    def _remove_disk(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _save_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            tmp = self._disk_path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._disk_path(key))
+        except OSError as e:
+            print(f"Błąd zapisu cache analityki: {e}")
+            return
+        self._prune_disk()
+
+    def _prune_disk(self):
+        """Usuwa z dysku wpisy starsze niż disk_max_age_days, a potem najdawniej używane ponad disk_max_bytes."""
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".pkl"):
+                        st = entry.stat()
+                        files.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return
+
+        cutoff = time.time() - self.disk_max_age_days * 86400 if self.disk_max_age_days is not None else None
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            too_old = cutoff is not None and mtime < cutoff
+            too_big = self.disk_max_bytes is not None and total > self.disk_max_bytes
+            if not (too_old or too_big):
+                break
+            self._remove_disk(path)
+            total -= size
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, namespace, df, params, compute):
+        """Zwraca wynik compute() dla (namespace, dane, parametry) - z pamięci, dysku lub liczony od nowa."""
+        key = fingerprint(df, namespace=namespace, **params)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._load_disk(key)
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            value = compute()
+            with self._lock:
+                self.misses += 1
+            self._save_disk(key, value)
+        self._remember(key, value)
+        return value
+
+    def analyze(self, df, rsi_window=14, short_window=12, long_window=26):
+        """
+        Pełny zestaw StockAnalyzer (wskaźniki, zmienność, Sharpe/Max Drawdown, statystyki) z cache.
+        Zwraca słownik: df (kopia z kolumnami wskaźników), volatility, risk, stats.
+        """
+        def compute():
+            analyzer = StockAnalyzer(df.copy())
+            analyzer.calculate_returns()
+            analyzer.calculate_volatility()
+            analyzer.calculate_ema(short_window=short_window, long_window=long_window)
+            analyzer.calculate_macd()
+            analyzer.calculate_rsi(window=rsi_window)
+            return {
+                "df": analyzer.df,
+                "volatility": analyzer.volatility,
+                "risk": analyzer.get_risk_metrics(),
+                "stats": analyzer.basic_stats(),
+            }
+
+        params = {"rsi_window": rsi_window, "short_window": short_window, "long_window": long_window}
+        result = self.get_or_compute("stock_analyzer", df, params, compute)
+        # Kopia ramki - strona może ją modyfikować bez psucia wpisu w cache
+        return dict(result, df=result["df"].copy())
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+
+_analytics_cache = None
+_analytics_cache_lock = threading.Lock()
+
+
+def get_analytics_cache():
+    """Zwraca wspólny dla procesu cache analityki (z warstwą dyskową w data_store/analytics)."""
+    global _analytics_cache
+    with _analytics_cache_lock:
+        if _analytics_cache is None:
+            _analytics_cache = AnalyticsCache(disk_dir=DEFAULT_CACHE_DIR)
+        return _analytics_cache
@@ -1,6 +1,462 @@
+import warnings
+
 import pandas as pd
 import numpy as np
 
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+# Interwały yfinance -> reguły resamplingu pandas (świece tygodniowe zaczynają się w poniedziałek)
+RESAMPLE_RULES = {
+    "1wk": {"rule": "W-MON", "label": "left", "closed": "left"},
+    "1mo": {"rule": "MS", "label": "left", "closed": "left"},
+}
+
+OHLCV_AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def resample_ohlcv(df, interval):
+    """
+    Buduje świece rzadszego interwału ("1wk", "1mo") z gęstszych (np. dziennych):
+    pierwsze otwarcie, najwyższe maksimum, najniższe minimum, ostatnie zamknięcie, suma wolumenu.
+    """
+    if interval not in RESAMPLE_RULES:
+        raise ValueError(f"Nieobsługiwany interwał resamplingu: {interval}")
+    if df.empty:
+        return df.copy()
+    params = RESAMPLE_RULES[interval]
+    agg = {col: how for col, how in OHLCV_AGGREGATION.items() if col in df.columns}
+    bars = df.resample(params["rule"], label=params["label"], closed=params["closed"]).agg(agg)
+    # Okresy bez żadnej sesji (np. długie święta) nie tworzą świec
+    return bars.dropna(subset=["Close"])
+
+
+def multi_timeframe(df, intervals=("1d", "1wk", "1mo"), rsi_window=14, short_window=12, long_window=26):
+    """
+    Liczy wskaźniki StockAnalyzer (zwroty, EMA, MACD, RSI) dla kilku interwałów naraz,
+    na podstawie jednej historii dziennej - bez ponownego pobierania danych.
+    Zwraca słownik interwał -> DataFrame ze wskaźnikami.
+    """
+    result = {}
+    for interval in intervals:
+        bars = df.copy() if interval == "1d" else resample_ohlcv(df, interval)
+        analyzer = StockAnalyzer(bars)
+        analyzer.calculate_returns()
+        analyzer.calculate_ema(short_window=short_window, long_window=long_window)
+        analyzer.calculate_macd()
+        analyzer.calculate_rsi(window=rsi_window)
+        result[interval] = analyzer.df
+    return result
+
+
+# --- OCENA TECHNICZNA (werdykt algorytmu) ---
+# Przedziały werdyktu: (minimalny wynik, werdykt, kolor) - od najwyższego
+VERDICT_BANDS = (
+    (4, "MOCNE KUPUJ 🚀", "#2E8B57"),
+    (1, "KUPUJ ↗️", "#00CC96"),
+    (0, "NEUTRALNIE 😐", "#AB63FA"),
+    (-3, "SPRZEDAWAJ ↘️", "#FFA15A"),
+    (-np.inf, "MOCNE SPRZEDAWAJ 🔻", "#EF553B"),
+)
+SCORE_RANGE = (-7, 7)
+
+
+def technical_score(close, rsi, ema_long, macd, macd_signal):
+    """
+    Wynik techniczny dla każdej świecy (i każdego tickera) naraz - tablice dowolnego, wspólnego kształtu.
+    RSI < 30: +2, RSI > 70: -2; cena powyżej EMA długiej: +3, poniżej: -3;
+    MACD powyżej linii sygnału: +2, poniżej: -2. Zakres wyniku: SCORE_RANGE.
+    """
+    close, rsi, ema_long = np.asarray(close), np.asarray(rsi), np.asarray(ema_long)
+    macd, macd_signal = np.asarray(macd), np.asarray(macd_signal)
+    with np.errstate(invalid="ignore"):
+        score = np.where(rsi < 30, 2, np.where(rsi > 70, -2, 0))
+        score += np.where(close > ema_long, 3, -3)
+        score += np.where(macd > macd_signal, 2, np.where(macd < macd_signal, -2, 0))
+    return score.astype(np.int8)
+
+
+def verdict_band(score):
+    """Indeks przedziału w VERDICT_BANDS dla wyniku (skalar lub tablica)."""
+    score = np.asarray(score)
+    return np.select([score >= low for low, _, _ in VERDICT_BANDS], np.arange(len(VERDICT_BANDS)))
+
+
+def verdict(score):
+    """Zwraca (werdykt, kolor) dla pojedynczego wyniku."""
+    _, label, color = VERDICT_BANDS[int(verdict_band(score))]
+    return label, color
+
+
+def score_history(df):
+    """
+    Historia wyniku technicznego dla DataFrame z kolumnami StockAnalyzer (Close, RSI, EMA_long, MACD, MACD_signal).
+    Zwraca DataFrame: Score i Verdict dla każdej świecy.
+    """
+    score = technical_score(df["Close"], df["RSI"], df["EMA_long"], df["MACD"], df["MACD_signal"])
+    labels = np.array([label for _, label, _ in VERDICT_BANDS], dtype=object)
+    return pd.DataFrame({"Score": score, "Verdict": labels[verdict_band(score)]}, index=df.index)
+
+
+def score_reasons(df):
+    """Wynik i uzasadnienie (lista opisów) dla ostatniej świecy - do wyświetlenia na stronie analizy."""
+    last = df.iloc[-1]
+    reasons = []
+    if last["RSI"] < 30:
+        reasons.append(f"🟢 RSI ({last['RSI']:.1f}) wskazuje wyprzedanie (okazja?)")
+    elif last["RSI"] > 70:
+        reasons.append(f"🔴 RSI ({last['RSI']:.1f}) wskazuje wykupienie")
+    else:
+        reasons.append(f"⚪ RSI ({last['RSI']:.1f}) jest neutralne")
+
+    if last["Close"] > last["EMA_long"]:
+        reasons.append("🟢 Cena powyżej długoterminowej średniej")
+    else:
+        reasons.append("🔴 Cena poniżej długoterminowej średniej")
+
+    if last["MACD"] > last["MACD_signal"]:
+        reasons.append("🟢 MACD przebiło linię sygnału od dołu")
+    elif last["MACD"] < last["MACD_signal"]:
+        reasons.append("🔴 MACD poniżej linii sygnału")
+
+    score = technical_score(last["Close"], last["RSI"], last["EMA_long"], last["MACD"], last["MACD_signal"])
+    return int(score), reasons
+
+
+# --- TRYB PANELOWY (wiele tickerów naraz) ---
+def _as_panel(close):
+    """Zwraca (tablica 2D float64 daty x tickery, daty, tickery) z DataFrame, PriceMatrix lub tablicy."""
+    if isinstance(close, pd.DataFrame):
+        return close.to_numpy(dtype=np.float64), close.index, close.columns
+    if hasattr(close, "values") and hasattr(close, "dates"):
+        return np.asarray(close.values, dtype=np.float64), close.dates, close.tickers
+    values = np.asarray(close, dtype=np.float64)
+    return values, pd.RangeIndex(values.shape[0]), pd.RangeIndex(values.shape[1])
+
+
+def ema_panel(values, span):
+    """
+    EMA (jak ewm(span, adjust=False)) wzdłuż osi czasu dla wszystkich kolumn naraz.
+    Pętla idzie tylko po datach - każdy krok to jedna operacja wektorowa na wszystkich tickerach.
+    Przed pierwszym notowaniem wynik to NaN, a w lukach liczony jest z ostatniej znanej ceny.
+    """
+    alpha = 2.0 / (span + 1.0)
+    missing = np.isnan(values)
+    # Luki wypełniamy ostatnią ceną (wiodące braki - pierwszą), żeby w pętli nie sprawdzać NaN
+    filled = pd.DataFrame(values).ffill().bfill().to_numpy()
+    out = np.empty_like(filled)
+    prev = filled[0].copy()
+    for i in range(filled.shape[0]):
+        prev += alpha * (filled[i] - prev)
+        out[i] = prev
+    out[np.cumsum(~missing, axis=0) == 0] = np.nan
+    return out
+
+
+def rolling_mean_panel(values, window):
+    """Średnia krocząca (jak rolling(window).mean()) - NaN, jeśli w oknie brakuje choć jednej wartości."""
+    valid = ~np.isnan(values)
+    csum = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    ccount = np.cumsum(valid, axis=0)
+    csum[window:] = csum[window:] - csum[:-window]
+    ccount[window:] = ccount[window:] - ccount[:-window]
+    out = csum / window
+    out[ccount < window] = np.nan
+    return out
+
+
+def rsi_panel(values, window=14):
+    """RSI (średnie kroczące wzrostów i spadków, jak w StockAnalyzer.calculate_rsi) dla wszystkich tickerów."""
+    delta = np.full_like(values, np.nan)
+    delta[1:] = values[1:] - values[:-1]
+    # Jak delta.where(delta > 0, 0) - brak zmiany w pierwszym dniu liczy się jako zero,
+    # ale dni bez notowania (np. przed debiutem) zostają puste
+    missing = np.isnan(values)
+    gain = rolling_mean_panel(np.where(missing, np.nan, np.where(delta > 0, delta, 0.0)), window)
+    loss = rolling_mean_panel(np.where(missing, np.nan, np.where(delta < 0, -delta, 0.0)), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+
+class PanelAnalyzer:
+    """
+    Wskaźniki StockAnalyzer liczone dla całego uniwersum naraz na macierzy cen zamknięcia
+    (daty x tickery). Wyniki to tablice 2D (szeregi wskaźników) lub 1D (jedna wartość na ticker),
+    bez kopiowania danych per ticker i bez modyfikowania wejścia.
+    """
+    def __init__(self, close):
+        self.values, self.dates, self.tickers = _as_panel(close)
+
+    def returns(self):
+        """Dzienne stopy zwrotu (pierwszy wiersz NaN, jak pct_change)."""
+        out = np.full_like(self.values, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[1:] = self.values[1:] / self.values[:-1] - 1
+        return out
+
+    def ema(self, span):
+        return ema_panel(self.values, span)
+
+    def macd(self, short_window=12, long_window=26, signal_window=9):
+        """Zwraca (MACD, linia sygnału)."""
+        macd = self.ema(short_window) - self.ema(long_window)
+        return macd, ema_panel(macd, signal_window)
+
+    def rsi(self, window=14):
+        return rsi_panel(self.values, window)
+
+    def volatility(self):
+        """Odchylenie standardowe dziennych zwrotów (ddof=1) dla każdego tickera."""
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanstd(self.returns(), axis=0, ddof=1)
+
+    def risk_metrics(self):
+        """Sharpe Ratio (annualizowany, 252 sesje) i Max Drawdown dla każdego tickera."""
+        rets = self.returns()
+        with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean, std = np.nanmean(rets, axis=0), np.nanstd(rets, axis=0, ddof=1)
+            sharpe = np.where(std == 0, 0.0, mean / std * np.sqrt(252))
+
+        # Brakujący zwrot traktujemy jak zerowy - kapitał stoi w miejscu
+        cumulative = np.cumprod(1 + np.nan_to_num(rets, nan=0.0), axis=0)
+        drawdown = cumulative / np.maximum.accumulate(cumulative, axis=0) - 1
+        max_drawdown = drawdown.min(axis=0) if len(drawdown) else np.full(self.values.shape[1], np.nan)
+        return {"sharpe_ratio": sharpe, "max_drawdown": max_drawdown}
+
+    def compute(self, rsi_window=14, short_window=12, long_window=26):
+        """Wszystkie wskaźniki naraz - słownik nazwa -> tablica (2D: daty x tickery, 1D: tickery)."""
+        ema_short, ema_long = self.ema(short_window), self.ema(long_window)
+        macd = ema_short - ema_long
+        risk = self.risk_metrics()
+        return {
+            "Returns": self.returns(),
+            "EMA_short": ema_short,
+            "EMA_long": ema_long,
+            "MACD": macd,
+            "MACD_signal": ema_panel(macd, 9),
+            "RSI": self.rsi(rsi_window),
+            "volatility": self.volatility(),
+            "sharpe_ratio": risk["sharpe_ratio"],
+            "max_drawdown": risk["max_drawdown"],
+        }
+
+    def technical_scores(self, rsi_window=14, short_window=12, long_window=26):
+        """Wynik techniczny (jak werdykt na stronie analizy) dla każdej daty i tickera - DataFrame daty x tickery."""
+        macd, signal = self.macd(short_window, long_window)
+        score = technical_score(self.values, self.rsi(rsi_window), self.ema(long_window), macd, signal)
+        return pd.DataFrame(score, index=self.dates, columns=self.tickers)
+
+    def last_valid(self, arr):
+        """
+        Wartości z ostatniego notowania każdego tickera (wiersz 2D tablicy daty x tickery).
+        Ticker bez sesji w ostatnim dniu (np. inna giełda, święto) nie dostaje wyniku z pustego wiersza.
+        """
+        valid = ~np.isnan(self.values)
+        rows = len(valid) - 1 - np.argmax(valid[::-1], axis=0)
+        last = arr[rows, np.arange(arr.shape[1])]
+        if valid.any(axis=0).all():
+            return last
+        return np.where(valid.any(axis=0), last, np.nan)
+
+    def rank(self, **kwargs):
+        """Ranking tickerów wg bieżącego wyniku technicznego (od najwyższego) wraz z werdyktem."""
+        scores = self.technical_scores(**kwargs)
+        if scores.empty:
+            return pd.DataFrame(columns=["Score", "Verdict"])
+        last = pd.Series(self.last_valid(scores.to_numpy()), index=scores.columns)
+        labels = np.array([label for _, label, _ in VERDICT_BANDS], dtype=object)
+        ranking = pd.DataFrame({"Score": last, "Verdict": labels[verdict_band(last.to_numpy())]})
+        return ranking.sort_values("Score", ascending=False, kind="stable")
+
+    def summary(self, **kwargs):
+        """Wartości wskaźników z ostatniego notowania i metryki ryzyka - jeden wiersz na ticker."""
+        result = self.compute(**kwargs)
+        rows = {name: (self.last_valid(arr) if arr.ndim == 2 else arr) for name, arr in result.items() if len(arr)}
+        return pd.DataFrame(rows, index=self.tickers)
+
+
+# --- WSZYSTKIE WSKAŹNIKI W JEDNYM PRZEBIEGU ---
+INDICATOR_FIELDS = ("Returns", "EMA_short", "EMA_long", "MACD", "MACD_signal", "RSI",
+                    "BB_mid", "BB_upper", "BB_lower", "ATR", "Stoch_K", "Stoch_D")
+
+
+def _ema_into(x, span, out):
+    """EMA (jak ewm(span, adjust=False)) zapisana do bufora out."""
+    if not len(x):
+        return out
+    alpha = 2.0 / (span + 1.0)
+    if lfilter is not None:
+        # y[i] = alpha * x[i] + (1 - alpha) * y[i-1], stan początkowy daje y[0] = x[0]
+        out[:] = lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * x[0]])[0]
+        return out
+    prev = x[0]
+    for i in range(len(x)):
+        prev += alpha * (x[i] - prev)
+        out[i] = prev
+    return out
+
+
+def ema(x, span):
+    """EMA (jak ewm(span, adjust=False)) dla jednowymiarowej tablicy cen."""
+    x = np.asarray(x, dtype=np.float64)
+    return _ema_into(x, span, np.empty_like(x))
+
+
+def _rolling_mean_into(x, window, out):
+    """
+    Średnia krocząca (jak rolling(window).mean()) liczona sumami skumulowanymi w buforze out.
+    Jak rolling_mean_panel: NaN, jeśli w oknie brakuje choć jednej wartości - brak nie psuje dalszej historii.
+    """
+    valid = ~np.isnan(x)
+    np.cumsum(np.where(valid, x, 0.0), out=out)
+    out[window:] = out[window:] - out[:-window]
+    out /= window
+    count = np.cumsum(valid)
+    count[window:] = count[window:] - count[:-window]
+    out[count < window] = np.nan
+    return out
+
+
+def _rolling_extreme(x, window, ufunc):
+    """
+    Maksimum/minimum kroczące (ufunc = np.maximum / np.minimum) w czasie O(n), niezależnie od okna:
+    maksima narastające od początku i od końca każdego bloku długości okna (algorytm van Herka/Gil-Wermana).
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    fill = -np.inf if ufunc is np.maximum else np.inf
+    blocks = np.full(-(-n // window) * window, fill)
+    blocks[:n] = x
+    blocks = blocks.reshape(-1, window)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    ufunc(suffix[:n - window + 1], prefix[window - 1:n], out=out[window - 1:])
+    return out
+
+
+class IndicatorResult:
+    """
+    Wynik compute_all: jedna ciągła tablica (wskaźniki x daty) i indeks dat.
+    Wskaźnik pobiera się po nazwie (result["RSI"] - widok wiersza, bez kopii).
+    """
+    __slots__ = ("index", "values", "_rows")
+
+    def __init__(self, index, values):
+        self.index = index
+        self.values = values
+        self._rows = {name: i for i, name in enumerate(INDICATOR_FIELDS)}
+
+    def __getitem__(self, name):
+        return self.values[self._rows[name]]
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return INDICATOR_FIELDS
+
+    def last(self):
+        """Ostatnie wartości wszystkich wskaźników."""
+        if not len(self.index):
+            return {name: np.nan for name in INDICATOR_FIELDS}
+        return {name: float(self.values[i, -1]) for name, i in self._rows.items()}
+
+    def to_frame(self):
+        """DataFrame (daty x wskaźniki) - np. do wykresów; widok na tę samą tablicę."""
+        return pd.DataFrame(self.values.T, index=self.index, columns=list(INDICATOR_FIELDS), copy=False)
+
+
+def compute_all(df, short_window=12, long_window=26, signal_window=9, rsi_window=14,
+                bb_window=20, bb_std=2.0, atr_window=14, stoch_window=14, stoch_smooth=3):
+    """
+    Liczy zwroty, EMA, MACD z sygnałem, RSI, wstęgi Bollingera, ATR i oscylator stochastyczny
+    na ciągłych tablicach NumPy, zapisując wyniki do jednego, wcześniej zaalokowanego bufora.
+    Nie modyfikuje df. Wyniki pokrywające się ze StockAnalyzer są z nim zgodne.
+    """
+    df = df.dropna(subset=["Close"])
+    close = np.ascontiguousarray(df["Close"].to_numpy(dtype=np.float64))
+    high = df["High"].to_numpy(dtype=np.float64) if "High" in df.columns else close
+    low = df["Low"].to_numpy(dtype=np.float64) if "Low" in df.columns else close
+    n = len(close)
+
+    values = np.empty((len(INDICATOR_FIELDS), n))
+    result = IndicatorResult(df.index, values)
+    if n == 0:
+        return result
+    # Bufor roboczy na wartości pośrednie (zmiany ceny, zakres prawdziwy) - bez tymczasowych Series
+    scratch = np.empty((2, n))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Zwroty (pierwszy dzień NaN, jak pct_change)
+        ret = result["Returns"]
+        ret[0] = np.nan
+        np.divide(close[1:], close[:-1], out=ret[1:])
+        ret[1:] -= 1
+
+        # EMA i MACD
+        _ema_into(close, short_window, result["EMA_short"])
+        _ema_into(close, long_window, result["EMA_long"])
+        np.subtract(result["EMA_short"], result["EMA_long"], out=result["MACD"])
+        _ema_into(result["MACD"], signal_window, result["MACD_signal"])
+
+        # RSI - zmiana pierwszego dnia liczy się jako zero (jak w calculate_rsi)
+        delta = scratch[0]
+        delta[0] = 0.0
+        np.subtract(close[1:], close[:-1], out=delta[1:])
+        gain, loss = result["RSI"], scratch[1]
+        _rolling_mean_into(np.maximum(delta, 0.0), rsi_window, gain)
+        _rolling_mean_into(np.maximum(-delta, 0.0), rsi_window, loss)
+        np.divide(gain, loss, out=gain)
+        gain += 1
+        np.divide(100.0, gain, out=gain)
+        np.subtract(100.0, gain, out=gain)
+
+        # Wstęgi Bollingera (odchylenie z ddof=1, jak rolling().std()); ceny względem pierwszej - stabilniej numerycznie
+        mid, upper, lower = result["BB_mid"], result["BB_upper"], result["BB_lower"]
+        centered = scratch[0]
+        np.subtract(close, close[0], out=centered)
+        _rolling_mean_into(centered, bb_window, mid)
+        _rolling_mean_into(centered * centered, bb_window, upper)
+        # wariancja = (E[x^2] - E[x]^2) * n / (n - 1)
+        upper -= mid * mid
+        upper *= bb_window / (bb_window - 1)
+        np.maximum(upper, 0.0, out=upper)
+        np.sqrt(upper, out=upper)
+        upper *= bb_std
+        mid += close[0]
+        np.subtract(mid, upper, out=lower)
+        upper += mid
+
+        # ATR - średnia z zakresu prawdziwego (pierwszy dzień: High - Low)
+        tr = scratch[1]
+        np.subtract(high, low, out=tr)
+        np.maximum(tr[1:], np.abs(high[1:] - close[:-1]), out=tr[1:])
+        np.maximum(tr[1:], np.abs(low[1:] - close[:-1]), out=tr[1:])
+        _rolling_mean_into(tr, atr_window, result["ATR"])
+
+        # Oscylator stochastyczny: %K i jego średnia %D
+        highest = _rolling_extreme(high, stoch_window, np.maximum)
+        lowest = _rolling_extreme(low, stoch_window, np.minimum)
+        k = result["Stoch_K"]
+        np.subtract(close, lowest, out=k)
+        np.divide(k, highest - lowest, out=k)
+        k *= 100
+        d = result["Stoch_D"]
+        d[:] = np.nan
+        if n >= stoch_window:
+            _rolling_mean_into(k[stoch_window - 1:], stoch_smooth, d[stoch_window - 1:])
+    return result
+
+
 class StockAnalyzer:
     """
     Klasa analityczna przetwarzająca dane giełdowe na wskaźniki techniczne i metryki ryzyka.
@@ -97,6 +553,16 @@ class StockAnalyzer:
             "max_drawdown": max_drawdown
         }
 
+    def get_rolling_risk_metrics(self, windows=(63, 126, 252), level=0.95):
+        """
+        Metryki ryzyka w czasie (krocząco): Sharpe, Max Drawdown i VaR/CVaR dla kilku okien naraz.
+        Zwraca słownik okno -> DataFrame (patrz src/risk.py).
+        """
+        from src.risk import rolling_risk
+        if 'Returns' not in self.df.columns:
+            self.calculate_returns()
+        return rolling_risk(self.df['Returns'], windows=windows, level=level)
+
     def basic_stats(self):
         """
         Zwraca podstawowe statystyki opisowe dla szeregu czasowego cen.
@@ -106,4 +572,119 @@ class StockAnalyzer:
             "mediana ceny": self.df['Close'].median(),
             "min cena": self.df['Close'].min(),
             "max cena": self.df['Close'].max()
-        }
\ No newline at end of file
+        }
+
+class IndicatorState:
+    """
+    Stan wskaźników (EMA, MACD z linią sygnału, RSI, Max Drawdown) aktualizowany przyrostowo.
+    Każde update(bar) to stała liczba operacji - bez przeliczania całej historii.
+    Wyniki są zgodne z StockAnalyzer, a stan można zapisać (to_dict) i wznowić (from_dict).
+    """
+    def __init__(self, short_window=12, long_window=26, signal_window=9, rsi_window=14):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.signal_window = signal_window
+        self.rsi_window = rsi_window
+
+        self.count = 0
+        self.last_close = None
+        self.last_date = None
+        self.ema_short = None
+        self.ema_long = None
+        self.macd_signal = None
+        # Okno zmian ceny dla RSI (bufor cykliczny) i bieżące sumy wzrostów/spadków
+        self.gains = [0.0] * rsi_window
+        self.losses = [0.0] * rsi_window
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        # Drawdown liczony od pierwszej ceny (jak skumulowany zwrot w get_risk_metrics)
+        self.first_close = None
+        self.peak = None
+        self.max_drawdown = 0.0
+
+    @staticmethod
+    def _ema(prev, value, span):
+        if prev is None:
+            return value
+        alpha = 2.0 / (span + 1.0)
+        return prev + alpha * (value - prev)
+
+    def update(self, bar, date=None):
+        """
+        Dokłada jedną świecę (cena zamknięcia albo słownik/Series z polem "Close")
+        i zwraca bieżące wartości wskaźników.
+        """
+        close = float(bar["Close"] if not np.isscalar(bar) else bar)
+        if np.isnan(close):
+            return self.values()
+
+        # RSI - pierwsza świeca nie ma zmiany, liczy się jako zero (jak delta.where(...) w StockAnalyzer)
+        delta = 0.0 if self.last_close is None else close - self.last_close
+        slot = self.count % self.rsi_window
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self.gain_sum += gain - self.gains[slot]
+        self.loss_sum += loss - self.losses[slot]
+        self.gains[slot], self.losses[slot] = gain, loss
+        # Sumy bieżące mogą nieznacznie dryfować - przy pełnym obrocie bufora liczymy je od nowa
+        if slot == self.rsi_window - 1:
+            self.gain_sum, self.loss_sum = sum(self.gains), sum(self.losses)
+
+        # EMA i MACD
+        self.ema_short = self._ema(self.ema_short, close, self.short_window)
+        self.ema_long = self._ema(self.ema_long, close, self.long_window)
+        self.macd_signal = self._ema(self.macd_signal, self.ema_short - self.ema_long, self.signal_window)
+
+        # Drawdown
+        if self.first_close is None:
+            self.first_close = self.peak = close
+        self.peak = max(self.peak, close)
+        self.max_drawdown = min(self.max_drawdown, close / self.peak - 1)
+
+        self.count += 1
+        self.last_close = close
+        if date is not None:
+            self.last_date = pd.Timestamp(date).isoformat()
+        return self.values()
+
+    @property
+    def rsi(self):
+        if self.count < self.rsi_window:
+            return np.nan
+        if self.loss_sum == 0:
+            return 100.0 if self.gain_sum > 0 else np.nan
+        return 100 - 100 / (1 + self.gain_sum / self.loss_sum)
+
+    def values(self):
+        """Bieżące wartości wskaźników (nazwy kolumn jak w StockAnalyzer)."""
+        macd = None if self.ema_short is None else self.ema_short - self.ema_long
+        return {
+            "Close": self.last_close,
+            "EMA_short": self.ema_short,
+            "EMA_long": self.ema_long,
+            "MACD": macd,
+            "MACD_signal": self.macd_signal,
+            "RSI": self.rsi,
+            "drawdown": None if self.peak is None else self.last_close / self.peak - 1,
+            "max_drawdown": self.max_drawdown,
+        }
+
+    @classmethod
+    def from_history(cls, df, **kwargs):
+        """Buduje stan z historii OHLCV (jednorazowo), dalej wystarczy update() dla nowych świec."""
+        state = cls(**kwargs)
+        closes = df["Close"].dropna()
+        for date, close in zip(closes.index, closes.to_numpy(dtype=float)):
+            state.update(close, date)
+        return state
+
+    # --- Zapis i odtworzenie stanu ---
+    def to_dict(self):
+        """Stan jako słownik typów prostych (gotowy do json.dumps)."""
+        return dict(self.__dict__, gains=list(self.gains), losses=list(self.losses))
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data["short_window"], data["long_window"], data["signal_window"], data["rsi_window"])
+        state.__dict__.update(data)
+        state.gains, state.losses = list(data["gains"]), list(data["losses"])
+        return state
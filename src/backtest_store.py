@@ -0,0 +1,107 @@
+import json
+import pickle
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.analytics_cache import fingerprint
+from src.database import BacktestDB
+
+# Metryki pokazywane w porównaniu zapisanych przebiegów (kolejność kolumn)
+COMPARE_METRICS = ["total_return", "cagr", "sharpe_ratio", "max_drawdown", "volatility", "trades", "win_rate", "fees"]
+
+
+def run_key(strategy, params, tickers, interval, data_hash):
+    """Klucz przebiegu: strategia, parametry, zestaw tickerów, interwał świec i skrót danych wejściowych."""
+    payload = json.dumps([strategy, params, sorted(tickers), interval, data_hash], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class BacktestStore:
+    """
+    Trwały magazyn wyników backtestów (SQLite). Wynik (metryki, krzywa kapitału, transakcje) zapisywany jest
+    pod kluczem ze strategii, parametrów, tickerów, interwału świec i skrótu cen wejściowych - ponowne
+    uruchomienie na tych samych danych wczytuje gotowy wynik. Zapis przebiegu na nowszych notowaniach usuwa
+    przebiegi dla tych samych tickerów i interwału policzone na nieaktualnych danych.
+    """
+    def __init__(self, db=None):
+        self.db = db or BacktestDB()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_run(self, strategy, params, tickers, data, run, interval="1d"):
+        """
+        Zwraca wynik run() (słownik z kluczem "metrics") dla strategii, parametrów i danych
+        - z magazynu albo liczony od nowa i zapisywany. interval: interwał świec w data ("1d", "1wk", "1mo").
+        """
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        data_hash = fingerprint(data)
+        key = run_key(strategy, params, tickers, interval, data_hash)
+        with self._lock:
+            blob = self.db.load_result(key)
+        if blob is not None:
+            try:
+                result = pickle.loads(blob)
+                self.hits += 1
+                return result
+            except (pickle.PickleError, EOFError, AttributeError):
+                pass  # Uszkodzony wpis - liczymy od nowa i nadpisujemy
+
+        self.misses += 1
+        result = run()
+        if result is None:
+            return None
+
+        names = ",".join(sorted(tickers))
+        start, end = (data.index[0].isoformat(), data.index[-1].isoformat()) if len(data) else (None, None)
+        metrics = {k: v for k, v in result.get("metrics", {}).items() if np.isscalar(v)}
+        with self._lock:
+            self.db.save_run(key, strategy, params, names, interval, data_hash, start, end, metrics,
+                             pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            self.db.delete_stale(names, interval, data_hash, start, end)
+        return result
+
+    def load(self, key):
+        """Pełny zapisany wynik przebiegu (lub None)."""
+        with self._lock:
+            blob = self.db.load_result(key)
+        return pickle.loads(blob) if blob is not None else None
+
+    def runs(self, strategy=None, tickers=None, interval=None):
+        """
+        Porównanie zapisanych przebiegów: wiersz na przebieg, kolumny - strategia, parametry,
+        tickery, interwał, zakres danych i metryki z COMPARE_METRICS.
+        """
+        names = None if tickers is None else ",".join(sorted([tickers] if isinstance(tickers, str) else tickers))
+        with self._lock:
+            df = self.db.list_runs(strategy, names, interval)
+        if df.empty:
+            return df
+        metrics = pd.DataFrame([json.loads(m) for m in df["metrics"]], index=df.index)
+        df = df.drop(columns="metrics").join(metrics[[c for c in COMPARE_METRICS if c in metrics.columns]])
+        return df.set_index("run_key")
+
+    def evict_older_than(self, days):
+        """Usuwa przebiegi zapisane dawniej niż days dni temu - zwraca liczbę usuniętych."""
+        cutoff = (pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            return self.db.delete_older_than(cutoff)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_backtest_store = None
+_backtest_store_lock = threading.Lock()
+
+
+def get_backtest_store():
+    """Zwraca wspólny dla procesu magazyn wyników backtestów."""
+    global _backtest_store
+    with _backtest_store_lock:
+        if _backtest_store is None:
+            _backtest_store = BacktestStore()
+        return _backtest_store
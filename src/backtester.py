@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 class SimpleBacktester:
@@ -52,4 +53,199 @@ class SimpleBacktester:
             "roi": roi,
             "start_date": self.data.index[0],
             "end_date": self.data.index[-1]
-        }
\ No newline at end of file
+        }
+
+# --- STRATEGIE SYGNAŁOWE ---
+# Każda funkcja zwraca docelową ekspozycję (0 - gotówka, 1 - cały kapitał w akcjach) dla każdej świecy,
+# na podstawie kolumn StockAnalyzer (Close, EMA_long, MACD, MACD_signal, RSI).
+def buy_and_hold_signal(df):
+    return pd.Series(1.0, index=df.index)
+
+
+def macd_crossover_signal(df):
+    """W rynku, gdy MACD jest powyżej linii sygnału."""
+    return (df["MACD"] > df["MACD_signal"]).astype(float)
+
+
+def rsi_threshold_signal(df, lower=30, upper=70):
+    """Kupno przy wyprzedaniu (RSI < lower), sprzedaż przy wykupieniu (RSI > upper), pomiędzy - bez zmian."""
+    state = pd.Series(np.where(df["RSI"] < lower, 1.0, np.where(df["RSI"] > upper, 0.0, np.nan)), index=df.index)
+    return state.ffill().fillna(0.0)
+
+
+def ema_trend_signal(df):
+    """W rynku, gdy cena jest powyżej długiej średniej EMA."""
+    return (df["Close"] > df["EMA_long"]).astype(float)
+
+
+def technical_score_signal(df, threshold=1):
+    """W rynku, gdy wynik techniczny (werdykt algorytmu) osiąga co najmniej threshold."""
+    from src.analyzer import technical_score
+    score = technical_score(df["Close"], df["RSI"], df["EMA_long"], df["MACD"], df["MACD_signal"])
+    return pd.Series((score >= threshold).astype(float), index=df.index)
+
+
+STRATEGIES = {
+    "Kup i Trzymaj": buy_and_hold_signal,
+    "MACD (przecięcie linii sygnału)": macd_crossover_signal,
+    "RSI (30/70)": rsi_threshold_signal,
+    "Trend EMA (cena > EMA 26)": ema_trend_signal,
+    "Wynik techniczny (≥ 1)": technical_score_signal,
+}
+
+
+def performance_metrics(equity, periods_per_year=252):
+    """Metryki ryzyka i wyniku dla krzywej kapitału (Series indeksowany datą)."""
+    values = equity.to_numpy(dtype=float)
+    if len(values) < 2 or values[0] <= 0:
+        return {}
+    rets = values[1:] / values[:-1] - 1
+    std = rets.std(ddof=1) if len(rets) > 1 else 0.0
+    years = max((equity.index[-1] - equity.index[0]).days / 365.25, 1 / periods_per_year) \
+        if isinstance(equity.index, pd.DatetimeIndex) else len(rets) / periods_per_year
+    total = values[-1] / values[0] - 1
+    peak = np.maximum.accumulate(values)
+    return {
+        "total_return": total * 100,
+        "cagr": ((values[-1] / values[0]) ** (1 / years) - 1) * 100 if values[-1] > 0 else -100.0,
+        "volatility": std * np.sqrt(periods_per_year) * 100,
+        "sharpe_ratio": rets.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0,
+        "max_drawdown": (values / peak - 1).min() * 100,
+    }
+
+
+def affordable_shares(budget, price, commission, commission_min=0.0, fractional=True):
+    """
+    Liczba akcji do kupienia za budget razem z prowizją: procentową od wartości zakupu,
+    ale nie niższą niż commission_min (wtedy minimalna opłata odejmowana jest od budżetu przed zakupem).
+    """
+    fee = max(budget * commission / (1 + commission), commission_min)
+    shares = max(budget - fee, 0.0) / price
+    return shares if fractional else float(np.floor(shares))
+
+
+class SignalBacktester(SimpleBacktester):
+    """
+    Backtest strategii sterowanej sygnałami (docelowa ekspozycja 0-1 dla każdej świecy).
+    Sygnał ze świecy t jest realizowany po cenie zamknięcia świecy t + lag (domyślnie następnej).
+    Obsługuje prowizję (procent od wartości transakcji, z minimalną kwotą), poślizg cenowy
+    i ułamkowe akcje. Wielkość pozycji ustalana jest przy wejściu (ekspozycja x kapitał), a zmiana ekspozycji
+    w trakcie pozycji (np. 1.0 -> 0.5) dokupuje lub sprzedaje część akcji do ekspozycja x bieżący kapitał.
+    Krzywa kapitału liczona jest operacjami na tablicach - pętla obejmuje tylko kolejne zmiany ekspozycji.
+    """
+    def __init__(self, data: pd.DataFrame, initial_capital: float = 10000.0, commission: float = 0.001,
+                 commission_min: float = 0.0, slippage: float = 0.0005, fractional: bool = True, lag: int = 1):
+        super().__init__(data, initial_capital)
+        self.commission = commission
+        self.commission_min = commission_min
+        self.slippage = slippage
+        self.fractional = fractional
+        self.lag = lag
+
+    def _fee(self, notional):
+        return max(notional * self.commission, self.commission_min) if notional > 0 else 0.0
+
+    def _trade_record(self, trade, e, exit_price, value, is_open=False):
+        """Wiersz listy transakcji: od pierwszego zakupu do pełnego wyjścia (lub końca okresu)."""
+        s = trade["start"]
+        return {
+            "entry_date": self.data.index[s],
+            "exit_date": self.data.index[e],
+            "entry_price": trade["entry_price"],
+            "exit_price": exit_price,
+            "shares": trade["shares"],
+            "fees": trade["fees"],
+            "pnl": value - trade["capital_before"],
+            "return_pct": (value / trade["capital_before"] - 1) * 100,
+            "bars": int(e - s),
+            "open": is_open,
+        }
+
+    def run_signals(self, positions):
+        """
+        positions: Series/tablica docelowej ekspozycji (0-1) wyrównana z self.data.
+        Zwraca słownik: equity (Series), trades (DataFrame), metrics (słownik), benchmark (metryki Kup i Trzymaj).
+        """
+        if self.data is None or len(self.data) < 2:
+            return None
+
+        close = self.data["Close"].to_numpy(dtype=float)
+        n = len(close)
+        target = np.clip(np.nan_to_num(np.asarray(positions, dtype=float)), 0.0, 1.0)
+        # Realizacja z opóźnieniem - bez zaglądania w przyszłość
+        if self.lag:
+            target = np.concatenate([np.zeros(min(self.lag, n)), target[:-self.lag]])[:n]
+
+        in_market = target > 0
+        # Punkty zmiany docelowej ekspozycji: wejście, wyjście albo zmiana wielkości pozycji (np. 1.0 -> 0.5)
+        points = np.flatnonzero(np.diff(target, prepend=0.0) != 0)
+        bounds = np.append(points, n)
+
+        equity = np.full(n, np.nan)
+        equity[0] = self.initial_capital
+        cash, held = self.initial_capital, 0.0
+        trades, trade = [], None
+        for p, p_next in zip(bounds[:-1], bounds[1:]):
+            value = cash + held * close[p]
+            # Docelowa wartość pozycji: ekspozycja x bieżący kapitał (przy wejściu - x gotówka)
+            diff = value * target[p] - held * close[p]
+            if diff > 0:
+                buy_price = close[p] * (1 + self.slippage)
+                shares = affordable_shares(min(diff, cash), buy_price, self.commission, self.commission_min,
+                                           self.fractional)
+                fee = self._fee(shares * buy_price)
+                cost = shares * buy_price + fee
+                # Tolerancja na zaokrąglenia przy wejściu za cały kapitał
+                if shares > 0 and cost <= cash * (1 + 1e-9):
+                    if trade is None:
+                        trade = {"start": p, "entry_price": buy_price, "shares": shares, "fees": 0.0,
+                                 "capital_before": value}
+                    cash = max(cash - cost, 0.0)
+                    held += shares
+                    trade["fees"] += fee
+            elif diff < 0 and held > 0:
+                sell_price = close[p] * (1 - self.slippage)
+                # Wyjście sprzedaje całość, zmniejszenie ekspozycji - część pozycji
+                shares = held if target[p] == 0 else min(-diff / close[p], held)
+                if not self.fractional and target[p] > 0:
+                    shares = np.floor(shares)
+                fee = self._fee(shares * sell_price)
+                if shares > 0:
+                    cash += shares * sell_price - fee
+                    held -= shares
+                    trade["fees"] += fee
+                if held <= 0:
+                    held = 0.0
+                    trades.append(self._trade_record(trade, p, sell_price, cash))
+                    trade = None
+
+            # Wycena pozycji do następnej zmiany ekspozycji - jedna operacja na całym odcinku
+            equity[p:p_next] = cash + held * close[p:p_next]
+
+        if trade is not None:
+            # Pozycja otwarta do końca okresu - wyceniana po ostatnim kursie, bez kosztów wyjścia
+            trades.append(self._trade_record(trade, n - 1, close[-1], equity[-1], is_open=True))
+
+        # Poza rynkiem kapitał stoi w miejscu - uzupełniamy ostatnią znaną wartością
+        equity = pd.Series(equity, index=self.data.index).ffill()
+        trades = pd.DataFrame(trades, columns=["entry_date", "exit_date", "entry_price", "exit_price", "shares",
+                                               "fees", "pnl", "return_pct", "bars", "open"])
+
+        metrics = performance_metrics(equity)
+        closed = trades[~trades["open"].astype(bool)]
+        gains, losses = closed.loc[closed["pnl"] > 0, "pnl"].sum(), -closed.loc[closed["pnl"] < 0, "pnl"].sum()
+        metrics.update({
+            "final_value": float(equity.iloc[-1]),
+            "profit": float(equity.iloc[-1] - self.initial_capital),
+            "trades": len(trades),
+            "win_rate": (closed["pnl"] > 0).mean() * 100 if len(closed) else 0.0,
+            "profit_factor": gains / losses if losses > 0 else np.inf if gains > 0 else 0.0,
+            "fees": float(trades["fees"].sum()),
+            "exposure": float(in_market.mean() * 100),
+        })
+        benchmark = performance_metrics(pd.Series(close / close[0] * self.initial_capital, index=self.data.index))
+        return {"equity": equity, "trades": trades, "metrics": metrics, "benchmark": benchmark}
+
+    def run_named(self, name, **params):
+        """Backtest strategii z rejestru STRATEGIES."""
+        return self.run_signals(STRATEGIES[name](self.data, **params))
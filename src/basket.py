@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+from src.backtester import performance_metrics
+from src.fx import get_fx_rates
+from src.price_matrix import PriceMatrix
+
+# Harmonogram rebalansowania: nazwa -> co ile miesięcy (None - tylko wg progu odchylenia lub wcale)
+REBALANCE_FREQUENCIES = {
+    "Brak": None,
+    "Miesięczne": 1,
+    "Kwartalne": 3,
+    "Półroczne": 6,
+    "Roczne": 12,
+}
+
+# Ile sesji naraz sprawdzamy pod kątem przekroczenia progu odchylenia wag
+DRIFT_CHUNK = 64
+
+
+def rebalance_points(dates, months):
+    """Pozycje pierwszych sesji każdego nowego okresu (co months miesięcy kalendarzowych) - bez pierwszej sesji."""
+    if not months or len(dates) < 2:
+        return np.array([], dtype=np.int64)
+    dates = pd.DatetimeIndex(dates)
+    periods = np.asarray((dates.year * 12 + dates.month - 1) // months)
+    return np.flatnonzero(periods[1:] != periods[:-1]) + 1
+
+
+def convert_matrix(matrix, currencies, to_currency="PLN", fx=None):
+    """
+    Przelicza macierz cen (PriceMatrix) na walutę docelową kursem z dnia każdej sesji.
+    currencies: waluty notowań w kolejności kolumn (np. z InstrumentIndex.currencies).
+    """
+    fx = fx or get_fx_rates(to_currency)
+    values = np.array(matrix.values, dtype=np.float64)
+    for currency in set(currencies):
+        cols = [j for j, c in enumerate(currencies) if c == currency]
+        rates = fx.rates([currency] * len(matrix.dates), matrix.dates)
+        values[:, cols] *= rates[:, None]
+    return PriceMatrix(values, matrix.dates, matrix.tickers)
+
+
+class BasketBacktester:
+    """
+    Backtest koszyka aktywów z docelowymi wagami (np. BASKET_1_STRATEGY) i okresowym rebalansowaniem.
+    Rebalansowanie następuje wg harmonogramu (frequency - co ile miesięcy) i/lub po przekroczeniu progu odchylenia
+    dowolnej wagi od docelowej (threshold, w punktach procentowych / 100). Koszty transakcyjne
+    (prowizja + poślizg) naliczane są od obrotu przy każdym rebalansowaniu.
+    Pomiędzy rebalansowaniami liczba jednostek jest stała, więc wycena to jedno mnożenie macierzy.
+    """
+    def __init__(self, prices, weights, initial_capital=10000.0, frequency=3, threshold=None,
+                 commission=0.001, slippage=0.0005):
+        matrix = prices if isinstance(prices, PriceMatrix) else PriceMatrix.from_frame(prices)
+        weights = {t: w for t, w in weights.items() if t in matrix.tickers}
+        matrix = matrix.slice(tickers=list(weights)).align("ffill")
+        # Start od pierwszej sesji, na której notowane są wszystkie składniki
+        complete = ~np.isnan(matrix.values).any(axis=1)
+        first = int(np.argmax(complete)) if complete.any() else len(complete)
+        self.prices = np.ascontiguousarray(matrix.values[first:], dtype=np.float64)
+        self.dates = matrix.dates[first:]
+        self.tickers = matrix.tickers
+
+        target = np.array([weights[t] for t in self.tickers], dtype=np.float64)
+        self.target = target / target.sum() if target.sum() > 0 else target
+        self.initial_capital = initial_capital
+        self.frequency = frequency
+        self.threshold = threshold
+        self.cost_rate = commission + slippage
+
+    def _trade(self, value, units, row):
+        """Rebalans do wag docelowych po cenach z wiersza row - zwraca (nowe jednostki, obrót, koszty)."""
+        price = self.prices[row]
+        turnover = float(np.abs(value * self.target - units * price).sum())
+        fees = turnover * self.cost_rate
+        return (value - fees) * self.target / price, turnover, fees
+
+    def _next_drift(self, units, start, stop):
+        """Pierwsza sesja z przedziału (start, stop), na której odchylenie wag przekracza próg."""
+        for lo in range(start + 1, stop, DRIFT_CHUNK):
+            block = self.prices[lo:min(lo + DRIFT_CHUNK, stop)] * units
+            drift = np.abs(block / block.sum(axis=1, keepdims=True) - self.target).max(axis=1)
+            hits = np.flatnonzero(drift > self.threshold)
+            if len(hits):
+                return lo + int(hits[0])
+        return stop
+
+    def run(self):
+        """
+        Zwraca słownik: equity (Series wartości koszyka), weights (DataFrame bieżących wag),
+        rebalances (DataFrame: data, obrót, koszty), metrics (metryki + liczba rebalansów i koszty).
+        """
+        n = len(self.dates)
+        if n < 2 or not len(self.tickers):
+            return None
+
+        calendar = list(rebalance_points(self.dates, self.frequency)) + [n]
+        equity = np.empty(n)
+        units_path = np.empty_like(self.prices)
+        events = []
+
+        units, turnover, fees = self._trade(self.initial_capital, np.zeros(len(self.tickers)), 0)
+        events.append((self.dates[0], turnover, fees))
+        start, k = 0, 0
+        while start < n:
+            while calendar[k] <= start:
+                k += 1
+            stop = calendar[k]
+            if self.threshold:
+                stop = self._next_drift(units, start, stop)
+
+            # Stała liczba jednostek na całym odcinku - wycena wektorowo
+            equity[start:stop] = self.prices[start:stop] @ units
+            units_path[start:stop] = units
+            if stop >= n:
+                break
+
+            units, turnover, fees = self._trade(float(self.prices[stop] @ units), units, stop)
+            events.append((self.dates[stop], turnover, fees))
+            start = stop
+
+        holdings = self.prices * units_path
+        equity = pd.Series(equity, index=self.dates)
+        weights = pd.DataFrame(holdings / holdings.sum(axis=1, keepdims=True), index=self.dates, columns=self.tickers)
+        rebalances = pd.DataFrame(events, columns=["date", "turnover", "fees"])
+
+        metrics = performance_metrics(equity)
+        metrics.update({
+            "final_value": float(equity.iloc[-1]),
+            "profit": float(equity.iloc[-1] - self.initial_capital),
+            "rebalances": len(rebalances) - 1,
+            "fees": float(rebalances["fees"].sum()),
+            "turnover": float(rebalances["turnover"].iloc[1:].sum()),
+        })
+        return {"equity": equity, "weights": weights, "rebalances": rebalances, "metrics": metrics}
@@ -37,6 +37,9 @@ MARKET_INDICES = {
     "🥇 Złoto": "GC=F"
 }
 
+# Co ile sekund wątek w tle odświeża migawkę "Pulsu Rynku"
+MARKET_PULSE_REFRESH_SECONDS = 60
+
 # --- KATEGORIE ---
 def assign_category(ticker):
     """Zwraca kategorię aktywa na podstawie symbolu."""
@@ -56,4 +59,29 @@ BASKET_1_STRATEGY = {
 BASKET_2_STRATEGY = {
     "IBCJ.DE": 0.30,
     "IS3N.DE": 0.70
-}
\ No newline at end of file
+}
+
+# --- INSTRUMENTY (waluta / giełda) ---
+# Domyślna giełda i waluta notowań wg sufiksu tickera - używane, gdy dostawca nie zwróci metadanych
+EXCHANGE_SUFFIXES = {
+    ".WA": {"exchange": "GPW", "currency": "PLN"},
+    ".DE": {"exchange": "XETRA", "currency": "EUR"},
+    ".F": {"exchange": "Frankfurt", "currency": "EUR"},
+    ".PA": {"exchange": "Euronext Paris", "currency": "EUR"},
+    ".AS": {"exchange": "Euronext Amsterdam", "currency": "EUR"},
+    ".MI": {"exchange": "Borsa Italiana", "currency": "EUR"},
+    ".SW": {"exchange": "SIX", "currency": "CHF"},
+    ".L": {"exchange": "LSE", "currency": "GBp"},
+}
+
+# Wymuszone waluty notowań - mają pierwszeństwo przed metadanymi dostawcy
+# (ETF-y z Londynu notowane w USD, ETF-y z Xetry zawsze w EUR)
+CURRENCY_OVERRIDES = {
+    "CSPX.L": "USD",
+    "IWDA.L": "USD",
+    "VWRA.L": "USD",
+    "CNDX.L": "USD",
+    "IBCJ.DE": "EUR",
+    "IS3N.DE": "EUR",
+    "GC=F": "USD",
+}
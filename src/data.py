@@ -1,6 +1,130 @@
+import threading
+from concurrent.futures import Future
+
 import streamlit as st
-import yfinance as yf
 import pandas as pd
+import numpy as np
+from src.price_store import get_price_store
+from src.price_matrix import PriceMatrix
+from src.analyzer import RESAMPLE_RULES, resample_ohlcv
+from src.metadata import get_metadata_cache
+from src.fx import get_fx_rates
+
+# Wspólny dla całej aplikacji magazyn notowań na dysku
+_price_store = get_price_store()
+
+# Jak długo zbieramy pojedyncze zapytania, zanim wyślemy je jednym zapytaniem zbiorczym
+BATCH_WINDOW_SECONDS = 0.05
+# Paczka z tyloma tickerami wysyłana jest od razu, bez czekania na koniec okna
+BATCH_MAX_TICKERS = 50
+
+
+class SingleFlight:
+    """
+    Łączy identyczne zapytania wykonywane równolegle (np. kilka sesji Streamlit
+    otwierających ten sam ticker) - pierwsze wywołanie pobiera dane,
+    pozostałe czekają na jego wynik zamiast pytać API ponownie.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            # Każdy oczekujący dostaje własną kopię - wywołujący dopisują kolumny do DataFrame
+            result = future.result()
+            return result.copy() if isinstance(result, (pd.DataFrame, pd.Series)) else result
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result()
+
+
+class HistoryBatcher:
+    """
+    Zbiera pojedyncze zapytania o historię z krótkiego okna czasowego
+    i wysyła je jako jedno zapytanie wielotickerowe (osobno dla każdej pary okres/interwał).
+    Okno otwierane jest tylko, gdy równolegle trwa już inne pobranie - pojedyncze zapytanie
+    idzie od razu, a pełna paczka (max_batch tickerów) wysyłana jest bez czekania na koniec okna.
+    """
+    def __init__(self, store, window=BATCH_WINDOW_SECONDS, max_batch=BATCH_MAX_TICKERS):
+        self.store = store
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._active = 0
+
+    def submit(self, ticker, period, interval):
+        """Zwraca Future z DataFrame OHLCV dla tickera."""
+        group = (period, interval)
+        with self._lock:
+            batch = self._pending.get(group)
+            leader = batch is None
+            if leader:
+                batch = self._pending[group] = {"futures": {}, "full": threading.Event()}
+                busy = self._active > 0
+                self._active += 1
+            future = batch["futures"].setdefault(ticker, Future())
+            if len(batch["futures"]) >= self.max_batch:
+                batch["full"].set()
+
+        # Pierwsze zapytanie w oknie czeka na pozostałe (tylko przy równoległym ruchu) i wysyła całą paczkę
+        if leader:
+            try:
+                if busy:
+                    batch["full"].wait(self.window)
+                with self._lock:
+                    self._pending.pop(group)
+                self._flush(batch["futures"], period, interval)
+            finally:
+                with self._lock:
+                    self._active -= 1
+        return future
+
+    def _flush(self, batch, period, interval):
+        try:
+            frames = self.store.get_history_batch(list(batch), period=period, interval=interval)
+        except BaseException as e:
+            for future in batch.values():
+                future.set_exception(e)
+            return
+        for t, future in batch.items():
+            future.set_result(frames.get(t, pd.DataFrame()))
+
+
+_single_flight = SingleFlight()
+_history_batcher = HistoryBatcher(_price_store)
+
+# cache_resource: jedna, współdzielona (tylko do odczytu) instancja dla wszystkich sesji
+@st.cache_resource(ttl=3600)
+def _shared_price_matrix(tickers, period, dtype):
+    try:
+        frames = _single_flight.do(
+            ("matrix", tickers, period),
+            lambda: _price_store.get_history_batch(list(tickers), period=period)
+        )
+        matrix = PriceMatrix.from_history(frames, dtype=np.dtype(dtype))
+        # Instancja jest współdzielona między sesjami - zapis w miejscu (także w wycinkach
+        # i DataFrame z to_frame) kończy się błędem zamiast zmienić dane innym stronom
+        matrix.values.flags.writeable = False
+        return matrix
+    except Exception as e:
+        st.error(f"Błąd pobierania danych zbiorczych: {e}")
+        return PriceMatrix.from_history({})
+
 
 class StockData:
     """
@@ -15,23 +139,25 @@ class StockData:
         """
         Pobiera historyczne dane dla podanego tickera.
         Używa cache Streamlit, aby nie pobierać tego samego wielokrotnie.
-        Cache wygasa po 24 godzinach.
+        Cache wygasa po 24 godzinach, a po jego wygaśnięciu (lub restarcie serwera)
+        dane czytane są z magazynu na dysku i uzupełniane tylko o nowe świece.
+        Świece tygodniowe i miesięczne powstają lokalnie z historii dziennej.
         """
         try:
-            #Pobieranie danych z Yahoo Finance
-            df = yf.download(ticker, period=period, interval=interval, progress=False)
+            #Interwał tygodniowy/miesięczny budujemy lokalnie z danych dziennych (bez zapytania do API)
+            if interval in RESAMPLE_RULES:
+                return resample_ohlcv(_self.get_data(ticker, period=period, interval="1d"), interval)
+
+            #Najpierw lokalny magazyn - z Yahoo Finance dociągane są tylko brakujące świece
+            #Identyczne równoległe zapytania dzielą jedno pobranie, a różne tickery są łączone w paczki
+            df = _single_flight.do(
+                ("history", ticker, period, interval),
+                lambda: _history_batcher.submit(ticker, period, interval).result()
+            )
 
             #Sprawdzenie czy API dziala
             if df.empty:
                 return pd.DataFrame()
-
-            #Naprawa nazw kolumn
-            if isinstance(df.columns, pd.MultiIndex): #Czy wymaga naprawy
-                #Spłaszczanie nagłówków jeśli są wielopoziomowe
-                df.columns = df.columns.get_level_values(0)
-            #Usuwanie strefy czasowej z daty (dla wykresów)
-            if df.index.tzinfo is not None:
-                df.index = df.index.tz_localize(None)
             return df
 
         except Exception as e:
@@ -46,38 +172,38 @@ class StockData:
         Obsługuje MultiIndex (nowe yfinance).
         """
         try:
-            if start_date:
-                df = yf.download(ticker_list, start=start_date, progress=False)
-            else:
-                df = yf.download(ticker_list, period=period, progress=False)
-            
-            # Obsługa MultiIndex (nowe yfinance)
-            if not df.empty:
-                if isinstance(df.columns, pd.MultiIndex):
-                    # Sprawdzamy poziomy kolumn
-                    if 'Close' in df.columns.get_level_values(0):
-                        return df.xs('Close', axis=1, level=0)
-                    elif 'Close' in df.columns.get_level_values(1):
-                         return df.xs('Close', axis=1, level=1)
-                else:
-                    if 'Close' in df.columns:
-                        return df['Close']
-            
-            # Fallback
-            if 'Close' in df: return df['Close']
-            return df
+            # Ceny zamknięcia z lokalnego magazynu (brakujące świece pobierane zbiorczo)
+            frames = _single_flight.do(
+                ("batch", tuple(ticker_list), start_date, period),
+                lambda: _price_store.get_history_batch(list(ticker_list), period=period, start=start_date)
+            )
+            return PriceMatrix.from_history(frames).to_frame()
         except Exception as e:
             st.error(f"Błąd pobierania danych zbiorczych: {e}")
             return pd.DataFrame()
 
+    def get_price_matrix(self, ticker_list, period="2y", dtype="float32"):
+        """
+        Zwraca wspólną macierz cen zamknięcia (PriceMatrix) dla zestawu tickerów (kolumny posortowane).
+        Strony wycinają z niej potrzebny zakres dat zamiast pobierać i wyrównywać dane osobno.
+        """
+        # Klucz cache to zestaw tickerów - inna kolejność lub duplikaty nie tworzą drugiej macierzy
+        return _shared_price_matrix(tuple(sorted(set(ticker_list))), period, dtype)
+
+    @staticmethod
+    def clear_price_matrix():
+        """Usuwa współdzielone macierze cen (np. po wymuszonym odświeżeniu danych)."""
+        _shared_price_matrix.clear()
+
     def get_ticker_info(self, ticker):
         """
         Pobiera rozszerzone informacje o spółce: sektor, P/E, dywidenda, www.
         Zawiera wszystkie pola potrzebne do Radaru Fundamentalnego.
+        Dane pochodzą z trwałego cache metadanych (src/metadata.py) - przeterminowane
+        pola są zwracane od razu i odświeżane w tle.
         """
         try:
-            t = yf.Ticker(ticker)
-            info = t.info
+            info = get_metadata_cache().get(ticker)
 
             return {
                 # Podstawowe
@@ -107,12 +233,10 @@ class StockData:
 
 
 # --- FUNKCJE POMOCNICZE (GLOBALNE) ---
-from datetime import datetime, timedelta
-
-@st.cache_data(ttl=3600)
 def get_exchange_rate(from_currency, to_currency="PLN", date_obj=None):
     """
-    Pobiera kurs waluty. Jeśli podano datę, próbuje pobrać kurs historyczny.
+    Pobiera kurs waluty. Jeśli podano datę, zwraca kurs z tej sesji (lub ostatniej wcześniejszej).
+    Korzysta ze wspólnej tabeli kursów (src/fx.py) - pełna historia pary pobierana jest raz.
     """
     if from_currency == to_currency or not from_currency:
         return 1.0
@@ -122,34 +246,52 @@ def get_exchange_rate(from_currency, to_currency="PLN", date_obj=None):
         from_currency = "GBP"
         # Cena w pensach to 1/100 funta, ale tutaj zwracamy sam kurs waluty
         # Przeliczenie ceny powinno nastąpić przed wywołaniem lub po.
-        # W 2_Portfel.py jest logika: price = price / 100
-        
-    ticker = f"{from_currency}{to_currency}=X"
+        # Do przeliczania całych kolumn z pensami służy get_fx_rates().convert(..., "GBp")
 
     try:
-        if date_obj and date_obj < datetime.now().date():
-            # Kurs historyczny
-            end_date = date_obj + timedelta(days=5) # Zakres +5 dni (weekendy)
-            hist = yf.Ticker(ticker).history(start=date_obj, end=end_date)
-            if not hist.empty:
-                return float(hist['Close'].iloc[0])
-            return 1.0 # Fallback
-        else:
-            # Kurs bieżący
-            # Używamy fast_info dla szybkości
-            data = yf.Ticker(ticker).fast_info
-            price = data.last_price
-            return float(price) if price else 1.0
+        return get_fx_rates(to_currency).rate(from_currency, date_obj)
     except:
         return 1.0
 
+def get_historical_prices(requests, max_gap_days=5):
+    """
+    Zbiorczo wyznacza ceny zamknięcia dla wielu par (ticker, data).
+    Historia wszystkich tickerów pobierana jest raz (jednym zapytaniem do magazynu notowań,
+    od najwcześniejszej potrzebnej daty), a każda para rozwiązywana jest złączeniem "as-of":
+    pierwsza sesja w dniu zakupu lub po nim, nie później niż max_gap_days dni (weekendy, święta).
+    Zwraca słownik {(ticker, data): cena lub None}.
+    """
+    requests = list(dict.fromkeys(requests))
+    result = {key: None for key in requests}
+    if not requests:
+        return result
+
+    by_ticker = {}
+    for t, d in requests:
+        by_ticker.setdefault(t, []).append(d)
+
+    try:
+        start = min(pd.Timestamp(d) for _, d in requests)
+        frames = _price_store.get_history_batch(list(by_ticker), start=start)
+    except Exception:
+        return result
+
+    gap = np.timedelta64(max_gap_days, "D")
+    for t, dates in by_ticker.items():
+        hist = frames.get(t)
+        if hist is None or hist.empty:
+            continue
+        closes = hist["Close"].dropna()
+        hist_dates = closes.index.to_numpy(dtype="datetime64[ns]")
+        hist_values = closes.to_numpy(dtype=float)
+
+        wanted = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+        idx = np.searchsorted(hist_dates, wanted, side="left")
+        for d, w, i in zip(dates, wanted, idx):
+            if i < len(hist_dates) and hist_dates[i] < w + gap:
+                result[(t, d)] = float(hist_values[i])
+    return result
+
 def get_historical_price(ticker, date_obj):
     """Pobiera cenę zamknięcia z konkretnego dnia (z buforem na weekendy)."""
-    try:
-        end_date = date_obj + timedelta(days=5)
-        hist = yf.Ticker(ticker).history(start=date_obj, end=end_date)
-        if not hist.empty:
-            return float(hist['Close'].iloc[0])
-        return None
-    except:
-        return None
+    return get_historical_prices([(ticker, date_obj)]).get((ticker, date_obj))
@@ -1,4 +1,5 @@
 import sqlite3
+import json
 import pandas as pd
 from datetime import datetime
 
@@ -99,3 +100,137 @@ class WatchlistDB:
         except Exception:
             pass
         return []
+
+
+class MetadataDB:
+    """Trwały cache metadanych spółek (Yahoo .info), podzielonych na grupy pól."""
+    def __init__(self, db_name="metadata.db"):
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.create_table()
+
+    def create_table(self):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ticker_metadata (
+                source TEXT NOT NULL,
+                ticker TEXT NOT NULL,
+                field_group TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (source, ticker, field_group)
+            )
+        """)
+        self.conn.commit()
+
+    def save_groups(self, source, ticker, groups, fetched_at):
+        """Zapisuje (nadpisuje) grupy pól: słownik nazwa_grupy -> słownik pól."""
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO ticker_metadata (source, ticker, field_group, payload, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(source, ticker, name, json.dumps(fields, default=str), fetched_at) for name, fields in groups.items()]
+        )
+        self.conn.commit()
+
+    def load_groups(self, source, tickers):
+        """Zwraca słownik ticker -> {nazwa_grupy: (pola, fetched_at)}."""
+        tickers = list(tickers)
+        result = {t: {} for t in tickers}
+        if not tickers:
+            return result
+        placeholders = ",".join("?" * len(tickers))
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"SELECT ticker, field_group, payload, fetched_at FROM ticker_metadata "
+            f"WHERE source = ? AND ticker IN ({placeholders})",
+            [source] + tickers
+        )
+        for ticker, group, payload, fetched_at in cursor.fetchall():
+            result[ticker][group] = (json.loads(payload), fetched_at)
+        return result
+
+    def list_tickers(self, source):
+        """Wszystkie tickery, dla których w bazie są metadane z danego źródła."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT DISTINCT ticker FROM ticker_metadata WHERE source = ?", (source,))
+        return [row[0] for row in cursor.fetchall()]
+
+
+class BacktestDB:
+    """Trwały magazyn wyników backtestów (metryki jako JSON, krzywa kapitału i transakcje jako blob)."""
+    def __init__(self, db_name="backtests.db"):
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.create_table()
+
+    def create_table(self):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS backtest_runs (
+                run_key TEXT PRIMARY KEY,
+                strategy TEXT NOT NULL,
+                params TEXT NOT NULL,
+                tickers TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                data_hash TEXT NOT NULL,
+                data_start TEXT,
+                data_end TEXT,
+                metrics TEXT NOT NULL,
+                result BLOB NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_backtest_tickers ON backtest_runs (tickers, data_end)")
+        self.conn.commit()
+
+    def save_run(self, run_key, strategy, params, tickers, interval, data_hash, data_start, data_end, metrics, result):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO backtest_runs (run_key, strategy, params, tickers, interval, data_hash, "
+            "data_start, data_end, metrics, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_key, strategy, json.dumps(params, sort_keys=True, default=str), tickers, interval, data_hash,
+             data_start, data_end, json.dumps(metrics, default=float), result)
+        )
+        self.conn.commit()
+
+    def load_result(self, run_key):
+        """Zwraca zapisany blob wyniku albo None."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT result FROM backtest_runs WHERE run_key = ?", (run_key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def list_runs(self, strategy=None, tickers=None, interval=None):
+        """Zapisane przebiegi (bez blobów wyników), od najnowszego."""
+        query = ("SELECT run_key, strategy, params, tickers, interval, data_start, data_end, metrics, created_at "
+                 "FROM backtest_runs WHERE 1 = 1")
+        args = []
+        if interval is not None:
+            query += " AND interval = ?"
+            args.append(interval)
+        if strategy is not None:
+            query += " AND strategy = ?"
+            args.append(strategy)
+        if tickers is not None:
+            query += " AND tickers = ?"
+            args.append(tickers)
+        return pd.read_sql(query + " ORDER BY created_at DESC", self.conn, params=args)
+
+    def delete_stale(self, tickers, interval, data_hash, data_start, data_end):
+        """
+        Usuwa przebiegi dla tych samych tickerów i interwału świec policzone na nieaktualnych notowaniach:
+        kończących się wcześniej albo obejmujących ten sam zakres dat, ale z innymi cenami.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "DELETE FROM backtest_runs WHERE tickers = ? AND interval = ? AND data_hash != ? "
+            "AND (data_end < ? OR (data_start = ? AND data_end = ?))",
+            (tickers, interval, data_hash, data_end, data_start, data_end)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def delete_older_than(self, cutoff):
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM backtest_runs WHERE created_at < ?", (cutoff,))
+        self.conn.commit()
+        return cursor.rowcount
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from src.metadata import get_metadata_cache
+
+# Osie Radaru Fundamentalnego (kolejność jak na wykresie)
+RADAR_CATEGORIES = ['Wycena (Taniość)', 'Zyskowność', 'Efektywność (ROE)', 'Bezpieczeństwo', 'Potencjał Wzrostu']
+RADAR_FIELDS = ["trailingPE", "profitMargins", "returnOnEquity", "debtToEquity", "currentPrice", "targetMeanPrice"]
+
+
+def _column(meta, field):
+    if field not in meta.columns:
+        return pd.Series(np.nan, index=meta.index)
+    return pd.to_numeric(meta[field], errors="coerce")
+
+
+def radar_frame(meta):
+    """
+    Oceny 0-100 dla osi Radaru Fundamentalnego dla wielu spółek naraz.
+    meta: DataFrame (wiersz na ticker, kolumny jak w Yahoo .info). Brakujące lub zerowe
+    pola dostają wartości domyślne jak w dotychczasowej ocenie jednej spółki - m.in. brak ceny
+    bieżącej to cena 1, a brak ceny docelowej to cena bieżąca. Zwraca DataFrame: kolumny RADAR_CATEGORIES.
+    """
+    pe = _column(meta, "trailingPE").replace(0, np.nan).fillna(50)
+    margin = _column(meta, "profitMargins").fillna(0)
+    roe = _column(meta, "returnOnEquity").fillna(0)
+    debt_eq = _column(meta, "debtToEquity").replace(0, np.nan).fillna(100)
+    current_p = _column(meta, "currentPrice").fillna(1)
+    target_p = _column(meta, "targetMeanPrice").fillna(current_p)
+
+    # Potencjał wzrostu: odległość ceny docelowej analityków od bieżącej (cena zerowa - neutralne 50)
+    known = (current_p != 0) & (target_p != 0)
+    upside = (target_p - current_p) / current_p.where(known)
+
+    scores = pd.DataFrame({
+        RADAR_CATEGORIES[0]: (100 - pe * 1.5).clip(0, 100),
+        RADAR_CATEGORIES[1]: np.where(margin > 0.2, 90, (margin * 100 * 2).clip(0, 100)),
+        RADAR_CATEGORIES[2]: (roe * 100 * 2).clip(0, 100),
+        RADAR_CATEGORIES[3]: (100 - debt_eq / 2).clip(0, 100),
+        RADAR_CATEGORIES[4]: (50 + upside * 100).clip(0, 100).where(known, 50),
+    }, index=meta.index)
+    scores["Ocena"] = scores[RADAR_CATEGORIES].mean(axis=1)
+    return scores
+
+
+def radar_scores(info):
+    """Oceny osi radaru dla jednej spółki (słownik metadanych, np. z StockData.get_ticker_info)."""
+    row = {f: info[f] for f in RADAR_FIELDS if f in info}
+    # Cena podana jako None (np. z StockData.get_ticker_info) daje neutralne 50 - jak cena zerowa,
+    # a nie jak brak pola (cena 1)
+    for f in ("currentPrice", "targetMeanPrice"):
+        if f in row and row[f] is None:
+            row[f] = 0
+    row = radar_frame(pd.DataFrame([row])).iloc[0]
+    return {category: float(row[category]) for category in RADAR_CATEGORIES}
+
+
+def sector_percentiles(scores, sectors):
+    """
+    Pozycja spółki wśród spółek z tego samego sektora: percentyl (0-100) każdej oceny w sektorze.
+    scores: wynik radar_frame, sectors: Series ticker -> sektor.
+    """
+    sectors = sectors.reindex(scores.index).fillna("Brak danych")
+    return scores.groupby(sectors).rank(pct=True) * 100
+
+
+def peer_comparison(ticker, meta=None):
+    """
+    Porównanie spółki z konkurencją z tego samego sektora na podstawie zapisanej migawki metadanych
+    (bez zapytań o .info konkurentów). Zwraca słownik: sector, peers (liczba spółek w sektorze),
+    scores (oceny spółki), sector_median (mediana sektora), percentiles (percentyle w sektorze).
+    """
+    meta = get_metadata_cache().snapshot() if meta is None else meta
+    if ticker not in meta.index:
+        return None
+
+    sectors = meta["sector"] if "sector" in meta.columns else pd.Series(index=meta.index, dtype=object)
+    sector = sectors.get(ticker)
+    if pd.isna(sector):
+        return None
+
+    peers = meta[sectors == sector]
+    scores = radar_frame(peers)
+    percentiles = sector_percentiles(scores, sectors)
+    return {
+        "sector": sector,
+        "peers": len(peers),
+        "scores": scores.loc[ticker],
+        "sector_median": scores.median(),
+        "percentiles": percentiles.loc[ticker],
+    }
@@ -0,0 +1,144 @@
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from src.price_store import get_price_store
+from src.providers import fx_ticker
+
+# Waluty notowane w podjednostkach: kod -> (waluta bazowa, mnożnik)
+# Giełda londyńska podaje część cen w pensach (GBp / GBX) - 1 GBp = 0.01 GBP
+SUBUNIT_CURRENCIES = {
+    "GBp": ("GBP", 0.01),
+    "GBX": ("GBP", 0.01),
+    "ZAc": ("ZAR", 0.01),
+    "ILA": ("ILS", 0.01),
+}
+
+
+def normalize_currency(currency):
+    """Zwraca (waluta bazowa, mnożnik) - np. "GBp" -> ("GBP", 0.01)."""
+    if not currency or not isinstance(currency, str):
+        return None, 1.0
+    return SUBUNIT_CURRENCIES.get(currency, (currency, 1.0))
+
+
+class FxRates:
+    """
+    Tabela kursów walut względem jednej waluty docelowej (domyślnie PLN).
+    Pełna dzienna historia każdej pary jest wczytywana raz (z magazynu notowań)
+    i trzymana w pamięci, a kursy dla dowolnych dat wyznaczane są wektorowo
+    metodą "as-of" (ostatnia sesja nie późniejsza niż dana data).
+    """
+    def __init__(self, to_currency="PLN", store=None, refresh_minutes=60, retry_seconds=60):
+        self.to_currency = to_currency
+        self.store = store or get_price_store()
+        self.refresh = pd.Timedelta(minutes=refresh_minutes)
+        # Po nieudanym pobraniu kolejna próba już po retry_seconds, a nie po pełnym refresh
+        self.retry = pd.Timedelta(seconds=retry_seconds)
+        # Waluta -> (ważne do, historia kursu)
+        self._history = {}
+        # Waluta -> Future trwającego pobrania - inne wątki czekają na nie zamiast pobierać ponownie
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def history(self, currency):
+        """Zwraca pełną historię kursu (Series indeksowany datą) dla waluty bazowej."""
+        with self._lock:
+            cached = self._history.get(currency)
+            if cached is not None and pd.Timestamp.now() < cached[0]:
+                return cached[1]
+            future = self._inflight.get(currency)
+            owner = future is None
+            if owner:
+                future = self._inflight[currency] = Future()
+        if not owner:
+            return future.result()
+
+        # Pobranie poza blokadą - wolna para nie wstrzymuje kursów innych walut
+        series = pd.Series(dtype=float)
+        try:
+            df = self.store.get_history(fx_ticker(currency, self.to_currency), period="max")
+            if not df.empty:
+                series = df["Close"].dropna().sort_index()
+        except Exception as e:
+            print(f"Błąd pobierania kursów {currency}/{self.to_currency}: {e}")
+        finally:
+            with self._lock:
+                if series.empty:
+                    # Nieudane pobranie: zostaje poprzednia historia (jeśli była), ponowienie po krótkim czasie
+                    if cached is not None:
+                        series = cached[1]
+                    self._history[currency] = (pd.Timestamp.now() + self.retry, series)
+                else:
+                    self._history[currency] = (pd.Timestamp.now() + self.refresh, series)
+                del self._inflight[currency]
+            future.set_result(series)
+        return series
+
+    def rates(self, currencies, dates=None):
+        """
+        Zwraca tablicę kursów (za 1 jednostkę podanej waluty) dla par (waluta, data).
+        Brak daty (None/NaT) oznacza kurs bieżący. Waluty w pensach są przeliczane automatycznie.
+        Dla nieznanej waluty lub braku notowań kurs wynosi 1.0 (jak dotychczas w get_exchange_rate).
+        """
+        currencies = pd.Series(currencies, dtype=object).reset_index(drop=True)
+        n = len(currencies)
+        if dates is None:
+            date_values = np.full(n, np.datetime64("NaT"), dtype="datetime64[ns]")
+        else:
+            date_values = pd.to_datetime(pd.Series(dates).reset_index(drop=True)).to_numpy(dtype="datetime64[ns]")
+
+        out = np.ones(n)
+        for currency in currencies.dropna().unique():
+            mask = (currencies == currency).to_numpy()
+            base, factor = normalize_currency(currency)
+            if base is None or base == self.to_currency:
+                out[mask] = factor
+                continue
+
+            hist = self.history(base)
+            if hist.empty:
+                out[mask] = factor
+                continue
+
+            hist_dates = hist.index.to_numpy(dtype="datetime64[ns]")
+            hist_values = hist.to_numpy(dtype=float)
+            d = date_values[mask]
+            # Indeks ostatniej sesji <= data; daty sprzed początku historii dostają pierwszy kurs
+            idx = np.clip(np.searchsorted(hist_dates, d, side="right") - 1, 0, len(hist_values) - 1)
+            idx[np.isnat(d)] = len(hist_values) - 1
+            out[mask] = hist_values[idx] * factor
+        return out
+
+    def rate(self, currency, date=None):
+        """Kurs pojedynczej waluty na dany dzień (lub bieżący)."""
+        return float(self.rates([currency], None if date is None else [date])[0])
+
+    def convert(self, values, currencies, dates=None):
+        """
+        Przelicza kwoty w walutach źródłowych na walutę docelową w jednym kroku.
+        values, currencies i dates mogą być Series, tablicami lub skalarami (rozgłaszanymi).
+        """
+        index = values.index if isinstance(values, pd.Series) else None
+        amounts = np.asarray(values, dtype=float)
+        n = amounts.size
+        if isinstance(currencies, str) or currencies is None:
+            currencies = [currencies] * n
+        if dates is not None and np.ndim(dates) == 0:
+            dates = [dates] * n
+        result = amounts * self.rates(currencies, dates)
+        return pd.Series(result, index=index) if index is not None else result
+
+
+_fx_rates = {}
+_fx_rates_lock = threading.Lock()
+
+
+def get_fx_rates(to_currency="PLN"):
+    """Zwraca wspólną dla procesu tabelę kursów dla waluty docelowej."""
+    with _fx_rates_lock:
+        if to_currency not in _fx_rates:
+            _fx_rates[to_currency] = FxRates(to_currency)
+        return _fx_rates[to_currency]
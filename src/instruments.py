@@ -0,0 +1,120 @@
+import threading
+
+from src.config import EXCHANGE_SUFFIXES, CURRENCY_OVERRIDES
+from src.fx import normalize_currency
+from src.metadata import get_metadata_cache
+
+# Typ instrumentu z Yahoo (quoteType) -> klasa aktywa
+QUOTE_TYPE_CLASSES = {
+    "EQUITY": "equity",
+    "ETF": "etf",
+    "MUTUALFUND": "etf",
+    "CRYPTOCURRENCY": "crypto",
+    "FUTURE": "commodity",
+    "INDEX": "index",
+    "CURRENCY": "currency",
+}
+
+
+def _suffix_rule(ticker):
+    for suffix, rule in EXCHANGE_SUFFIXES.items():
+        if ticker.upper().endswith(suffix.upper()):
+            return rule
+    return None
+
+
+def _fallback_asset_class(ticker):
+    t = ticker.upper()
+    if t.startswith("#"): return "bond"
+    if t.endswith("=X"): return "currency"
+    if t.endswith("=F") or t in ("GLD",): return "commodity"
+    if t.startswith("^"): return "index"
+    if "-USD" in t or "-EUR" in t: return "crypto"
+    return "equity"
+
+
+class InstrumentIndex:
+    """
+    Indeks instrumentów: ticker -> waluta, giełda, klasa aktywa i jednostka ceny.
+    Budowany raz z metadanych dostawcy (przez cache metadanych) i reguł z src/config.py;
+    kolejne zapytania obsługiwane są z pamięci, bez zapytań sieciowych.
+    """
+    def __init__(self, metadata_cache=None):
+        self._metadata_cache = metadata_cache
+        self._index = {}
+        self._lock = threading.Lock()
+
+    @property
+    def metadata_cache(self):
+        return self._metadata_cache or get_metadata_cache()
+
+    def _build(self, ticker, info):
+        rule = _suffix_rule(ticker) or {}
+        if ticker.startswith("#"):
+            # Obligacje skarbowe zapisywane są w PLN
+            currency = "PLN"
+        else:
+            currency = CURRENCY_OVERRIDES.get(ticker) or info.get("currency") or rule.get("currency") or "USD"
+        # Yahoo podaje część walut w wielkich literach (GBX) - ujednolicamy do GBp
+        if currency == "GBX":
+            currency = "GBp"
+        base_currency, factor = normalize_currency(currency)
+
+        return {
+            "ticker": ticker,
+            "currency": currency,
+            "base_currency": base_currency,
+            "price_unit": "pence" if factor != 1.0 else "unit",
+            "price_factor": factor,
+            "exchange": info.get("exchange") or rule.get("exchange"),
+            "asset_class": QUOTE_TYPE_CLASSES.get(info.get("quoteType"), _fallback_asset_class(ticker)),
+        }
+
+    def resolve_many(self, tickers):
+        """Zwraca słownik ticker -> opis instrumentu (słownik)."""
+        tickers = list(dict.fromkeys(tickers))
+        built = {}
+        with self._lock:
+            todo = [t for t in tickers if t not in self._index]
+        if todo:
+            lookup = [t for t in todo if not t.startswith("#")]
+            try:
+                metadata = self.metadata_cache.get_many(lookup) if lookup else {}
+            except Exception as e:
+                print(f"Błąd pobierania metadanych instrumentów: {e}")
+                metadata = {}
+            with self._lock:
+                for t in todo:
+                    info = metadata.get(t, {})
+                    entry = self._build(t, info)
+                    # Wpisy zbudowane bez metadanych (błąd API) nie są zapamiętywane - spróbujemy ponownie
+                    if info or t.startswith("#"):
+                        self._index[t] = entry
+                    built[t] = entry
+        with self._lock:
+            return {t: self._index.get(t) or built[t] for t in tickers}
+
+    def resolve(self, ticker):
+        return self.resolve_many([ticker])[ticker]
+
+    def currency(self, ticker):
+        """Waluta notowań tickera (np. "USD", "PLN", "GBp")."""
+        return self.resolve(ticker)["currency"]
+
+    def currencies(self, tickers):
+        """Lista walut notowań dla listy tickerów (w tej samej kolejności)."""
+        index = self.resolve_many(tickers)
+        return [index[t]["currency"] for t in tickers]
+
+
+_instrument_index = None
+_instrument_index_lock = threading.Lock()
+
+
+def get_instrument_index():
+    """Zwraca wspólny dla procesu indeks instrumentów."""
+    global _instrument_index
+    with _instrument_index_lock:
+        if _instrument_index is None:
+            _instrument_index = InstrumentIndex()
+        return _instrument_index
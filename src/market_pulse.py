@@ -0,0 +1,101 @@
+import time
+import threading
+
+from src.config import MARKET_INDICES, MARKET_PULSE_REFRESH_SECONDS
+from src.providers import get_provider
+
+
+class MarketPulse:
+    """
+    Migawka notowań indeksów rynkowych ("Puls Rynku") trzymana w pamięci procesu.
+    Wszystkie indeksy pobierane są jednym zapytaniem zbiorczym, a wątek w tle
+    odświeża migawkę co refresh_seconds - strona startowa tylko czyta gotowy wynik.
+    """
+    def __init__(self, indices=None, refresh_seconds=MARKET_PULSE_REFRESH_SECONDS, provider=None):
+        self.indices = dict(indices or MARKET_INDICES)
+        self.refresh_seconds = refresh_seconds
+        self._provider = provider
+        self._snapshot = {}
+        self._updated = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def provider(self):
+        return self._provider or get_provider()
+
+    def refresh(self):
+        """Pobiera notowania wszystkich indeksów (jedno zapytanie) i podmienia migawkę."""
+        # Równoległe odświeżenia (wątek + pierwsze wejście na stronę) nie dublują zapytań
+        with self._refresh_lock:
+            self._fetch()
+        return self._snapshot
+
+    def _fetch(self):
+        quotes = self.provider.get_quotes(list(self.indices.values()))
+        snapshot = {}
+        for name, ticker in self.indices.items():
+            q = quotes.get(ticker)
+            if not q or not q.get("previous_close"):
+                continue
+            change = (q["last_price"] - q["previous_close"]) / q["previous_close"] * 100
+            snapshot[ticker] = {"name": name, "price": q["last_price"], "change": change}
+
+        if not snapshot:
+            # Nieudane pobranie nie kasuje ostatnich znanych notowań ani nie przesuwa czasu aktualizacji
+            return
+        with self._lock:
+            self._snapshot = {**self._snapshot, **snapshot}
+            self._updated = time.time()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Błąd odświeżania pulsu rynku: {e}")
+            self._stop.wait(self.refresh_seconds)
+
+    def start(self):
+        """Uruchamia wątek odświeżający (tylko raz na proces)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="market-pulse", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self, wait=True):
+        """
+        Zwraca (migawka ticker -> {"name", "price", "change"}, czas aktualizacji).
+        Przed pierwszym odświeżeniem (wait=True) czeka na jego zakończenie.
+        """
+        if self._updated is None and wait:
+            with self._refresh_lock:
+                # Wątek w tle mógł właśnie skończyć pierwsze pobranie
+                if self._updated is None:
+                    try:
+                        self._fetch()
+                    except Exception as e:
+                        print(f"Błąd pobierania pulsu rynku: {e}")
+        with self._lock:
+            return dict(self._snapshot), self._updated
+
+
+_market_pulse = None
+_market_pulse_lock = threading.Lock()
+
+
+def get_market_pulse():
+    """Zwraca wspólną dla procesu migawkę rynku (z uruchomionym wątkiem odświeżającym)."""
+    global _market_pulse
+    with _market_pulse_lock:
+        if _market_pulse is None:
+            _market_pulse = MarketPulse()
+            _market_pulse.start()
+        return _market_pulse
@@ -0,0 +1,211 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+from src.database import MetadataDB
+from src.providers import get_provider
+
+# Grupy pól z Yahoo .info i czas ważności każdej z nich (w sekundach).
+# Dane rynkowe (cena, cena docelowa, kapitalizacja) starzeją się szybko,
+# opis spółki, sektor czy strona www - praktycznie wcale.
+FIELD_GROUPS = {
+    "market": {
+        "ttl": 60 * 60,
+        "fields": ["currentPrice", "targetMeanPrice", "marketCap", "trailingPE", "forwardPE", "dividendYield"],
+    },
+    "fundamentals": {
+        "ttl": 24 * 60 * 60,
+        "fields": ["totalRevenue", "profitMargins", "returnOnEquity", "debtToEquity"],
+    },
+    "profile": {
+        "ttl": 30 * 24 * 60 * 60,
+        "fields": ["shortName", "longName", "currency", "exchange", "quoteType", "sector", "industry",
+                   "website", "longBusinessSummary"],
+    },
+}
+
+
+class MetadataCache:
+    """
+    Cache metadanych spółek w SQLite z polityką stale-while-revalidate:
+    przeterminowane wpisy są zwracane od razu, a odświeżenie trwa w tle.
+    Na API czekamy tylko przy pierwszej wizycie (brak jakichkolwiek danych o tickerze).
+    """
+    def __init__(self, db=None, provider=None, max_workers=4):
+        self.db = db or MetadataDB()
+        self._provider = provider
+        self._db_lock = threading.Lock()
+        # Ticker -> Future trwającego pobrania (w tle albo synchronicznego) - bez dublowania zapytań
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="metadata")
+        # Wpisy pobrane przed tą chwilą traktujemy jak przeterminowane (invalidate)
+        self._stale_before = 0.0
+
+    @property
+    def provider(self):
+        return self._provider or get_provider()
+
+    def _split(self, info):
+        """Dzieli surowe .info na grupy pól."""
+        return {name: {f: info.get(f) for f in group["fields"]} for name, group in FIELD_GROUPS.items()}
+
+    def _state(self, tickers):
+        """Zwraca (zapisane grupy, brakujące tickery, przeterminowane tickery)."""
+        with self._db_lock:
+            stored = self.db.load_groups(self.provider.name, tickers)
+        now = time.time()
+        missing, stale = [], []
+        for t in tickers:
+            groups = stored[t]
+            if len(groups) < len(FIELD_GROUPS):
+                missing.append(t)
+            elif any(now - groups[name][1] > FIELD_GROUPS[name]["ttl"] or groups[name][1] < self._stale_before
+                     for name in FIELD_GROUPS):
+                stale.append(t)
+        return stored, missing, stale
+
+    def refresh(self, tickers):
+        """Pobiera metadane z API (synchronicznie) i zapisuje je w bazie."""
+        tickers = list(tickers)
+        fetched = self.provider.get_metadata(tickers)
+        now = time.time()
+        with self._db_lock:
+            failed = [t for t in tickers if not fetched.get(t)]
+            existing = self.db.load_groups(self.provider.name, failed) if failed else {}
+            for t in tickers:
+                info = fetched.get(t)
+                if info:
+                    self.db.save_groups(self.provider.name, t, self._split(info), now)
+                    continue
+                # Nieudane pobranie nie nadpisuje zapisanych danych (stale-while-revalidate).
+                # Brakujące grupy zapisujemy jako puste i od razu przeterminowane - strona dostaje
+                # wynik bez czekania, a kolejna wizyta ponawia próbę w tle
+                placeholders = {name: {} for name in FIELD_GROUPS if name not in existing[t]}
+                if placeholders:
+                    self.db.save_groups(self.provider.name, t, placeholders, 0.0)
+        return fetched
+
+    def invalidate(self):
+        """Oznacza wszystkie zapisane metadane jako przeterminowane - kolejny odczyt odświeży je w tle."""
+        self._stale_before = time.time()
+
+    def _claim(self, tickers):
+        """Rezerwuje tickery bez trwającego pobrania - zwraca (zarezerwowane, ich Future, Future innych pobrań)."""
+        future = Future()
+        with self._inflight_lock:
+            todo = [t for t in tickers if t not in self._inflight]
+            others = {self._inflight[t] for t in tickers if t in self._inflight}
+            for t in todo:
+                self._inflight[t] = future
+        return todo, future, others
+
+    def _run_refresh(self, tickers, future):
+        try:
+            future.set_result(self.refresh(tickers))
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                for t in tickers:
+                    if self._inflight.get(t) is future:
+                        del self._inflight[t]
+
+    def _refresh_in_background(self, tickers):
+        todo, future, _ = self._claim(tickers)
+        if not todo:
+            return None
+
+        def job():
+            try:
+                self._run_refresh(todo, future)
+            except Exception as e:
+                print(f"Błąd odświeżania metadanych {todo}: {e}")
+
+        return self._executor.submit(job)
+
+    def _refresh_and_wait(self, tickers):
+        """Pobranie synchroniczne - tickery pobierane już przez inne wywołanie tylko czekają na jego wynik."""
+        todo, future, others = self._claim(tickers)
+        if todo:
+            self._run_refresh(todo, future)
+        for other in others:
+            try:
+                other.result()
+            except Exception:
+                pass  # Błąd innego pobrania - zwracamy to, co jest w bazie
+
+    def get_many(self, tickers):
+        """Zwraca słownik ticker -> surowe metadane (klucze jak w Yahoo .info)."""
+        tickers = list(dict.fromkeys(tickers))
+        stored, missing, stale = self._state(tickers)
+
+        if missing:
+            self._refresh_and_wait(missing)
+            stored.update(self._state(missing)[0])
+        if stale:
+            self._refresh_in_background(stale)
+
+        result = {}
+        for t in tickers:
+            info = {}
+            for fields, _ in stored[t].values():
+                # Puste pola pomijamy, by działały wartości domyślne w info.get(pole, domyślna)
+                info.update({k: v for k, v in fields.items() if v is not None})
+            result[t] = info
+        return result
+
+    def snapshot(self, tickers=None):
+        """
+        Migawka zapisanych metadanych jako DataFrame (wiersz na ticker, kolumny jak w Yahoo .info).
+        Czyta tylko bazę - bez zapytań do API, także dla przeterminowanych wpisów.
+        Domyślnie zwraca wszystkie tickery obecne w bazie.
+        """
+        with self._db_lock:
+            if tickers is None:
+                tickers = self.db.list_tickers(self.provider.name)
+            stored = self.db.load_groups(self.provider.name, list(dict.fromkeys(tickers)))
+
+        rows = {}
+        for t, groups in stored.items():
+            if not groups:
+                continue
+            info = {}
+            for fields, _ in groups.values():
+                info.update({k: v for k, v in fields.items() if v is not None})
+            rows[t] = info
+        fields = [f for group in FIELD_GROUPS.values() for f in group["fields"]]
+        return pd.DataFrame.from_dict(rows, orient="index").reindex(columns=fields)
+
+    def get(self, ticker):
+        return self.get_many([ticker])[ticker]
+
+    def prefetch(self, tickers, wait=False):
+        """
+        Rozgrzewa cache dla listy tickerów (np. całej listy obserwowanych).
+        Domyślnie w tle - nie blokuje renderowania strony.
+        """
+        _, missing, stale = self._state(list(dict.fromkeys(tickers)))
+        todo = missing + stale
+        if not todo:
+            return
+        if wait:
+            self._refresh_and_wait(todo)
+        else:
+            self._refresh_in_background(todo)
+
+
+_metadata_cache = None
+_metadata_cache_lock = threading.Lock()
+
+
+def get_metadata_cache():
+    """Zwraca wspólny dla procesu cache metadanych."""
+    global _metadata_cache
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            _metadata_cache = MetadataCache()
+        return _metadata_cache
@@ -0,0 +1,163 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Ile ścieżek generujemy naraz (pamięć: chunk x dni liczb na każdy wątek)
+MC_CHUNK_SIZE = 10000
+# Porcje liczone są w wątkach - NumPy zwalnia GIL przy losowaniu, cumsum i bincount
+MC_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+# Liczba przedziałów histogramu log-ceny dla każdego dnia (dokładność percentyli)
+MC_BINS = 4096
+# Histogram obejmuje +/- tyle odchyleń standardowych rozkładu log-ceny danego dnia
+# (poza +/-6 sigma wypada ~2e-9 ścieżek - trafiają do skrajnych przedziałów, nie zmieniając percentyli 1-99)
+MC_SPAN_SIGMAS = 6.0
+DEFAULT_QUANTILES = (5, 25, 50, 75, 95)
+
+
+def estimate_params(close):
+    """Dryf i zmienność dziennych logarytmicznych stóp zwrotu (model geometrycznego ruchu Browna)."""
+    log_returns = np.log(1 + close.pct_change()).dropna()
+    drift = log_returns.mean() - 0.5 * log_returns.var()
+    return float(drift), float(log_returns.std())
+
+
+class _LogHistogram:
+    """
+    Histogram log-ceny osobno dla każdego dnia, zbierany porcjami ścieżek.
+    Zakres przedziałów dnia t wynika z rozkładu teoretycznego (środek drift*t, szerokość ~ sigma*sqrt(t)),
+    więc percentyle liczone są strumieniowo, bez przechowywania wszystkich ścieżek.
+    """
+    def __init__(self, log_start, drift, stdev, days, bins=None):
+        bins = bins or MC_BINS
+        t = np.arange(1, days + 1)
+        half = MC_SPAN_SIGMAS * stdev * np.sqrt(t)
+        self.low = (log_start + drift * t - half).astype(np.float32)
+        self.width = (2 * half / bins).astype(np.float32)
+        self.bins = bins
+        self.days = days
+        self.counts = np.zeros(days * bins, dtype=np.int64)
+
+    def count(self, log_paths):
+        """Liczności przedziałów dla porcji log_paths (ścieżki x dni) - do zsumowania w counts."""
+        idx = ((log_paths - self.low) / self.width).astype(np.int32)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        idx += np.arange(self.days, dtype=np.int32) * self.bins
+        return np.bincount(idx.ravel(), minlength=self.days * self.bins)
+
+    def quantiles(self, qs):
+        """Percentyle (w procentach) każdego dnia - interpolacja liniowa wewnątrz przedziału."""
+        counts = self.counts.reshape(self.days, self.bins)
+        cum = np.cumsum(counts, axis=1)
+        total = cum[:, -1:]
+        out = np.empty((self.days, len(qs)))
+        for j, q in enumerate(qs):
+            target = total[:, 0] * q / 100
+            k = np.minimum((cum < target[:, None]).sum(axis=1), self.bins - 1)
+            before = np.where(k > 0, cum[np.arange(self.days), k - 1], 0)
+            inside = counts[np.arange(self.days), k]
+            frac = np.where(inside > 0, (target - before) / np.maximum(inside, 1), 0.5)
+            out[:, j] = self.low + (k + frac) * self.width
+        return out
+
+
+def _simulate_chunk(rng, n, last_price, drift, stdev, days, hist, dtype, sample_paths):
+    """Jedna porcja n ścieżek - zwraca tylko zagregowane wartości (bez samych ścieżek)."""
+    log_paths = rng.standard_normal((n, days), dtype=dtype)
+    log_paths *= np.asarray(stdev, dtype=dtype)
+    log_paths += np.asarray(drift, dtype=dtype)
+    np.cumsum(log_paths, axis=1, out=log_paths)
+    log_paths += np.asarray(np.log(last_price), dtype=dtype)
+
+    counts = hist.count(log_paths)
+    prices = np.exp(log_paths, out=log_paths)
+    final = prices[:, -1].astype(np.float64)
+    return {
+        "counts": counts,
+        "price_sum": prices.sum(axis=0, dtype=np.float64),
+        "final_sum": final.sum(),
+        "final_sq": (final ** 2).sum(),
+        "final_min": final.min(),
+        "final_max": final.max(),
+        "losses": int((final < last_price).sum()),
+        "samples": prices[:sample_paths].astype(np.float64),
+    }
+
+
+def simulate_paths(last_price, drift, stdev, days, n_paths, quantiles=DEFAULT_QUANTILES, dtype=np.float32,
+                   chunk_size=MC_CHUNK_SIZE, sample_paths=100, seed=None, max_workers=MC_MAX_WORKERS):
+    """
+    Symulacja Monte Carlo cen (geometryczny ruch Browna) liczona w przestrzeni logarytmów:
+    log-ścieżki to skumulowana suma losowych przyrostów, generowana porcjami po chunk_size ścieżek
+    (każda porcja z własnym generatorem, więc wynik dla danego seed nie zależy od liczby wątków).
+    Pamięć nie zależy od liczby ścieżek - zbierane są tylko histogramy dzienne, sumy i kilka
+    przykładowych ścieżek do wykresu.
+
+    Zwraca słownik:
+    bands (DataFrame: dzień x percentyle cen, dzień 0 = cena bieżąca), mean (Series: średnia cena),
+    samples (tablica sample_paths x dni + 1), final (statystyki ceny na koniec horyzontu), paths.
+    """
+    if stdev <= 0:
+        return _deterministic_paths(last_price, drift, days, n_paths, quantiles, sample_paths)
+
+    hist = _LogHistogram(np.log(last_price), drift, stdev, days)
+    sizes = [min(chunk_size, n_paths - lo) for lo in range(0, n_paths, chunk_size)]
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(sizes))]
+
+    price_sum = np.zeros(days)
+    final_sum = final_sq = 0.0
+    final_min, final_max = np.inf, -np.inf
+    losses = 0
+    samples = None
+    def run_chunk(rng, n):
+        return _simulate_chunk(rng, n, last_price, drift, stdev, days, hist, dtype, sample_paths)
+
+    wave = 2 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Porcje zlecane falami - w pamięci czeka najwyżej kilka wyników naraz;
+        # map zachowuje kolejność, więc przykładowe ścieżki zawsze pochodzą z pierwszej porcji
+        parts = (part for i in range(0, len(sizes), wave)
+                 for part in pool.map(run_chunk, rngs[i:i + wave], sizes[i:i + wave]))
+        for part in parts:
+            hist.counts += part["counts"]
+            price_sum += part["price_sum"]
+            final_sum += part["final_sum"]
+            final_sq += part["final_sq"]
+            final_min, final_max = min(final_min, part["final_min"]), max(final_max, part["final_max"])
+            losses += part["losses"]
+            if samples is None:
+                samples = part["samples"]
+
+    qs = list(quantiles)
+    final_mean = final_sum / n_paths
+    final_stats = {
+        "mean": float(final_mean),
+        "std": float(np.sqrt(max(final_sq / n_paths - final_mean ** 2, 0.0))),
+        "min": float(final_min),
+        "max": float(final_max),
+        "prob_loss": losses / n_paths * 100,
+    }
+    return _result(last_price, np.exp(hist.quantiles(qs)), qs, price_sum / n_paths, samples, final_stats, n_paths)
+
+
+def _deterministic_paths(last_price, drift, days, n_paths, quantiles, sample_paths):
+    """Zerowa zmienność - wszystkie ścieżki to ta sama krzywa last_price * exp(drift * t), bez losowania."""
+    qs = list(quantiles)
+    path = last_price * np.exp(drift * np.arange(1, days + 1))
+    final = float(path[-1])
+    final_stats = {"mean": final, "std": 0.0, "min": final, "max": final,
+                   "prob_loss": 100.0 if final < last_price else 0.0}
+    samples = np.tile(path, (min(sample_paths, n_paths), 1))
+    return _result(last_price, np.repeat(path[:, None], len(qs), axis=1), qs, path, samples, final_stats, n_paths)
+
+
+def _result(last_price, quantile_prices, qs, mean_prices, samples, final_stats, n_paths):
+    """Składa wynik simulate_paths - dokleja dzień 0 (cena bieżąca) i percentyle ceny końcowej."""
+    days = len(mean_prices)
+    bands = np.vstack([np.full(len(qs), last_price), quantile_prices])
+    bands = pd.DataFrame(bands, columns=[f"p{q:g}" for q in qs], index=pd.RangeIndex(days + 1, name="Dzień"))
+    mean = pd.Series(np.concatenate([[last_price], mean_prices]), index=bands.index)
+    samples = np.hstack([np.full((len(samples), 1), last_price), samples])
+    final_stats.update({f"p{q:g}": float(bands[f"p{q:g}"].iloc[-1]) for q in qs})
+    return {"bands": bands, "mean": mean, "samples": samples, "final": final_stats, "paths": n_paths}
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+# Polityki wyrównania dat między tickerami
+#   "none"   - bez zmian (braki jako NaN)
+#   "ffill"  - luki uzupełniane ostatnią znaną ceną (święta na jednej z giełd)
+#   "dropna" - tylko daty, w których notowane są wszystkie tickery
+ALIGN_POLICIES = ("none", "ffill", "dropna")
+
+
+def _ffill(values):
+    """Wektorowe forward-fill wzdłuż osi czasu (osi 0) dla tablicy 2D."""
+    mask = np.isnan(values)
+    if not mask.any():
+        return values.copy()
+    rows = np.where(~mask, np.arange(values.shape[0])[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = values[rows, np.arange(values.shape[1])]
+    # Wiodące braki (przed pierwszym notowaniem) zostają NaN
+    filled[mask & (rows == 0) & np.isnan(values[0])[None, :]] = np.nan
+    return filled
+
+
+class PriceMatrix:
+    """
+    Macierz cen (daty x tickery) w jednej ciągłej tablicy NumPy, opcjonalnie float32.
+    Wspólna dla stron korzystających z tego samego zestawu tickerów - wycinki po dacie
+    (i po spójnym zakresie tickerów) są widokami bez kopiowania danych.
+    """
+    def __init__(self, values, dates, tickers):
+        values = np.asarray(values)
+        if values.ndim != 2 or values.shape != (len(dates), len(tickers)):
+            raise ValueError("Kształt macierzy musi odpowiadać liczbie dat i tickerów.")
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = pd.Index(tickers)
+
+    # --- Tworzenie ---
+    @classmethod
+    def from_history(cls, frames, field="Close", dtype=np.float64):
+        """Buduje macierz ze słownika ticker -> DataFrame OHLCV (unia dat wszystkich tickerów)."""
+        series = {t: df[field] for t, df in frames.items() if df is not None and field in df.columns}
+        if not series:
+            return cls(np.empty((0, 0), dtype=dtype), [], [])
+
+        dates = pd.DatetimeIndex([])
+        for s in series.values():
+            dates = dates.union(s.index)
+
+        # Jedna alokacja na całą macierz, kolumny wypełniane bez pośrednich DataFrame
+        values = np.full((len(dates), len(series)), np.nan, dtype=dtype)
+        for j, s in enumerate(series.values()):
+            values[dates.get_indexer(s.index), j] = s.to_numpy(dtype=dtype)
+        return cls(values, dates, list(series))
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64):
+        """Buduje macierz z szerokiego DataFrame (daty x tickery)."""
+        return cls(np.ascontiguousarray(df.to_numpy(dtype=dtype)), df.index, df.columns)
+
+    # --- Właściwości ---
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __repr__(self):
+        return f"PriceMatrix({len(self.dates)} dat x {len(self.tickers)} tickerów, {self.values.dtype})"
+
+    # --- Wycinki ---
+    def _ticker_positions(self, tickers):
+        positions = self.tickers.get_indexer(list(tickers))
+        return positions[positions >= 0]
+
+    def slice(self, start=None, end=None, tickers=None):
+        """
+        Zwraca wycinek po zakresie dat [start, end] i podzbiorze tickerów.
+        Zakres dat i spójny (rosnący, bez przerw) zakres tickerów to widok bez kopii;
+        dowolny inny podzbiór tickerów wymaga skopiowania kolumn.
+        """
+        i0 = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        i1 = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        rows = slice(i0, i1)
+
+        if tickers is None:
+            cols = slice(None)
+            names = self.tickers
+        else:
+            positions = self._ticker_positions(tickers)
+            names = self.tickers[positions]
+            if len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+                cols = slice(positions[0], positions[0] + len(positions))
+            else:
+                cols = positions
+
+        return PriceMatrix(self.values[rows, cols], self.dates[rows], names)
+
+    def column(self, ticker):
+        """Szereg cen jednego tickera (widok kolumny)."""
+        return self.values[:, self.tickers.get_loc(ticker)]
+
+    # --- Wyrównanie i obliczenia ---
+    def align(self, policy="ffill"):
+        """Zwraca macierz wyrównaną wg polityki z ALIGN_POLICIES."""
+        if policy not in ALIGN_POLICIES:
+            raise ValueError(f"Nieznana polityka wyrównania: {policy}")
+        if policy == "none":
+            return self
+        if policy == "ffill":
+            return PriceMatrix(_ffill(self.values), self.dates, self.tickers)
+        complete = ~np.isnan(self.values).any(axis=1)
+        return PriceMatrix(self.values[complete], self.dates[complete], self.tickers)
+
+    def drop_empty(self):
+        """Usuwa tickery bez żadnego notowania."""
+        keep = ~np.isnan(self.values).all(axis=0)
+        if keep.all():
+            return self
+        return PriceMatrix(self.values[:, keep], self.dates, self.tickers[keep])
+
+    def returns(self, log=False):
+        """Macierz dziennych stóp zwrotu (prostych lub logarytmicznych), o jeden wiersz krótsza."""
+        prev, curr = self.values[:-1], self.values[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rets = np.log(curr / prev) if log else curr / prev - 1
+        return PriceMatrix(rets, self.dates[1:], self.tickers)
+
+    def to_frame(self, dtype=None):
+        """DataFrame na tej samej tablicy (bez kopii, o ile nie zmieniamy typu)."""
+        values = self.values if dtype is None else self.values.astype(dtype)
+        return pd.DataFrame(values, index=self.dates, columns=self.tickers, copy=False)
@@ -0,0 +1,222 @@
+import os
+import json
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from src.providers import get_provider
+
+# Parquet wymaga pyarrow - bez niego zapisujemy pliki w formacie pickle
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PARQUET = True
+except ImportError:
+    _HAS_PARQUET = False
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_store")
+
+
+def period_to_start(period, now=None):
+    """
+    Zamienia okres w formacie yfinance ("6mo", "1y", "10y", "ytd", "max") na datę początkową.
+    Dla "max" zwraca None (cała dostępna historia).
+    """
+    now = pd.Timestamp(now or datetime.now()).normalize()
+    if period in (None, "max"):
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    units = {"mo": "months", "wk": "weeks", "y": "years", "d": "days"}
+    for suffix, unit in units.items():
+        if period.endswith(suffix):
+            return now - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Nieobsługiwany okres: {period}")
+
+
+class PriceStore:
+    """
+    Trwały, kolumnowy magazyn notowań OHLCV (jeden plik na parę ticker/interwał).
+    Przy kolejnych odczytach dociąga z API tylko świece nowsze od ostatniej zapisanej,
+    dzięki czemu restart serwera nie wymusza pobierania całej historii od nowa.
+    """
+    def __init__(self, root=DEFAULT_STORE_DIR, max_age_minutes=60, provider=None):
+        self.root = root
+        self._provider = provider
+        # Jak długo uznajemy zapisane dane za świeże (bez pytania API o nowe świece)
+        self.max_age = pd.Timedelta(minutes=max_age_minutes)
+        # Dane zapisane przed tą chwilą są nieaktualne niezależnie od max_age (invalidate)
+        self._stale_before = None
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @property
+    def provider(self):
+        # Domyślnie wspólny dostawca procesu (może zostać podmieniony przez set_provider)
+        return self._provider or get_provider()
+
+    # --- Pliki ---
+    def _path(self, ticker, interval):
+        safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in ticker)
+        ext = "parquet" if _HAS_PARQUET else "pkl"
+        # Osobny katalog dla każdego dostawcy - dane syntetyczne nie mieszają się z prawdziwymi
+        return os.path.join(self.root, self.provider.name, interval, f"{safe}.{ext}")
+
+    def invalidate(self):
+        """Wymusza dociągnięcie nowych świec z API przy najbliższym odczycie każdego tickera (np. przycisk "Odśwież")."""
+        self._stale_before = pd.Timestamp.now()
+
+    def _lock(self, ticker, interval):
+        with self._locks_guard:
+            return self._locks.setdefault((ticker, interval), threading.Lock())
+
+    def _read_meta(self, path):
+        try:
+            with open(path + ".meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return {
+                "covered_from": pd.Timestamp(meta["covered_from"]) if meta.get("covered_from") else None,
+                "updated_at": pd.Timestamp(meta["updated_at"]),
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def load(self, ticker, interval="1d"):
+        """Zwraca zapisaną historię OHLCV (lub pusty DataFrame)."""
+        path = self._path(ticker, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            return pd.read_parquet(path) if _HAS_PARQUET else pd.read_pickle(path)
+        except Exception:
+            # Uszkodzony plik traktujemy jak brak danych - zostanie nadpisany
+            return pd.DataFrame()
+
+    def iter_batches(self, ticker, interval="1d", batch_size=65536, columns=("Close",)):
+        """
+        Czyta zapisaną historię porcjami (DataFrame po batch_size świec) - bez wczytywania całego pliku.
+        Bez pyarrow (pliki pickle) zwraca całą historię jako jedną porcję.
+        """
+        path = self._path(ticker, interval)
+        if not os.path.exists(path):
+            return
+        if not _HAS_PARQUET:
+            df = self.load(ticker, interval)
+            yield df[[c for c in columns if c in df.columns]]
+            return
+
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        index_columns = (parquet.schema_arrow.pandas_metadata or {}).get("index_columns", [])
+        names = [c for c in columns if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=names + index_columns):
+            yield batch.to_pandas()
+
+    def save(self, ticker, interval, df, covered_from):
+        """Zapisuje historię atomowo (plik tymczasowy + os.replace) razem z metadanymi pokrycia."""
+        path = self._path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        if _HAS_PARQUET:
+            df.to_parquet(tmp)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, path)
+
+        meta = {
+            "covered_from": covered_from.isoformat() if covered_from is not None else None,
+            "updated_at": datetime.now().isoformat(),
+        }
+        with open(path + ".meta.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(path + ".meta.json.tmp", path + ".meta.json")
+
+    # --- Planowanie pobrań ---
+    def _plan(self, ticker, interval, start):
+        """
+        Sprawdza stan magazynu i zwraca (zapisane_dane, pokrycie, od_kiedy_pobrać).
+        od_kiedy_pobrać == "full" oznacza pełne pobranie, None - dane są aktualne.
+        """
+        path = self._path(ticker, interval)
+        stored = self.load(ticker, interval)
+        meta = self._read_meta(path)
+
+        if stored.empty or meta is None:
+            return stored, None, "full"
+
+        covered_from = meta["covered_from"]
+        # Magazyn nie sięga wystarczająco daleko wstecz - trzeba pobrać pełny zakres
+        if covered_from is not None and (start is None or start < covered_from):
+            return stored, covered_from, "full"
+
+        fresh = pd.Timestamp.now() - meta["updated_at"] < self.max_age
+        if fresh and (self._stale_before is None or meta["updated_at"] >= self._stale_before):
+            return stored, covered_from, None
+
+        # Pobieramy od ostatniej zapisanej świecy włącznie - mogła być niepełna (trwająca sesja)
+        return stored, covered_from, stored.index[-1]
+
+    def _merge(self, stored, fresh):
+        if stored.empty:
+            return fresh.sort_index()
+        merged = pd.concat([stored, fresh])
+        merged = merged[~merged.index.duplicated(keep="last")]
+        return merged.sort_index()
+
+    def _download(self, tickers, interval, start):
+        return self.provider.get_history(list(tickers), start=start, interval=interval)
+
+    # --- API ---
+    def get_history(self, ticker, period="1y", interval="1d"):
+        """Zwraca OHLCV dla jednego tickera, pobierając z API tylko brakujące świece."""
+        return self.get_history_batch([ticker], period=period, interval=interval).get(ticker, pd.DataFrame())
+
+    def get_history_batch(self, tickers, period="1y", interval="1d", start=None):
+        """
+        Zwraca słownik ticker -> OHLCV dla listy tickerów.
+        Tickery bez historii pobierane są jednym zapytaniem zbiorczym,
+        a aktualizacje przyrostowe kolejnym (od najstarszej "ostatniej świecy" w grupie).
+        """
+        start = pd.Timestamp(start) if start is not None else period_to_start(period)
+        tickers = list(dict.fromkeys(tickers))
+
+        stored_map, covered_map = {}, {}
+        full_group, delta_group = [], {}
+        for t in tickers:
+            stored, covered_from, fetch_from = self._plan(t, interval, start)
+            stored_map[t] = stored
+            covered_map[t] = covered_from
+            if isinstance(fetch_from, str):
+                full_group.append(t)
+            elif fetch_from is not None:
+                delta_group[t] = fetch_from
+
+        fetched = {}
+        if full_group:
+            fetched.update(self._download(full_group, interval, start))
+        if delta_group:
+            fetched.update(self._download(list(delta_group), interval, min(delta_group.values())))
+
+        result = {}
+        for t in tickers:
+            df = stored_map[t]
+            if t in fetched:
+                with self._lock(t, interval):
+                    covered_from = start if t in full_group else covered_map[t]
+                    df = self._merge(df, fetched[t])
+                    self.save(t, interval, df, covered_from)
+            if df.empty:
+                continue
+            result[t] = df.loc[df.index >= start].copy() if start is not None else df
+        return result
+
+
+_price_store = None
+
+
+def get_price_store():
+    """Zwraca wspólny dla procesu magazyn notowań."""
+    global _price_store
+    if _price_store is None:
+        _price_store = PriceStore()
+    return _price_store
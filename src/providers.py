@@ -0,0 +1,316 @@
+import os
+import json
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def fx_ticker(from_currency, to_currency="PLN"):
+    """Symbol pary walutowej w konwencji Yahoo Finance (np. USDPLN=X)."""
+    return f"{from_currency}{to_currency}=X"
+
+
+def split_download(df, tickers):
+    """
+    Rozbija wynik yf.download (płaski lub MultiIndex) na słownik ticker -> DataFrame OHLCV.
+    Indeks dat jest pozbawiony strefy czasowej, a puste wiersze są usuwane.
+    """
+    result = {}
+    if df is None or df.empty:
+        return result
+
+    for t in tickers:
+        if isinstance(df.columns, pd.MultiIndex):
+            # Nowe yfinance: poziomy (Price, Ticker); starsze przy group_by="ticker": (Ticker, Price)
+            if t in df.columns.get_level_values(1):
+                part = df.xs(t, axis=1, level=1)
+            elif t in df.columns.get_level_values(0):
+                part = df.xs(t, axis=1, level=0)
+            else:
+                continue
+        else:
+            if len(tickers) != 1:
+                continue
+            part = df
+
+        part = part[[c for c in OHLCV_COLUMNS if c in part.columns]].dropna(how="all")
+        if part.empty:
+            continue
+        if part.index.tz is not None:
+            part.index = part.index.tz_localize(None)
+        part.columns.name = None
+        result[t] = part
+    return result
+
+
+def _quotes_from_history(frames):
+    """Buduje notowania (ostatnia i poprzednia cena zamknięcia) z historii dziennej."""
+    quotes = {}
+    for t, df in frames.items():
+        closes = df["Close"].dropna()
+        if closes.empty:
+            continue
+        last = float(closes.iloc[-1])
+        prev = float(closes.iloc[-2]) if len(closes) > 1 else last
+        quotes[t] = {"last_price": last, "previous_close": prev, "currency": None}
+    return quotes
+
+
+class MarketDataProvider:
+    """
+    Interfejs źródła danych rynkowych. Wszystkie metody są zbiorcze (lista tickerów),
+    żeby implementacje mogły łączyć zapytania w jedno.
+    """
+    name = "base"
+
+    def get_history(self, tickers, start=None, end=None, period=None, interval="1d"):
+        """Zwraca słownik ticker -> DataFrame OHLCV (indeks dat bez strefy czasowej)."""
+        raise NotImplementedError
+
+    def get_quotes(self, tickers, with_currency=False):
+        """Zwraca słownik ticker -> {"last_price", "previous_close", "currency"}."""
+        raise NotImplementedError
+
+    def get_metadata(self, tickers):
+        """Zwraca słownik ticker -> surowe metadane w formacie Yahoo Finance (.info)."""
+        raise NotImplementedError
+
+    def get_fx_history(self, currencies, to_currency="PLN", start=None, end=None, period=None):
+        """Zwraca słownik waluta -> Series kursów zamknięcia względem to_currency."""
+        pairs = {c: fx_ticker(c, to_currency) for c in currencies}
+        frames = self.get_history(list(pairs.values()), start=start, end=end, period=period)
+        return {c: frames[p]["Close"] for c, p in pairs.items() if p in frames}
+
+    def get_fx_quotes(self, currencies, to_currency="PLN"):
+        """Zwraca słownik waluta -> bieżący kurs względem to_currency."""
+        pairs = {c: fx_ticker(c, to_currency) for c in currencies}
+        quotes = self.get_quotes(list(pairs.values()))
+        return {c: quotes[p]["last_price"] for c, p in pairs.items() if p in quotes}
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Dane na żywo z Yahoo Finance (biblioteka yfinance)."""
+    name = "yfinance"
+
+    def get_history(self, tickers, start=None, end=None, period=None, interval="1d"):
+        import yfinance as yf
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        # Przekazujemy tylko ustawione argumenty - domyślny okres yfinance to zaledwie 1 miesiąc
+        kwargs = {"start": start} if start is not None else {"period": period or "max"}
+        if end is not None:
+            kwargs["end"] = end
+        raw = yf.download(tickers, interval=interval, progress=False, **kwargs)
+        return split_download(raw, tickers)
+
+    def get_quotes(self, tickers, with_currency=False):
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        # Jedno zapytanie o kilka ostatnich sesji zamiast fast_info dla każdego tickera
+        quotes = _quotes_from_history(self.get_history(tickers, period="5d"))
+        if with_currency and quotes:
+            # Waluty z indeksu instrumentów (cache metadanych w SQLite) - bez zapytania na ticker
+            from src.instruments import get_instrument_index
+            try:
+                currencies = get_instrument_index().currencies(list(quotes))
+            except Exception as e:
+                print(f"Błąd ustalania walut notowań: {e}")
+                currencies = [None] * len(quotes)
+            for t, currency in zip(quotes, currencies):
+                quotes[t]["currency"] = currency
+        return quotes
+
+    def get_metadata(self, tickers):
+        import yfinance as yf
+        result = {}
+        for t in tickers:
+            try:
+                result[t] = yf.Ticker(t).info or {}
+            except Exception as e:
+                print(f"Błąd pobierania info dla {t}: {e}")
+        return result
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Deterministyczne źródło danych z plików (tryb offline / benchmarki).
+    Serwuje nagrania z katalogu root (history/<interwał>/<ticker>.csv, metadata.json),
+    a dla tickerów bez nagrania - opcjonalnie syntetyczne, powtarzalne notowania.
+    """
+    name = "replay"
+    # Początek syntetycznej historii - stały, by ta sama data miała zawsze tę samą cenę
+    SYNTHETIC_ANCHOR = pd.Timestamp("2000-01-03")
+    SYNTHETIC_FX = {"USD": 4.0, "EUR": 4.3, "GBP": 5.0, "CHF": 4.5, "JPY": 0.027}
+
+    def __init__(self, root, synthetic=True):
+        self.root = root
+        self.synthetic = synthetic
+        self._metadata = None
+
+    # --- Pliki ---
+    def _history_path(self, ticker, interval):
+        safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in ticker)
+        return os.path.join(self.root, "history", interval, f"{safe}.csv")
+
+    def _load_metadata(self):
+        if self._metadata is None:
+            path = os.path.join(self.root, "metadata.json")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._metadata = json.load(f)
+            except (OSError, ValueError):
+                self._metadata = {}
+        return self._metadata
+
+    def _seed(self, ticker):
+        # crc32 zamiast hash() - hash napisów jest losowany przy każdym starcie interpretera
+        return zlib.crc32(ticker.encode("utf-8"))
+
+    # --- Dane syntetyczne ---
+    def _synthetic_history(self, ticker, interval):
+        dates = pd.bdate_range(self.SYNTHETIC_ANCHOR, pd.Timestamp.now().normalize())
+        rng = np.random.default_rng(self._seed(ticker))
+        n = len(dates)
+
+        if ticker.endswith("=X"):
+            base = self.SYNTHETIC_FX.get(ticker[:3], 1.0)
+            drift, vol = 0.0, 0.004
+        else:
+            base = 20 + rng.random() * 480
+            drift, vol = 0.0003, 0.01 + rng.random() * 0.02
+
+        # Losowania wierszami (dzień po dniu): dopisanie nowego dnia nie zmienia wartości z przeszłości
+        z = rng.standard_normal((n, 5))
+        close = base * np.exp(np.cumsum(drift - 0.5 * vol ** 2 + vol * z[:, 0]))
+        open_ = close * np.exp(vol / 3 * z[:, 1])
+        high = np.maximum(open_, close) * (1 + np.abs(vol / 2 * z[:, 2]))
+        low = np.minimum(open_, close) * (1 - np.abs(vol / 2 * z[:, 3]))
+        volume = np.round(1_000_000 * np.exp(0.5 * z[:, 4]))
+
+        df = pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+                          index=dates)
+        if interval == "1wk":
+            df = df.resample("W-MON", label="left", closed="left").agg(
+                {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna()
+        elif interval == "1mo":
+            df = df.resample("MS").agg(
+                {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna()
+        return df
+
+    def _synthetic_metadata(self, ticker):
+        from src.config import EXCHANGE_SUFFIXES, CURRENCY_OVERRIDES
+        rng = np.random.default_rng(self._seed(ticker) + 1)
+        rule = next((r for s, r in EXCHANGE_SUFFIXES.items() if ticker.endswith(s)), {})
+        currency = CURRENCY_OVERRIDES.get(ticker) or rule.get("currency", "USD")
+        price = float(self._full_history(ticker, "1d")["Close"].iloc[-1])
+        return {
+            "shortName": ticker,
+            "currency": currency,
+            "exchange": rule.get("exchange", "NMS"),
+            "quoteType": "CRYPTOCURRENCY" if "-USD" in ticker else "FUTURE" if ticker.endswith("=F") else "EQUITY",
+            "sector": ["Technology", "Financial Services", "Healthcare", "Energy", "Consumer Cyclical"][
+                int(rng.integers(0, 5))],
+            "industry": "Synthetic",
+            "marketCap": float(rng.integers(1, 500)) * 1e9,
+            "trailingPE": float(rng.uniform(5, 60)),
+            "forwardPE": float(rng.uniform(5, 50)),
+            "dividendYield": float(rng.uniform(0, 5)),
+            "totalRevenue": float(rng.integers(1, 200)) * 1e9,
+            "profitMargins": float(rng.uniform(-0.1, 0.4)),
+            "returnOnEquity": float(rng.uniform(-0.1, 0.5)),
+            "debtToEquity": float(rng.uniform(0, 250)),
+            "currentPrice": price,
+            "targetMeanPrice": price * float(rng.uniform(0.8, 1.3)),
+        }
+
+    def _full_history(self, ticker, interval):
+        path = self._history_path(ticker, interval)
+        if os.path.exists(path):
+            return pd.read_csv(path, index_col=0, parse_dates=True)
+        if self.synthetic:
+            return self._synthetic_history(ticker, interval)
+        return pd.DataFrame()
+
+    # --- API ---
+    def get_history(self, tickers, start=None, end=None, period=None, interval="1d"):
+        from src.price_store import period_to_start
+        if start is None and period is not None:
+            start = period_to_start(period)
+        result = {}
+        for t in tickers:
+            df = self._full_history(t, interval)
+            if df.empty:
+                continue
+            if start is not None:
+                df = df.loc[df.index >= pd.Timestamp(start)]
+            if end is not None:
+                df = df.loc[df.index < pd.Timestamp(end)]
+            if not df.empty:
+                result[t] = df
+        return result
+
+    def get_quotes(self, tickers, with_currency=False):
+        start = datetime.now() - timedelta(days=10)
+        quotes = _quotes_from_history(self.get_history(tickers, start=start))
+        if with_currency:
+            meta = self.get_metadata(list(quotes))
+            for t in quotes:
+                quotes[t]["currency"] = meta.get(t, {}).get("currency")
+        return quotes
+
+    def get_metadata(self, tickers):
+        recorded = self._load_metadata()
+        result = {}
+        for t in tickers:
+            if t in recorded:
+                result[t] = recorded[t]
+            elif self.synthetic and not self._full_history(t, "1d").empty:
+                result[t] = self._synthetic_metadata(t)
+        return result
+
+    # --- Nagrywanie ---
+    def record(self, source, tickers, period="10y", intervals=("1d",), metadata=True):
+        """Nagrywa historię (i opcjonalnie metadane) z innego dostawcy do katalogu root."""
+        for interval in intervals:
+            for t, df in source.get_history(tickers, period=period, interval=interval).items():
+                path = self._history_path(t, interval)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                df.to_csv(path)
+        if metadata:
+            recorded = self._load_metadata()
+            recorded.update(source.get_metadata(tickers))
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, "metadata.json"), "w", encoding="utf-8") as f:
+                json.dump(recorded, f, default=str)
+
+
+_provider = None
+
+
+def get_provider():
+    """
+    Zwraca wspólnego dla procesu dostawcę danych.
+    Wybór przez zmienną środowiskową SPS_DATA_PROVIDER ("yfinance" lub "replay");
+    katalog nagrań dla trybu replay: SPS_REPLAY_DIR.
+    """
+    global _provider
+    if _provider is None:
+        kind = os.environ.get("SPS_DATA_PROVIDER", "yfinance").lower()
+        if kind == "replay":
+            default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "replay_data")
+            _provider = ReplayProvider(os.environ.get("SPS_REPLAY_DIR", default_dir))
+        else:
+            _provider = YFinanceProvider()
+    return _provider
+
+
+def set_provider(provider):
+    """Podmienia dostawcę danych (np. na ReplayProvider w benchmarkach)."""
+    global _provider
+    _provider = provider
@@ -0,0 +1,119 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Domyślne okna (w sesjach): kwartał, pół roku, rok
+RISK_WINDOWS = (63, 126, 252)
+# Interwał świec -> (liczba świec w roku, okna kwartał / pół roku / rok w świecach tego interwału)
+INTERVAL_RISK_WINDOWS = {
+    "1d": (252, RISK_WINDOWS),
+    "1wk": (52, (13, 26, 52)),
+    "1mo": (12, (3, 6, 12)),
+}
+RISK_METRICS = ("sharpe", "max_drawdown", "var_hist", "cvar_hist", "var_param", "cvar_param")
+
+# Ile okien naraz trafia do tablicy okien przy metrykach wymagających całego okna (drawdown, VaR historyczny)
+WINDOW_CHUNK = 4096
+
+
+def _window_sums(values, window):
+    """Sumy kroczące (pełne okno) przez sumy skumulowane; wynik ma długość len(values) - window + 1."""
+    csum = np.cumsum(values, axis=0)
+    out = csum[window - 1:].copy()
+    out[1:] -= csum[:-window]
+    return out
+
+
+def _rolling_moments(returns, window):
+    """Średnia i odchylenie (ddof=1) kroczące oraz maska okien bez braków danych."""
+    valid = ~np.isnan(returns)
+    r = np.where(valid, returns, 0.0)
+    count = _window_sums(valid.astype(np.int64), window)
+    mean = _window_sums(r, window) / window
+    sq = _window_sums(r * r, window)
+    var = np.maximum(sq - window * mean * mean, 0.0) / (window - 1)
+    return mean, np.sqrt(var), count == window
+
+
+def _rolling_drawdown(returns, window):
+    """Największe obsunięcie w każdym oknie (ścieżka kapitału od 1 na początku okna)."""
+    t, n = returns.shape
+    out = np.full((t - window + 1, n), np.nan)
+    # Poziomy kapitału z 1 na początku - okno w zwrotów to w + 1 poziomów
+    levels = np.vstack([np.ones((1, n)), np.cumprod(1 + np.nan_to_num(returns, nan=0.0), axis=0)])
+    # Kolumny w ciągłej pamięci - okna jednego tickera to wtedy tani widok
+    levels = np.ascontiguousarray(levels.T)
+    for j in range(n):
+        views = np.lib.stride_tricks.sliding_window_view(levels[j], window + 1)
+        for start in range(0, len(views), WINDOW_CHUNK):
+            chunk = views[start:start + WINDOW_CHUNK]
+            peak = np.maximum.accumulate(chunk, axis=1)
+            out[start:start + len(chunk), j] = (chunk / peak - 1).min(axis=1)
+    return out
+
+
+def _rolling_var_hist(returns, window, alpha):
+    """Historyczny VaR i CVaR (jako dodatnia strata) z częściowo posortowanych okien zwrotów."""
+    t, n = returns.shape
+    var = np.full((t - window + 1, n), np.nan)
+    cvar = np.full_like(var, np.nan)
+    pos = alpha * (window - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, window - 1)
+    frac = pos - lo
+    columns = np.ascontiguousarray(returns.T)
+    for j in range(n):
+        views = np.lib.stride_tricks.sliding_window_view(columns[j], window)
+        for start in range(0, len(views), WINDOW_CHUNK):
+            # Wystarczy częściowe uporządkowanie: statystyki pozycyjne lo/hi i mniejsze od nich przed nimi
+            ordered = np.partition(views[start:start + WINDOW_CHUNK], [lo, hi], axis=1)
+            rows = slice(start, start + len(ordered))
+            # Kwantyl z interpolacją liniową (jak np.quantile), ogon = zwroty nie wyższe od kwantyla
+            var[rows, j] = -(ordered[:, lo] * (1 - frac) + ordered[:, hi] * frac)
+            cvar[rows, j] = -ordered[:, :lo + 1].mean(axis=1)
+    return var, cvar
+
+
+def rolling_risk(returns, windows=RISK_WINDOWS, level=0.95, periods_per_year=252):
+    """
+    Metryki ryzyka w czasie dla kilku okien naraz: Sharpe (annualizowany), Max Drawdown w oknie,
+    historyczny i parametryczny (rozkład normalny) VaR/CVaR na poziomie level.
+    returns: Series (jeden ticker) lub DataFrame (daty x tickery) dziennych zwrotów.
+    Zwraca słownik okno -> DataFrame: kolumny to metryki (Series) lub (metryka, ticker) (panel).
+    Okna z brakami danych dają NaN.
+    """
+    single = isinstance(returns, pd.Series)
+    frame = returns.to_frame() if single else returns
+    values = frame.to_numpy(dtype=np.float64)
+    alpha = 1 - level
+    z = NormalDist().inv_cdf(alpha)
+    tail = NormalDist().pdf(z) / alpha
+
+    result = {}
+    for window in windows:
+        metrics = {name: np.full(values.shape, np.nan) for name in RISK_METRICS}
+        if len(values) >= window:
+            mean, std, complete = _rolling_moments(values, window)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sharpe = np.where(std == 0, 0.0, mean / std * np.sqrt(periods_per_year))
+            var_hist, cvar_hist = _rolling_var_hist(values, window, alpha)
+            computed = {
+                "sharpe": sharpe,
+                "max_drawdown": _rolling_drawdown(values, window),
+                "var_hist": var_hist,
+                "cvar_hist": cvar_hist,
+                "var_param": -(mean + z * std),
+                "cvar_param": -(mean - tail * std),
+            }
+            for name, arr in computed.items():
+                metrics[name][window - 1:] = np.where(complete, arr, np.nan)
+
+        if single:
+            result[window] = pd.DataFrame(
+                {name: arr[:, 0] for name, arr in metrics.items()}, index=frame.index)
+        else:
+            result[window] = pd.concat(
+                {name: pd.DataFrame(arr, index=frame.index, columns=frame.columns) for name, arr in metrics.items()},
+                axis=1)
+    return result
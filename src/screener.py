@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer import PanelAnalyzer, VERDICT_BANDS, verdict_band
+from src.fundamentals import RADAR_CATEGORIES, radar_frame, sector_percentiles
+from src.metadata import get_metadata_cache
+from src.price_matrix import PriceMatrix
+from src.price_store import get_price_store
+
+STOCKS_LIST_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "stocks_list.csv")
+
+# Ile tickerów trafia do jednego zapytania zbiorczego i ile zapytań biegnie naraz
+SCREENER_CHUNK_SIZE = 50
+SCREENER_MAX_WORKERS = 4
+
+
+def load_universe(path=STOCKS_LIST_PATH):
+    """Wczytuje listę spółek (ticker, name) bez duplikatów - pierwsze wystąpienie tickera wygrywa."""
+    df = pd.read_csv(path, dtype=str)
+    df["ticker"] = df["ticker"].str.strip().str.upper()
+    df = df.dropna(subset=["ticker"])
+    df = df[df["ticker"] != ""]
+    return df.drop_duplicates(subset="ticker", keep="first").reset_index(drop=True)
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class Screener:
+    """
+    Skaner uniwersum spółek: notowania i metadane pobierane paczkami (ograniczona liczba
+    równoległych zapytań), wskaźniki liczone panelowo dla wszystkich tickerów naraz.
+    Przy ciepłym magazynie notowań i cache metadanych nie wykonuje żadnych zapytań do API.
+    """
+    def __init__(self, store=None, metadata=None, chunk_size=SCREENER_CHUNK_SIZE, max_workers=SCREENER_MAX_WORKERS):
+        self.store = store or get_price_store()
+        self.metadata = metadata or get_metadata_cache()
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def _parallel(self, fn, tickers):
+        """Wywołuje fn(paczka) dla paczek tickerów (najwyżej max_workers naraz) i łączy słowniki wyników."""
+        result = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="screener") as pool:
+            for part in pool.map(fn, _chunks(tickers, self.chunk_size)):
+                result.update(part)
+        return result
+
+    def fetch_prices(self, tickers, period="1y"):
+        """Ceny zamknięcia (PriceMatrix) dla całego uniwersum."""
+        frames = self._parallel(lambda part: self.store.get_history_batch(part, period=period), tickers)
+        return PriceMatrix.from_history(frames).drop_empty()
+
+    def fetch_metadata(self, tickers):
+        return self._parallel(self.metadata.get_many, tickers)
+
+    def run(self, universe=None, period="1y", fundamentals=True):
+        """
+        Skanuje uniwersum (DataFrame z kolumnami ticker, name - domyślnie stocks_list.csv).
+        Zwraca ranking: jeden wiersz na ticker, posortowany wg wyniku technicznego i oceny fundamentów.
+        """
+        universe = load_universe() if universe is None else universe
+        tickers = universe["ticker"].tolist()
+        names = dict(zip(universe["ticker"], universe.get("name", universe["ticker"])))
+
+        matrix = self.fetch_prices(tickers, period=period)
+        if matrix.empty:
+            return pd.DataFrame()
+
+        panel = PanelAnalyzer(matrix)
+        summary = panel.summary()
+        # Wynik z ostatniej sesji każdego tickera - brak świecy w ostatnim dniu nie daje sygnału sprzedaży
+        scores = pd.Series(panel.last_valid(panel.technical_scores().to_numpy()), index=matrix.tickers)
+        labels = np.array([label for _, label, _ in VERDICT_BANDS], dtype=object)
+        # Ostatnia znana cena (ticker mógł nie mieć sesji w ostatnim dniu, np. inna giełda)
+        last_close = pd.Series(matrix.align("ffill").values[-1], index=matrix.tickers)
+
+        ranking = pd.DataFrame({
+            "Nazwa": [names.get(t, t) for t in summary.index],
+            "Cena": last_close,
+            "Zmiana 1D (%)": summary["Returns"] * 100,
+            "RSI": summary["RSI"],
+            "Zmienność": summary["volatility"],
+            "Sharpe": summary["sharpe_ratio"],
+            "Max Drawdown (%)": summary["max_drawdown"] * 100,
+            "Wynik tech.": scores,
+            "Werdykt": labels[verdict_band(scores.to_numpy())],
+        }, index=summary.index)
+        ranking.index.name = "Ticker"
+
+        if fundamentals:
+            meta = pd.DataFrame.from_dict(self.fetch_metadata(list(ranking.index)), orient="index")
+            meta = meta.reindex(ranking.index)
+            radar = radar_frame(meta)
+            sectors = meta["sector"].fillna("Brak danych") if "sector" in meta.columns else "Brak danych"
+            ranking[RADAR_CATEGORIES] = radar[RADAR_CATEGORIES]
+            ranking["Fundamenty"] = radar["Ocena"]
+            ranking["Sektor"] = sectors
+            # Ocena fundamentów na tle sektora (percentyl wśród skanowanych spółek z tego sektora)
+            ranking["Fundamenty vs sektor (pct)"] = sector_percentiles(radar, ranking["Sektor"])["Ocena"]
+
+        sort_by = ["Wynik tech.", "Fundamenty"] if fundamentals else ["Wynik tech."]
+        return ranking.sort_values(sort_by, ascending=False, kind="stable")
+
+
+def filter_ranking(ranking, min_score=None, sectors=None, rsi_range=None, min_fundamentals=None):
+    """Filtruje ranking skanera (wszystkie kryteria opcjonalne)."""
+    mask = pd.Series(True, index=ranking.index)
+    if min_score is not None:
+        mask &= ranking["Wynik tech."] >= min_score
+    if sectors:
+        mask &= ranking["Sektor"].isin(sectors)
+    if rsi_range is not None:
+        mask &= ranking["RSI"].between(*rsi_range)
+    if min_fundamentals is not None and "Fundamenty" in ranking.columns:
+        mask &= ranking["Fundamenty"] >= min_fundamentals
+    return ranking[mask]
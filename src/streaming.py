@@ -0,0 +1,271 @@
+import heapq
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer import IndicatorState
+from src.backtester import affordable_shares
+from src.price_store import get_price_store
+
+# Jedna świeca w strumieniu: czas (Timestamp), symbol, cena zamknięcia
+Bar = namedtuple("Bar", ["time", "symbol", "close"])
+
+# Ile wierszy naraz czytamy z pliku lub DataFrame
+STREAM_CHUNK_SIZE = 65536
+
+
+# --- ŹRÓDŁA ŚWIEC (generatory - w pamięci jest najwyżej jedna porcja) ---
+def _chunk_bars(chunk, symbol):
+    close = chunk["Close"].to_numpy(dtype=float).tolist()
+    for time, price in zip(chunk.index, close):
+        if not math.isnan(price):
+            yield Bar(time, symbol, price)
+
+
+def frame_bars(df, symbol, chunk_size=STREAM_CHUNK_SIZE):
+    """Świece z DataFrame (indeks - data) wydawane po kolei."""
+    for lo in range(0, len(df), chunk_size):
+        yield from _chunk_bars(df.iloc[lo:lo + chunk_size], symbol)
+
+
+def csv_bars(path, symbol, date_column="Date", chunk_size=STREAM_CHUNK_SIZE):
+    """Świece z pliku CSV czytanego porcjami (kolumny: date_column, Close)."""
+    for chunk in pd.read_csv(path, usecols=[date_column, "Close"], parse_dates=[date_column],
+                             index_col=date_column, chunksize=chunk_size):
+        yield from _chunk_bars(chunk, symbol)
+
+
+def store_bars(ticker, interval="1d", store=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Świece z lokalnego magazynu notowań (PriceStore), czytane porcjami z pliku parquet."""
+    store = store or get_price_store()
+    for chunk in store.iter_batches(ticker, interval, batch_size=chunk_size):
+        yield from _chunk_bars(chunk, ticker)
+
+
+def merge_bars(*streams):
+    """Łączy strumienie wielu symboli w jeden, uporządkowany po czasie (każdy strumień musi być posortowany)."""
+    return heapq.merge(*streams, key=lambda bar: bar.time)
+
+
+# --- STRATEGIE ZDARZENIOWE ---
+class IndicatorStrategy:
+    """
+    Strategia dla strumienia świec: osobny IndicatorState (stała pamięć) dla każdego symbolu.
+    on_bar zwraca docelową ekspozycję symbolu albo None (bez zmian). Reguły jak w strategiach sygnałowych
+    src/backtester.py ("macd", "ema", "rsi") są binarne: 1 - pełna alokacja symbolu, 0 - gotówka.
+    Własne strategie mogą zwracać dowolną ekspozycję 0-1 - StreamingBacktester dostosowuje do niej pozycję.
+    """
+    def __init__(self, rule="macd", lower=30, upper=70, **indicator_params):
+        self.rule = rule
+        self.lower = lower
+        self.upper = upper
+        self.indicator_params = indicator_params
+        self.states = {}
+
+    def on_bar(self, bar):
+        state = self.states.get(bar.symbol)
+        if state is None:
+            state = self.states[bar.symbol] = IndicatorState(**self.indicator_params)
+        v = state.update(bar.close)
+
+        if self.rule == "macd":
+            return float(v["MACD"] > v["MACD_signal"])
+        if self.rule == "ema":
+            return float(v["Close"] > v["EMA_long"])
+        if self.rule == "rsi":
+            if v["RSI"] < self.lower:
+                return 1.0
+            if v["RSI"] > self.upper:
+                return 0.0
+            return None
+        raise ValueError(f"Nieznana reguła strategii: {self.rule}")
+
+
+# --- METRYKI LICZONE NA BIEŻĄCO ---
+class StreamingMetrics:
+    """
+    Metryki krzywej kapitału aktualizowane przyrostowo (Welford dla zmienności, bieżący szczyt dla drawdownu).
+    periods_per_year (liczba świec w roku, do annualizacji) - domyślnie wyznaczana ze strumienia:
+    liczba zwrotów na rok czasu kalendarzowego (np. ~252 dla świec dziennych, ~52 dla tygodniowych).
+    """
+    def __init__(self, periods_per_year=None):
+        self.periods_per_year = periods_per_year
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.first = None
+        self.last = None
+        self.peak = None
+        self.max_drawdown = 0.0
+
+    def update(self, time, equity):
+        if self.first is None:
+            self.first = self.last = (time, equity)
+            self.peak = equity
+            return
+        ret = equity / self.last[1] - 1
+        self.count += 1
+        delta = ret - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (ret - self.mean)
+        self.last = (time, equity)
+        self.peak = max(self.peak, equity)
+        self.max_drawdown = min(self.max_drawdown, equity / self.peak - 1)
+
+    def annualization(self):
+        """Liczba świec w roku: podana w konstruktorze albo wyznaczona z dotychczasowego strumienia."""
+        if self.periods_per_year is not None:
+            return self.periods_per_year
+        elapsed = (self.last[0] - self.first[0]).total_seconds() / (365.25 * 86400) if self.count else 0.0
+        return self.count / elapsed if elapsed > 0 else 252
+
+    def summary(self):
+        """Metryki jak performance_metrics (src/backtester.py), bez przechowywania krzywej kapitału."""
+        if self.count < 1 or self.first[1] <= 0:
+            return {}
+        periods = self.annualization()
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        years = max((self.last[0] - self.first[0]).days / 365.25, 1 / periods)
+        growth = self.last[1] / self.first[1]
+        return {
+            "total_return": (growth - 1) * 100,
+            "cagr": (growth ** (1 / years) - 1) * 100 if growth > 0 else -100.0,
+            "volatility": std * math.sqrt(periods) * 100,
+            "sharpe_ratio": self.mean / std * math.sqrt(periods) if std > 0 else 0.0,
+            "periods_per_year": periods,
+            "max_drawdown": self.max_drawdown * 100,
+        }
+
+
+# --- BACKTEST ZDARZENIOWY ---
+class StreamingBacktester:
+    """
+    Backtest sterowany zdarzeniami dla dowolnie długiego strumienia świec (wiele symboli, np. świece minutowe).
+    Świece czytane są leniwie (generatory), a w pamięci trzymany jest tylko stan strategii, pozycje,
+    gotówka i ostatnie ceny - zużycie pamięci nie zależy od długości historii.
+    Sygnał ze świecy symbolu realizowany jest po cenie zamknięcia jego następnej świecy (jak w SignalBacktester).
+    Pozycja symbolu to ekspozycja x allocation x kapitał - ustalana przy wejściu i dostosowywana
+    (dokupienie lub częściowa sprzedaż) przy zmianie docelowej ekspozycji, np. 1.0 -> 0.5.
+    periods_per_year: liczba świec w roku do annualizacji metryk (None - wyznaczana ze strumienia).
+    """
+    def __init__(self, strategy, initial_capital=10000.0, allocation=1.0, commission=0.001, commission_min=0.0,
+                 slippage=0.0005, fractional=True, snapshot_every=1, periods_per_year=None):
+        self.strategy = strategy
+        self.initial_capital = initial_capital
+        self.allocation = allocation
+        self.commission = commission
+        self.commission_min = commission_min
+        self.slippage = slippage
+        self.fractional = fractional
+        self.snapshot_every = snapshot_every
+        self.metrics = StreamingMetrics(periods_per_year)
+
+        self.cash = initial_capital
+        self.positions = {}
+        self.targets = {}
+        self.last_prices = {}
+        self.pending = {}
+        self.fees = 0.0
+        self.trades = 0
+
+    def _fee(self, notional):
+        return max(notional * self.commission, self.commission_min) if notional > 0 else 0.0
+
+    def equity(self):
+        return self.cash + sum(shares * self.last_prices[s] for s, shares in self.positions.items())
+
+    def _execute(self, bar, target):
+        """Realizacja zaległego sygnału po cenie bieżącej świecy - zwraca zdarzenie "fill" albo None."""
+        if target == self.targets.get(bar.symbol, 0.0):
+            return None
+        held = self.positions.get(bar.symbol, 0.0)
+        diff = self.equity() * self.allocation * target - held * bar.close
+        if target > 0 and diff > 0:
+            price = bar.close * (1 + self.slippage)
+            budget = min(diff, self.cash)
+            shares = affordable_shares(budget, price, self.commission, self.commission_min, self.fractional)
+            fee = self._fee(shares * price)
+            if shares <= 0 or shares * price + fee > self.cash * (1 + 1e-9):
+                return None
+            self.cash = max(self.cash - shares * price - fee, 0.0)
+            self.positions[bar.symbol] = held + shares
+            if held == 0:
+                self.trades += 1
+            side = "BUY"
+        elif held > 0 and diff < 0:
+            price = bar.close * (1 - self.slippage)
+            # Wyjście sprzedaje całość, zmniejszenie ekspozycji - część pozycji
+            shares = held if target == 0 else min(-diff / bar.close, held)
+            if not self.fractional and target > 0:
+                shares = math.floor(shares)
+            if shares <= 0:
+                return None
+            fee = self._fee(shares * price)
+            self.cash += shares * price - fee
+            if shares >= held:
+                del self.positions[bar.symbol]
+            else:
+                self.positions[bar.symbol] = held - shares
+            side = "SELL"
+        else:
+            self.targets[bar.symbol] = target
+            return None
+
+        self.targets[bar.symbol] = target
+        self.fees += fee
+        return {"type": "fill", "time": bar.time, "symbol": bar.symbol, "side": side,
+                "shares": shares, "price": price, "fee": fee, "cash": self.cash}
+
+    def run(self, bars):
+        """
+        Generator zdarzeń: "fill" (transakcja) i "equity" (migawka kapitału co snapshot_every znaczników czasu).
+        Zdarzenia można zapisywać lub agregować na bieżąco; podsumowanie - summary() po wyczerpaniu strumienia.
+        """
+        current_time = None
+        ticks = 0
+        for bar in bars:
+            # Nowy znacznik czasu - migawka kapitału po przetworzeniu wszystkich symboli z poprzedniego
+            if bar.time != current_time:
+                if current_time is not None:
+                    ticks += 1
+                    snapshot = self._snapshot(current_time, ticks % self.snapshot_every == 0)
+                    if snapshot:
+                        yield snapshot
+                current_time = bar.time
+
+            self.last_prices[bar.symbol] = bar.close
+            target = self.pending.pop(bar.symbol, None)
+            if target is not None:
+                fill = self._execute(bar, target)
+                if fill:
+                    yield fill
+
+            signal = self.strategy.on_bar(bar)
+            if signal is not None:
+                self.pending[bar.symbol] = min(max(float(signal), 0.0), 1.0)
+
+        if current_time is not None:
+            # Ostatnia migawka wydawana zawsze
+            yield self._snapshot(current_time, True)
+
+    def _snapshot(self, time, emit):
+        equity = self.equity()
+        self.metrics.update(time, equity)
+        if not emit:
+            return None
+        return {"type": "equity", "time": time, "equity": equity, "cash": self.cash,
+                "positions": len(self.positions)}
+
+    def summary(self):
+        """Metryki całego przebiegu (liczone na bieżąco, bez przechowywania krzywej kapitału)."""
+        equity = self.equity() if self.last_prices else self.initial_capital
+        summary = self.metrics.summary()
+        summary.update({
+            "final_value": equity,
+            "profit": equity - self.initial_capital,
+            "trades": self.trades,
+            "fees": self.fees,
+        })
+        return summary
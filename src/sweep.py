@@ -0,0 +1,333 @@
+import os
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer import ema, rsi_panel
+from src.backtester import SignalBacktester, performance_metrics
+
+
+# --- STRATEGIE Z PARAMETRAMI (na surowej tablicy cen zamknięcia) ---
+def ema_cross_positions(close, fast=12, slow=26):
+    """W rynku, gdy szybka EMA jest powyżej wolnej."""
+    return (ema(close, fast) > ema(close, slow)).astype(float)
+
+
+def rsi_positions(close, window=14, lower=30, upper=70):
+    """Kupno przy RSI < lower, sprzedaż przy RSI > upper (pomiędzy - bez zmian)."""
+    rsi = rsi_panel(close[:, None], window)[:, 0]
+    state = pd.Series(np.where(rsi < lower, 1.0, np.where(rsi > upper, 0.0, np.nan)))
+    return state.ffill().fillna(0.0).to_numpy()
+
+
+def macd_positions(close, fast=12, slow=26, signal=9):
+    """W rynku, gdy MACD jest powyżej swojej linii sygnału."""
+    macd = ema(close, fast) - ema(close, slow)
+    return (macd > ema(macd, signal)).astype(float)
+
+
+# Strategia -> (funkcja sygnału, domyślna siatka parametrów, warunek poprawności kombinacji)
+SWEEP_STRATEGIES = {
+    "EMA": (ema_cross_positions,
+            {"fast": list(range(5, 55, 5)), "slow": list(range(20, 210, 10))},
+            lambda p: p["fast"] < p["slow"]),
+    "RSI": (rsi_positions,
+            {"window": [7, 10, 14, 21, 28], "lower": [20, 25, 30, 35, 40], "upper": [60, 65, 70, 75, 80]},
+            lambda p: p["lower"] < p["upper"]),
+    "MACD": (macd_positions,
+             {"fast": [5, 8, 10, 12, 15], "slow": [20, 26, 30, 40, 50], "signal": [5, 7, 9, 12]},
+             lambda p: p["fast"] < p["slow"]),
+}
+
+# Ile kombinacji trafia do jednego zadania procesu roboczego
+SWEEP_BATCH_SIZE = 32
+
+# Walk-forward: domyślna długość okna treningowego i testowego (w sesjach)
+WALK_FORWARD_TRAIN = 504
+WALK_FORWARD_TEST = 126
+
+# Sposób uruchamiania procesów roboczych - "fork" w wielowątkowym serwerze Streamlit może skopiować
+# zablokowane blokady innych wątków, dlatego procesy startują od zera
+SWEEP_START_METHOD = "spawn"
+
+
+def parameter_grid(strategy, grid=None):
+    """Lista poprawnych kombinacji parametrów (słowników) dla strategii."""
+    _, default_grid, valid = SWEEP_STRATEGIES[strategy]
+    grid = grid or default_grid
+    names = list(grid)
+    combos = (dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names)))
+    return [p for p in combos if valid(p)]
+
+
+# --- PAMIĘĆ WSPÓŁDZIELONA ---
+# Tablice w pamięci współdzielonej podłączane są raz na proces (po nazwie segmentu)
+_attached = {}
+
+
+def share_array(array):
+    """Kopiuje tablicę do nowego segmentu pamięci współdzielonej - zwraca (segment, opis dla attach_array)."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def release_arrays(*segments):
+    """Zamyka i usuwa segmenty utworzone przez share_array."""
+    for shm in segments:
+        shm.close()
+        # Procesy robocze wyrejestrowują segment (attach_array), a resource_tracker bywa wspólny
+        # z procesem głównym - rejestrujemy go ponownie, żeby unlink() wyrejestrował istniejący wpis
+        resource_tracker.register(shm._name, "shared_memory")
+        shm.unlink()
+
+
+def attach_array(spec):
+    """Widok tablicy z pamięci współdzielonej (w procesie roboczym) - bez kopiowania."""
+    name, shape, dtype = spec
+    if name not in _attached:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            # Segmentem zarządza proces, który go utworzył (release_arrays) - bez wyrejestrowania
+            # resource_tracker procesu roboczego usunąłby go lub zgłosił jako wyciek przy zamknięciu
+            resource_tracker.unregister(shm._name, "shared_memory")
+        _attached[name] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    return _attached[name][1]
+
+
+def _process_pool(max_workers):
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(SWEEP_START_METHOD))
+
+
+# --- PROCES ROBOCZY ---
+def _run_batch(strategy, close_spec, dates_spec, combos, costs):
+    """Backtest paczki kombinacji na cenach z pamięci współdzielonej - zwraca listę wierszy wyników."""
+    close = attach_array(close_spec)
+    dates = pd.DatetimeIndex(attach_array(dates_spec).view("datetime64[ns]"))
+    data = pd.DataFrame({"Close": close}, index=dates, copy=False)
+    signal_fn = SWEEP_STRATEGIES[strategy][0]
+    backtester = SignalBacktester(data, **costs)
+
+    rows = []
+    for params in combos:
+        result = backtester.run_signals(signal_fn(close, **params))
+        m = result["metrics"]
+        rows.append({**params, "total_return": m["total_return"], "cagr": m["cagr"],
+                     "sharpe_ratio": m["sharpe_ratio"], "max_drawdown": m["max_drawdown"],
+                     "trades": m["trades"], "win_rate": m["win_rate"]})
+    return rows
+
+
+def _run_window(close_spec, dates_spec, positions_spec, window, costs, metric):
+    """
+    Jedno okno walk-forward: wybór najlepszej kombinacji na odcinku treningowym - zwraca (indeks, metryki).
+    Sygnały wszystkich kombinacji są już policzone na całej historii - tu tylko wycinamy odcinki.
+    """
+    close = attach_array(close_spec)
+    dates = pd.DatetimeIndex(attach_array(dates_spec).view("datetime64[ns]"))
+    positions = attach_array(positions_spec)
+    data = pd.DataFrame({"Close": close}, index=dates, copy=False)
+    train_start, test_start, _ = window
+
+    train = SignalBacktester(data.iloc[train_start:test_start], **costs)
+    scores = np.full(len(positions), -np.inf)
+    train_metrics = [None] * len(positions)
+    for i, pos in enumerate(positions):
+        m = train.run_signals(pos[train_start:test_start])["metrics"]
+        if m:
+            scores[i], train_metrics[i] = m[metric], m
+    best = int(np.argmax(np.nan_to_num(scores, nan=-np.inf)))
+    return best, train_metrics[best] or {}
+
+
+# --- PRZESZUKIWANIE SIATKI ---
+class ParameterSweep:
+    """
+    Przeszukiwanie siatki parametrów strategii dla jednego tickera w puli procesów.
+    Ceny i daty trafiają do pamięci współdzielonej (procesy robocze ich nie kopiują),
+    a zadaniami są tylko małe paczki kombinacji parametrów. Wyniki spływają na bieżąco.
+    """
+    def __init__(self, data, strategy="EMA", grid=None, max_workers=None, batch_size=SWEEP_BATCH_SIZE,
+                 initial_capital=10000.0, commission=0.001, slippage=0.0005, fractional=True):
+        self.data = data
+        self.strategy = strategy
+        self.combos = parameter_grid(strategy, grid)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.costs = {"initial_capital": initial_capital, "commission": commission,
+                      "slippage": slippage, "fractional": fractional}
+
+    def __len__(self):
+        return len(self.combos)
+
+    def iter_results(self, progress=None, should_stop=None):
+        """
+        Generator paczek wyników (DataFrame) w kolejności ukończenia.
+        progress(ukończone, wszystkie) - wywoływane po każdej paczce;
+        should_stop() - zwraca True, aby przerwać (pozostałe zadania są anulowane).
+        """
+        close = np.ascontiguousarray(self.data["Close"].to_numpy(dtype=np.float64))
+        dates = np.ascontiguousarray(pd.DatetimeIndex(self.data.index).to_numpy(dtype="datetime64[ns]").view("int64"))
+        batches = [self.combos[i:i + self.batch_size] for i in range(0, len(self.combos), self.batch_size)]
+
+        close_shm, close_spec = share_array(close)
+        dates_shm, dates_spec = share_array(dates)
+        pool = _process_pool(self.max_workers)
+        done_count = 0
+        try:
+            pending = {pool.submit(_run_batch, self.strategy, close_spec, dates_spec, batch, self.costs): len(batch)
+                       for batch in batches}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done_count += pending.pop(future)
+                    yield pd.DataFrame(future.result())
+                if progress:
+                    progress(done_count, len(self.combos))
+                if should_stop and should_stop():
+                    break
+        finally:
+            # Przerwanie (także przez zamknięcie generatora) anuluje niewykonane zadania
+            pool.shutdown(wait=True, cancel_futures=True)
+            release_arrays(close_shm, dates_shm)
+
+    def run(self, sort_by="sharpe_ratio", progress=None, should_stop=None):
+        """Ranking wszystkich (lub ukończonych przed przerwaniem) kombinacji, od najlepszej wg sort_by."""
+        parts = list(self.iter_results(progress=progress, should_stop=should_stop))
+        if not parts:
+            return pd.DataFrame()
+        results = pd.concat(parts, ignore_index=True)
+        return results.sort_values(sort_by, ascending=False, kind="stable").reset_index(drop=True)
+
+
+def heatmap(results, x, y, metric="sharpe_ratio"):
+    """Tabela metryki dla dwóch parametrów (pozostałe - najlepsza wartość), np. do wykresu heatmapy."""
+    return results.pivot_table(index=y, columns=x, values=metric, aggfunc="max")
+
+
+# --- WALK-FORWARD ---
+def walk_forward_windows(n, train_size=WALK_FORWARD_TRAIN, test_size=WALK_FORWARD_TEST, anchored=False):
+    """
+    Podział n sesji na kolejne okna (train_start, test_start, test_end) - indeksy pozycyjne.
+    Okno testowe przesuwa się o test_size; trening to poprzednie train_size sesji (okno kroczące)
+    lub cała historia od początku (anchored=True). Ostatnie okno testowe może być krótsze.
+    """
+    windows = []
+    test_start = train_size
+    # Okno testowe potrzebuje co najmniej dwóch sesji
+    while test_start + 2 <= n:
+        test_end = min(test_start + test_size, n)
+        windows.append((0 if anchored else test_start - train_size, test_start, test_end))
+        test_start = test_end
+    return windows
+
+
+class WalkForward:
+    """
+    Optymalizacja walk-forward: w każdym oknie parametry dobierane są na odcinku treningowym
+    (najlepsza kombinacja wg metric), a oceniane na następnym, niewidzianym odcinku testowym.
+    Odcinki testowe tworzą jeden ciągły backtest poza próbą (out-of-sample) - pozycja przechodzi między oknami.
+    Sygnały wszystkich kombinacji liczone są raz na całej historii (bez rozbiegu wskaźników
+    w każdym oknie) i razem z cenami trafiają do pamięci współdzielonej; okna liczone są równolegle.
+    """
+    def __init__(self, data, strategy="EMA", grid=None, train_size=WALK_FORWARD_TRAIN, test_size=WALK_FORWARD_TEST,
+                 anchored=False, metric="sharpe_ratio", max_workers=None,
+                 initial_capital=10000.0, commission=0.001, slippage=0.0005, fractional=True):
+        self.data = data
+        self.strategy = strategy
+        self.combos = parameter_grid(strategy, grid)
+        self.windows = walk_forward_windows(len(data), train_size, test_size, anchored)
+        self.metric = metric
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initial_capital = initial_capital
+        self.costs = {"initial_capital": initial_capital, "commission": commission,
+                      "slippage": slippage, "fractional": fractional}
+
+    def __len__(self):
+        return len(self.windows)
+
+    def run(self, progress=None):
+        """
+        Zwraca słownik: windows (DataFrame - okna, wybrane parametry, wynik w treningu i w teście),
+        equity (sklejona krzywa kapitału poza próbą), trades, metrics (metryki poza próbą),
+        benchmark_equity (krzywa Kup i Trzymaj w tym samym okresie), benchmark (jej metryki) i efficiency (CAGR w teście / CAGR w treningu).
+        progress(ukończone, wszystkie) - wywoływane po każdym oknie.
+        """
+        if not self.windows or not self.combos:
+            return None
+
+        close = np.ascontiguousarray(self.data["Close"].to_numpy(dtype=np.float64))
+        dates = np.ascontiguousarray(pd.DatetimeIndex(self.data.index).to_numpy(dtype="datetime64[ns]").view("int64"))
+        signal_fn = SWEEP_STRATEGIES[self.strategy][0]
+        positions = np.vstack([signal_fn(close, **params) for params in self.combos]).astype(np.float64)
+
+        segments = []
+        specs = []
+        for array in (close, dates, positions):
+            shm, spec = share_array(array)
+            segments.append(shm)
+            specs.append(spec)
+        results = [None] * len(self.windows)
+        try:
+            with _process_pool(self.max_workers) as pool:
+                futures = {pool.submit(_run_window, *specs, window, self.costs, self.metric): k
+                           for k, window in enumerate(self.windows)}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    results[futures[future]] = future.result()
+                    if progress:
+                        progress(done, len(self.windows))
+        finally:
+            release_arrays(*segments)
+        return self._stitch(results, positions)
+
+    def _stitch(self, results, positions):
+        """
+        Jeden ciągły backtest poza próbą: w każdym oknie testowym sygnał pochodzi z kombinacji wybranej
+        w jego treningu. Pozycja przechodzi przez granice okien - zmiana parametrów powoduje transakcję
+        tylko wtedy, gdy zmienia się docelowa ekspozycja (bez sztucznego wyjścia i ponownego wejścia).
+        """
+        index = self.data.index
+        # Test zaczyna się od ostatniej sesji treningowej: sygnał z niej jest realizowany w pierwszej sesji testu
+        first = self.windows[0][1] - 1
+        last = self.windows[-1][2]
+        signal = np.zeros(last - first)
+        for (_, test_start, test_end), (best, _) in zip(self.windows, results):
+            signal[test_start - 1 - first:test_end - first] = positions[best, test_start - 1:test_end]
+        test = SignalBacktester(self.data.iloc[first:last], **self.costs).run_signals(signal)
+        equity, trades = test["equity"], test["trades"]
+
+        rows = []
+        for (train_start, test_start, test_end), (best, train_m) in zip(self.windows, results):
+            # Metryki okna z odcinka ciągłej krzywej kapitału (od ostatniej sesji treningowej)
+            m = performance_metrics(equity.iloc[test_start - 1 - first:test_end - first])
+            entries = trades["entry_date"].between(index[test_start], index[test_end - 1])
+            rows.append({
+                "train_start": index[train_start], "test_start": index[test_start], "test_end": index[test_end - 1],
+                **self.combos[best],
+                f"train_{self.metric}": train_m.get(self.metric, np.nan),
+                "train_cagr": train_m.get("cagr", np.nan),
+                "test_total_return": m["total_return"], "test_cagr": m["cagr"],
+                "test_sharpe_ratio": m["sharpe_ratio"], "test_max_drawdown": m["max_drawdown"],
+                "test_trades": int(entries.sum()),
+            })
+
+        windows = pd.DataFrame(rows)
+        close = self.data["Close"].loc[equity.index]
+        benchmark = close / close.iloc[0] * self.initial_capital
+        metrics = test["metrics"]
+        train_cagr = windows["train_cagr"].mean()
+        return {
+            "windows": windows,
+            "equity": equity,
+            "trades": trades,
+            "metrics": metrics,
+            "benchmark_equity": benchmark,
+            "benchmark": performance_metrics(benchmark),
+            "efficiency": metrics["cagr"] / train_cagr if train_cagr > 0 else np.nan,
+        }
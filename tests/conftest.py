@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_ohlcv(n=300, seed=0, start="2020-01-01", freq="B"):
+    """Syntetyczna historia OHLCV (losowy spacer), wspólna dla testów."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    index = pd.date_range(start, periods=n, freq=freq)
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.003, n)),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 100_000, n).astype(float),
+    }, index=index)
+
+
+@pytest.fixture
+def ohlcv():
+    return make_ohlcv()
@@ -0,0 +1,54 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analytics_cache import AnalyticsCache, fingerprint
+
+
+def frame(seed):
+    return pd.DataFrame({"Close": np.random.default_rng(seed).random(50)})
+
+
+def test_corrupt_disk_entry_is_removed_and_recomputed(tmp_path):
+    df = frame(0)
+    cache = AnalyticsCache(disk_dir=str(tmp_path))
+    path = cache._disk_path(fingerprint(df, namespace="ns"))
+    with open(path, "wb") as f:
+        f.write(b"\x80\x05niepelny zapis")
+
+    assert cache.get_or_compute("ns", df, {}, lambda: 42) == 42
+    assert cache.stats()["misses"] == 1
+
+    # Plik nadpisany poprawnym wynikiem - nowy proces czyta go z dysku
+    fresh = AnalyticsCache(disk_dir=str(tmp_path))
+    assert fresh.get_or_compute("ns", df, {}, lambda: 0) == 42
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_is_pruned_by_size(tmp_path):
+    cache = AnalyticsCache(disk_dir=str(tmp_path), disk_max_bytes=3 * 1100)
+    payload = b"x" * 1000
+    for i in range(6):
+        cache.get_or_compute("ns", frame(i), {}, lambda: payload)
+        # Rosnący mtime kolejnych zapisów, niezależnie od rozdzielczości zegara systemu plików
+        stamp = time.time() - 100 + i
+        os.utime(cache._disk_path(fingerprint(frame(i), namespace="ns")), (stamp, stamp))
+
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 3
+    newest = {os.path.basename(cache._disk_path(fingerprint(frame(i), namespace="ns"))) for i in (3, 4, 5)}
+    assert set(names) == newest
+
+
+def test_disk_tier_drops_entries_older_than_max_age(tmp_path):
+    cache = AnalyticsCache(disk_dir=str(tmp_path), disk_max_age_days=1)
+    cache.get_or_compute("ns", frame(0), {}, lambda: 1)
+    old = cache._disk_path(fingerprint(frame(0), namespace="ns"))
+    two_days_ago = time.time() - 2 * 86400
+    os.utime(old, (two_days_ago, two_days_ago))
+
+    cache.get_or_compute("ns", frame(1), {}, lambda: 2)
+    assert not os.path.exists(old)
+    assert len(os.listdir(tmp_path)) == 1
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzer import PanelAnalyzer, StockAnalyzer, compute_all, score_history, score_reasons
+from tests.conftest import make_ohlcv
+
+
+def reference_indicators(df, bb_window=20, bb_std=2.0, atr_window=14, stoch_window=14, stoch_smooth=3):
+    """Wskaźniki liczone dotychczasową ścieżką: StockAnalyzer i operacje rolling z pandas."""
+    analyzer = StockAnalyzer(df.copy())
+    analyzer.calculate_returns()
+    analyzer.calculate_ema()
+    analyzer.calculate_macd()
+    analyzer.calculate_rsi()
+    out = analyzer.df[["Returns", "EMA_short", "EMA_long", "MACD", "MACD_signal", "RSI"]].copy()
+
+    close, high, low = df["Close"], df["High"], df["Low"]
+    out["BB_mid"] = close.rolling(bb_window).mean()
+    std = close.rolling(bb_window).std()
+    out["BB_upper"] = out["BB_mid"] + bb_std * std
+    out["BB_lower"] = out["BB_mid"] - bb_std * std
+
+    prev = close.shift()
+    tr = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1, skipna=False)
+    tr.iloc[0] = high.iloc[0] - low.iloc[0]
+    out["ATR"] = tr.rolling(atr_window).mean()
+
+    lowest, highest = low.rolling(stoch_window).min(), high.rolling(stoch_window).max()
+    out["Stoch_K"] = (close - lowest) / (highest - lowest) * 100
+    out["Stoch_D"] = out["Stoch_K"].rolling(stoch_smooth).mean()
+    return out
+
+
+def assert_matches_reference(df):
+    result = compute_all(df).to_frame()
+    expected = reference_indicators(df)
+    for name in expected.columns:
+        np.testing.assert_allclose(result[name].to_numpy(), expected[name].to_numpy(),
+                                   rtol=1e-7, atol=1e-7, equal_nan=True, err_msg=name)
+
+
+def test_compute_all_matches_stock_analyzer_and_pandas(ohlcv):
+    assert_matches_reference(ohlcv)
+
+
+def test_flat_stretch_does_not_poison_stochastic():
+    df = make_ohlcv(200, seed=1)
+    # Zawieszenie notowań: 20 sesji bez ruchu ceny (High == Low == Close)
+    df.iloc[50:70, :4] = df["Close"].iloc[49]
+    result = compute_all(df)
+
+    assert np.isnan(result["Stoch_D"][70])
+    assert np.isfinite(result["Stoch_D"][-50:]).all()
+    assert_matches_reference(df)
+
+
+def test_missing_high_low_only_blank_their_windows():
+    df = make_ohlcv(200, seed=2)
+    df.iloc[[40, 120], df.columns.get_indexer(["High", "Low"])] = np.nan
+    result = compute_all(df)
+
+    assert np.isfinite(result["ATR"][-50:]).all()
+    assert np.isfinite(result["Stoch_D"][-50:]).all()
+    assert_matches_reference(df)
+
+
+@pytest.mark.parametrize("n", [0, 1, 5])
+def test_short_history(n):
+    df = make_ohlcv(n) if n else make_ohlcv(1).iloc[:0]
+    result = compute_all(df)
+    assert len(result) == n
+    if n:
+        assert_matches_reference(df)
+
+
+def legacy_technical_score(df_tech):
+    """Dotychczasowa funkcja ze strony analizy (pages/1_Analiza.py) - wynik dla ostatniej świecy."""
+    score = 0
+    last_rsi = df_tech['RSI'].iloc[-1]
+    if last_rsi < 30:
+        score += 2
+    elif last_rsi > 70:
+        score -= 2
+    if df_tech['Close'].iloc[-1] > df_tech['EMA_long'].iloc[-1]:
+        score += 3
+    else:
+        score -= 3
+    if df_tech['MACD'].iloc[-1] > df_tech['MACD_signal'].iloc[-1]:
+        score += 2
+    elif df_tech['MACD'].iloc[-1] < df_tech['MACD_signal'].iloc[-1]:
+        score -= 2
+    return score
+
+
+def legacy_verdict(total_score):
+    if total_score >= 4:
+        return "MOCNE KUPUJ 🚀"
+    if total_score >= 1:
+        return "KUPUJ ↗️"
+    if total_score > -1:
+        return "NEUTRALNIE 😐"
+    if total_score > -4:
+        return "SPRZEDAWAJ ↘️"
+    return "MOCNE SPRZEDAWAJ 🔻"
+
+
+def analyzed(df):
+    analyzer = StockAnalyzer(df.copy())
+    analyzer.calculate_returns()
+    analyzer.calculate_ema()
+    analyzer.calculate_macd()
+    analyzer.calculate_rsi()
+    return analyzer.df
+
+
+def test_score_history_matches_legacy_page_function():
+    df = analyzed(make_ohlcv(250, seed=3))
+    history = score_history(df)
+    for i in range(len(df)):
+        expected = legacy_technical_score(df.iloc[:i + 1])
+        assert history["Score"].iloc[i] == expected, df.index[i]
+        assert history["Verdict"].iloc[i] == legacy_verdict(expected)
+    assert score_reasons(df)[0] == legacy_technical_score(df)
+    # Historia obejmuje pełen zakres wyników, łącznie z RSI poza strefą neutralną
+    assert history["Score"].nunique() > 3
+
+
+def test_panel_scores_match_single_ticker():
+    frames = {t: make_ohlcv(250, seed=s) for t, s in (("AAA", 4), ("BBB", 5))}
+    close = pd.DataFrame({t: df["Close"] for t, df in frames.items()})
+    scores = PanelAnalyzer(close).technical_scores()
+    for t, df in frames.items():
+        np.testing.assert_array_equal(scores[t].to_numpy(), score_history(analyzed(df))["Score"].to_numpy())
@@ -0,0 +1,31 @@
+from src.analyzer import resample_ohlcv
+from src.backtest_store import BacktestStore
+from src.database import BacktestDB
+from tests.conftest import make_ohlcv
+
+PARAMS = {"initial_capital": 10000.0}
+
+
+def run_for(data):
+    return lambda: {"metrics": {"total_return": float(data["Close"].iloc[-1] / data["Close"].iloc[0] - 1)}}
+
+
+def test_intervals_do_not_evict_each_other(tmp_path):
+    store = BacktestStore(BacktestDB(str(tmp_path / "backtests.db")))
+    daily = make_ohlcv(300)[["Close"]]
+    weekly = resample_ohlcv(make_ohlcv(300), "1wk")[["Close"]]
+
+    store.get_or_run("MACD", PARAMS, "AAA", daily, run_for(daily), interval="1d")
+    store.get_or_run("MACD", PARAMS, "AAA", weekly, run_for(weekly), interval="1wk")
+    assert sorted(store.runs(tickers="AAA")["interval"]) == ["1d", "1wk"]
+
+    # Nowsze notowania dzienne zastępują tylko przebieg dzienny
+    newer = make_ohlcv(310)[["Close"]]
+    store.get_or_run("MACD", PARAMS, "AAA", newer, run_for(newer), interval="1d")
+    runs = store.runs(tickers="AAA")
+    assert sorted(runs["interval"]) == ["1d", "1wk"]
+    assert runs.loc[runs["interval"] == "1d", "data_end"].iloc[0] == newer.index[-1].isoformat()
+
+    store.get_or_run("MACD", PARAMS, "AAA", weekly, run_for(weekly), interval="1wk")
+    assert store.stats() == {"hits": 1, "misses": 3}
+
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import SignalBacktester, buy_and_hold_signal
+
+
+def prices(values, start="2021-01-04"):
+    return pd.DataFrame({"Close": np.asarray(values, dtype=float)},
+                        index=pd.date_range(start, periods=len(values), freq="B"))
+
+
+def test_all_in_entry_survives_float_rounding():
+    # Przy tej cenie shares * cena * (1 + prowizja) wychodzi o ułamek grosza ponad kapitał
+    data = prices([30.08, 30.08, 31.0, 32.0])
+    result = SignalBacktester(data, commission=0.001, slippage=0.0005).run_signals(buy_and_hold_signal(data))
+
+    assert result["metrics"]["trades"] == 1
+    assert result["trades"]["shares"].iloc[0] > 0
+    assert result["equity"].iloc[-1] > result["equity"].iloc[1]
+
+
+def test_run_without_trades_returns_flat_equity():
+    data = prices([10.0, 11.0, 9.0, 12.0])
+    result = SignalBacktester(data).run_signals(np.zeros(len(data)))
+
+    assert result["trades"].empty
+    assert result["metrics"]["trades"] == 0
+    assert result["metrics"]["win_rate"] == 0.0
+    assert (result["equity"] == 10000.0).all()
+
+
+def test_exposure_change_rebalances_open_position():
+    data = prices([10.0, 10.0, 20.0, 20.0, 30.0, 30.0, 40.0])
+    positions = [1.0, 1.0, 0.5, 0.5, 1.0, 1.0, 0.0]
+    result = SignalBacktester(data, commission=0.0, slippage=0.0, lag=0).run_signals(positions)
+    equity = result["equity"].to_numpy()
+
+    # 1000 akcji; przy 20 sprzedaż połowy (10000 gotówki + 500 akcji); przy 30 dokupienie do pełnej ekspozycji
+    np.testing.assert_allclose(equity, [10000, 10000, 20000, 20000, 25000, 25000, 25000 / 30 * 40])
+    trades = result["trades"]
+    assert len(trades) == 1 and not trades["open"].iloc[0]
+    assert trades["pnl"].iloc[0] == equity[-1] - 10000
+
+
+def test_rebalance_costs_are_charged():
+    data = prices([10.0, 10.0, 20.0, 20.0])
+    flat = SignalBacktester(data, commission=0.001, slippage=0.0, lag=0).run_signals([1.0, 1.0, 1.0, 1.0])
+    halved = SignalBacktester(data, commission=0.001, slippage=0.0, lag=0).run_signals([1.0, 1.0, 0.5, 0.5])
+
+    sold = halved["trades"]["shares"].iloc[0] / 2
+    assert halved["metrics"]["fees"] - flat["metrics"]["fees"] == pytest.approx(sold * 20.0 * 0.001)
+    assert halved["trades"]["open"].iloc[0]
+
+
+def test_minimum_commission_leaves_room_for_entry_fee():
+    data = prices(np.linspace(100.0, 120.0, 30))
+    result = SignalBacktester(data, commission=0.001, commission_min=50.0, slippage=0.0,
+                              lag=0).run_signals(np.ones(len(data)))
+
+    trade = result["trades"].iloc[0]
+    assert result["metrics"]["trades"] == 1
+    # Minimalna opłata (50) wyższa niż procentowa (~10) - zakup za kapitał pomniejszony o nią
+    assert trade["fees"] == 50.0
+    assert trade["shares"] == pytest.approx((10000.0 - 50.0) / 100.0)
+    assert result["equity"].iloc[-1] == pytest.approx(trade["shares"] * 120.0)
+
+
+def test_minimum_commission_with_whole_shares():
+    data = prices(np.linspace(100.0, 120.0, 30))
+    result = SignalBacktester(data, commission=0.001, commission_min=50.0, slippage=0.0, fractional=False,
+                              lag=0).run_signals(np.ones(len(data)))
+
+    assert result["trades"]["shares"].iloc[0] == 99
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.basket import BasketBacktester, convert_matrix, rebalance_points
+from src.fx import FxRates
+from src.price_matrix import PriceMatrix
+from tests.conftest import make_ohlcv
+
+
+def basket_prices(n=400, seeds=(0, 1, 2)):
+    return pd.DataFrame({f"T{s}": make_ohlcv(n, seed=s)["Close"].to_numpy() for s in seeds},
+                        index=pd.bdate_range("2021-01-01", periods=n))
+
+
+def test_rebalance_points_on_calendar_boundaries():
+    dates = pd.bdate_range("2024-01-01", "2024-12-31")
+    monthly = dates[rebalance_points(dates, 1)]
+    quarterly = dates[rebalance_points(dates, 3)]
+
+    # Pierwsza sesja każdego miesiąca / kwartału, bez pierwszej sesji okresu
+    first_sessions = pd.Series(dates, index=dates).groupby(dates.to_period("M")).first()
+    assert list(monthly) == list(first_sessions.iloc[1:])
+    assert list(quarterly) == list(first_sessions.iloc[[3, 6, 9]])
+    assert len(rebalance_points(dates, None)) == 0
+
+
+def test_buy_and_hold_keeps_constant_units():
+    prices = basket_prices()
+    weights = {"T0": 0.5, "T1": 0.3, "T2": 0.2}
+    result = BasketBacktester(prices, weights, frequency=None).run()
+
+    fees = 10000.0 * (0.001 + 0.0005)
+    units = (10000.0 - fees) * np.array([0.5, 0.3, 0.2]) / prices.iloc[0].to_numpy()
+    np.testing.assert_allclose(result["equity"].to_numpy(), prices.to_numpy() @ units)
+    assert result["metrics"]["rebalances"] == 0
+    assert result["metrics"]["fees"] == pytest.approx(fees)
+
+
+def test_fees_are_charged_on_turnover():
+    prices = basket_prices()
+    result = BasketBacktester(prices, {"T0": 0.6, "T1": 0.4}, frequency=1, commission=0.002, slippage=0.001).run()
+    rebalances = result["rebalances"]
+
+    assert result["metrics"]["rebalances"] == len(rebalance_points(prices.index, 1))
+    np.testing.assert_allclose(rebalances["fees"], rebalances["turnover"] * 0.003)
+    # Wejście: obrót to cały kapitał, który pomniejszają koszty
+    assert rebalances["turnover"].iloc[0] == pytest.approx(10000.0)
+    assert result["equity"].iloc[0] == pytest.approx(10000.0 * (1 - 0.003))
+    assert result["metrics"]["fees"] == pytest.approx(rebalances["fees"].sum())
+
+    # Po rebalansowaniu wagi wracają do docelowych
+    rows = result["weights"].loc[rebalances["date"].iloc[1:]]
+    np.testing.assert_allclose(rows.to_numpy(), np.tile([0.6, 0.4], (len(rows), 1)))
+
+
+def test_drift_threshold_matches_session_by_session_check():
+    prices = basket_prices(600)
+    target = np.array([0.4, 0.4, 0.2])
+    result = BasketBacktester(prices, dict(zip(prices.columns, target)), frequency=None, threshold=0.05,
+                              commission=0.0, slippage=0.0).run()
+
+    # Ta sama reguła sprawdzana sesja po sesji, bez porcji DRIFT_CHUNK
+    values = prices.to_numpy()
+    units = 10000.0 * target / values[0]
+    expected = []
+    for t in range(1, len(values)):
+        holdings = values[t] * units
+        if np.abs(holdings / holdings.sum() - target).max() > 0.05:
+            expected.append(prices.index[t])
+            units = holdings.sum() * target / values[t]
+
+    assert len(expected) > 1
+    assert list(result["rebalances"]["date"].iloc[1:]) == expected
+    np.testing.assert_allclose(result["equity"].iloc[-1], values[-1] @ units)
+
+
+class FakeFxStore:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_history(self, ticker, period="1y", interval="1d"):
+        return self.frames.get(ticker, pd.DataFrame())
+
+
+def test_convert_matrix_uses_rate_of_each_session():
+    dates = pd.bdate_range("2024-03-01", periods=5)
+    matrix = PriceMatrix(np.full((5, 3), 100.0), dates, ["AAPL", "VOD.L", "PKO.WA"])
+    # Brak kursu USD z trzeciej sesji - obowiązuje ostatni wcześniejszy
+    usd = pd.DataFrame({"Close": [4.0, 4.1, 4.3, 4.4]}, index=dates.delete(2))
+    gbp = pd.DataFrame({"Close": [5.0, 5.1, 5.2, 5.3, 5.4]}, index=dates)
+    fx = FxRates("PLN", store=FakeFxStore({"USDPLN=X": usd, "GBPPLN=X": gbp}))
+
+    converted = convert_matrix(matrix, ["USD", "GBp", "PLN"], fx=fx)
+
+    np.testing.assert_allclose(converted.values[:, 0], 100.0 * np.array([4.0, 4.1, 4.1, 4.3, 4.4]))
+    # Ceny w pensach: 100 GBp = 1 GBP
+    np.testing.assert_allclose(converted.values[:, 1], 1.0 * gbp["Close"].to_numpy())
+    np.testing.assert_allclose(converted.values[:, 2], 100.0)
+    assert list(converted.tickers) == list(matrix.tickers)
+    assert (matrix.values == 100.0).all()
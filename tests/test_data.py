@@ -0,0 +1,106 @@
+import time
+import threading
+
+import pandas as pd
+import pytest
+
+import src.data as data
+from src.data import SingleFlight, HistoryBatcher
+from tests.conftest import make_ohlcv
+
+
+class CountingStore:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def get_history_batch(self, tickers, period="1y", interval="1d", start=None):
+        self.calls.append(list(tickers))
+        time.sleep(self.delay)
+        return {t: make_ohlcv(20) for t in tickers}
+
+
+def test_single_request_is_not_delayed():
+    batcher = HistoryBatcher(CountingStore(), window=1.0)
+    started = time.perf_counter()
+    df = batcher.submit("AAA", "1y", "1d").result()
+    assert time.perf_counter() - started < 0.5
+    assert len(df) == 20
+
+
+def test_concurrent_requests_are_batched():
+    store = CountingStore(delay=0.2)
+    batcher = HistoryBatcher(store, window=0.1)
+    threads = [threading.Thread(target=lambda t=t: batcher.submit(t, "1y", "1d").result()) for t in "ABCD"]
+    threads[0].start()
+    time.sleep(0.05)  # pierwsze pobranie trwa - kolejne zapytania trafiają do jednej paczki
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.calls[0] == ["A"]
+    assert sorted(store.calls[1]) == ["B", "C", "D"]
+
+
+def test_full_batch_is_flushed_before_window_ends():
+    store = CountingStore(delay=0.3)
+    batcher = HistoryBatcher(store, window=5.0, max_batch=2)
+    first = threading.Thread(target=lambda: batcher.submit("A", "1y", "1d").result())
+    first.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    threads = [threading.Thread(target=lambda t=t: batcher.submit(t, "1y", "1d").result()) for t in "BC"]
+    for t in threads:
+        t.start()
+    for t in threads + [first]:
+        t.join()
+    assert time.perf_counter() - started < 2.0
+
+
+def test_single_flight_followers_get_own_copy():
+    flight = SingleFlight()
+    gate = threading.Event()
+    results = []
+
+    def fetch():
+        gate.wait()
+        return pd.DataFrame({"Close": [1.0, 2.0]})
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", fetch))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    results[0]["RSI"] = 50.0
+    assert len({id(r) for r in results}) == 3
+    assert all(list(r.columns) == ["Close"] for r in results[1:])
+
+
+def test_shared_price_matrix_is_read_only(monkeypatch):
+    monkeypatch.setattr(data, "_price_store", CountingStore())
+    data.StockData.clear_price_matrix()
+    matrix = data.StockData().get_price_matrix(("AAA", "BBB"), period="2y")
+
+    with pytest.raises(ValueError):
+        matrix.values[0, 0] = 0.0
+    with pytest.raises(ValueError):
+        matrix.slice(start=matrix.dates[5]).values[0, 0] = 0.0
+    # Wyrównanie tworzy nową tablicę - można ją modyfikować
+    matrix.align("ffill").values[0, 0] = 0.0
+    assert matrix.values[0, 0] != 0.0
+
+
+def test_price_matrix_is_shared_per_ticker_set(monkeypatch):
+    store = CountingStore()
+    monkeypatch.setattr(data, "_price_store", store)
+    data.StockData.clear_price_matrix()
+
+    first = data.StockData().get_price_matrix(("BBB", "AAA"), period="2y")
+    second = data.StockData().get_price_matrix(("AAA", "BBB", "AAA"), period="2y")
+
+    assert first is second
+    assert list(first.tickers) == ["AAA", "BBB"]
+    assert store.calls == [["AAA", "BBB"]]
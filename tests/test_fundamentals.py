@@ -0,0 +1,52 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.fundamentals import RADAR_CATEGORIES, radar_frame, radar_scores
+
+MISSING = object()
+
+
+def legacy_radar_scores(info):
+    """Dotychczasowa ocena jednej spółki (src/fundamentals.py sprzed wektoryzacji)."""
+    pe = info.get('trailingPE', 50) or 50
+    score_value = max(0, min(100, 100 - (pe * 1.5)))
+    margin = info.get('profitMargins', 0) or 0
+    score_profit = 90 if margin > 0.2 else max(0, min(100, margin * 100 * 2))
+    roe = info.get('returnOnEquity', 0) or 0
+    score_efficiency = max(0, min(100, roe * 100 * 2))
+    debt_eq = info.get('debtToEquity', 100) or 100
+    score_health = max(0, min(100, 100 - (debt_eq / 2)))
+    current_p = info.get('currentPrice', 1)
+    target_p = info.get('targetMeanPrice', current_p)
+    score_growth = max(0, min(100,
+                              50 + (((target_p - current_p) / current_p) * 100))) if target_p and current_p else 50
+    return dict(zip(RADAR_CATEGORIES, [score_value, score_profit, score_efficiency, score_health, score_growth]))
+
+
+def info_grid(values):
+    prices = list(itertools.product(values, repeat=2))
+    others = [(MISSING, MISSING, MISSING, MISSING), (12.0, 0.25, 0.15, 40.0), (-8.0, -0.1, -0.2, 0), (0, 0.05, 0.6, 300.0)]
+    for (current, target), (pe, margin, roe, debt) in itertools.product(prices, others):
+        fields = {"trailingPE": pe, "profitMargins": margin, "returnOnEquity": roe, "debtToEquity": debt,
+                  "currentPrice": current, "targetMeanPrice": target}
+        yield {k: v for k, v in fields.items() if v is not MISSING}
+
+
+def test_radar_scores_match_legacy():
+    # Brak pola, None, zero, ujemny i dodatni potencjał wzrostu
+    for info in info_grid([MISSING, None, 0, -5.0, 0.5, 10.0, 25.0]):
+        expected = legacy_radar_scores(info)
+        assert radar_scores(info) == pytest.approx(expected), info
+
+
+def test_radar_frame_matches_legacy_per_ticker():
+    # Migawka metadanych nie rozróżnia pustego pola od brakującego (MetadataCache.snapshot pomija None)
+    infos = {f"T{i}": info for i, info in enumerate(info_grid([MISSING, 0, -5.0, 0.5, 10.0, 25.0]))}
+    meta = pd.DataFrame.from_dict(infos, orient="index").reindex(list(infos))
+    scores = radar_frame(meta)
+    expected = pd.DataFrame({t: legacy_radar_scores(info) for t, info in infos.items()}).T
+    np.testing.assert_allclose(scores[RADAR_CATEGORIES].to_numpy(), expected[RADAR_CATEGORIES].to_numpy(dtype=float))
+    np.testing.assert_allclose(scores["Ocena"], expected.mean(axis=1).astype(float))
@@ -0,0 +1,71 @@
+import time
+import threading
+
+import pandas as pd
+
+from src.fx import FxRates
+
+DATES = pd.bdate_range("2024-01-01", periods=5)
+
+
+class FakeFxStore:
+    """Magazyn kursów: opcjonalne opóźnienie i awarie dla wybranych par, z licznikiem zapytań."""
+    def __init__(self, delays=None, failing=()):
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.calls = []
+
+    def get_history(self, ticker, period="1y", interval="1d"):
+        self.calls.append(ticker)
+        time.sleep(self.delays.get(ticker, 0.0))
+        if ticker in self.failing:
+            raise ConnectionError("brak połączenia")
+        return pd.DataFrame({"Close": [4.0, 4.1, 4.2, 4.3, 4.4]}, index=DATES)
+
+
+def test_slow_pair_does_not_block_other_currencies():
+    store = FakeFxStore(delays={"USDPLN=X": 0.5})
+    fx = FxRates("PLN", store=store)
+    slow = threading.Thread(target=fx.history, args=("USD",))
+    slow.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    assert not fx.history("EUR").empty
+    assert time.perf_counter() - started < 0.3
+    slow.join()
+
+
+def test_concurrent_requests_share_one_fetch():
+    store = FakeFxStore(delays={"USDPLN=X": 0.2})
+    fx = FxRates("PLN", store=store)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fx.history("USD"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert store.calls == ["USDPLN=X"]
+    assert all(r.equals(results[0]) and len(r) == 5 for r in results)
+
+
+def test_failed_fetch_is_retried_after_short_delay():
+    store = FakeFxStore(failing={"USDPLN=X"})
+    fx = FxRates("PLN", store=store, retry_seconds=0)
+    assert fx.history("USD").empty
+    assert fx.rate("USD") == 1.0
+
+    store.failing.clear()
+    assert fx.rate("USD") == 4.4
+    assert store.calls == ["USDPLN=X"] * 3
+
+
+def test_failed_refresh_keeps_previous_history():
+    store = FakeFxStore()
+    fx = FxRates("PLN", store=store, refresh_minutes=0)
+    assert fx.rate("USD") == 4.4
+
+    store.failing.add("USDPLN=X")
+    assert fx.rate("USD") == 4.4
+    assert len(store.calls) == 2
@@ -0,0 +1,40 @@
+from src.market_pulse import MarketPulse
+
+INDICES = {"S&P 500": "^GSPC", "WIG20": "WIG20.WA"}
+
+
+class FakeProvider:
+    def __init__(self, quotes):
+        self.quotes = quotes
+        self.calls = 0
+
+    def get_quotes(self, tickers, with_currency=False):
+        self.calls += 1
+        return {t: q for t, q in self.quotes.items() if t in tickers}
+
+
+def test_empty_fetch_does_not_mark_snapshot_as_updated():
+    provider = FakeProvider({})
+    pulse = MarketPulse(indices=INDICES, provider=provider)
+
+    snapshot, updated = pulse.get()
+    assert snapshot == {} and updated is None
+
+    # Brak migawki - kolejne wejście ponawia pobranie
+    provider.quotes = {"^GSPC": {"last_price": 101.0, "previous_close": 100.0}}
+    snapshot, updated = pulse.get()
+    assert provider.calls == 2
+    assert updated is not None
+    assert round(snapshot["^GSPC"]["change"], 6) == 1.0
+
+
+def test_failed_refresh_keeps_last_snapshot_and_time():
+    provider = FakeProvider({"^GSPC": {"last_price": 101.0, "previous_close": 100.0}})
+    pulse = MarketPulse(indices=INDICES, provider=provider)
+    _, updated = pulse.get()
+
+    provider.quotes = {}
+    pulse.refresh()
+    snapshot, updated_after = pulse.get()
+    assert updated_after == updated
+    assert snapshot["^GSPC"]["price"] == 101.0
@@ -0,0 +1,72 @@
+import time
+import threading
+
+from src.database import MetadataDB
+from src.metadata import MetadataCache, FIELD_GROUPS
+
+INFO = {"shortName": "Test SA", "sector": "Technology", "trailingPE": 12.5, "currency": "PLN"}
+
+
+class FakeProvider:
+    name = "test"
+
+    def __init__(self, info=INFO, delay=0.0):
+        self.info = info
+        self.delay = delay
+        self.calls = []
+
+    def get_metadata(self, tickers):
+        self.calls.append(list(tickers))
+        time.sleep(self.delay)
+        return {t: dict(self.info) for t in tickers} if self.info else {}
+
+
+def make_cache(tmp_path, provider):
+    return MetadataCache(db=MetadataDB(str(tmp_path / "metadata.db")), provider=provider)
+
+
+def test_failed_refresh_keeps_stale_rows(tmp_path):
+    provider = FakeProvider()
+    cache = make_cache(tmp_path, provider)
+    assert cache.get("AAA")["sector"] == "Technology"
+
+    provider.info = None  # awaria API podczas odświeżania
+    cache.refresh(["AAA"])
+    assert cache.get("AAA") == INFO
+
+
+def test_failed_first_fetch_marks_groups_for_retry(tmp_path):
+    provider = FakeProvider(info=None)
+    cache = make_cache(tmp_path, provider)
+    assert cache.get("AAA") == {}
+
+    stored, missing, stale = cache._state(["AAA"])
+    assert missing == [] and stale == ["AAA"]
+    assert set(stored["AAA"]) == set(FIELD_GROUPS)
+
+
+def test_concurrent_first_visits_fetch_once(tmp_path):
+    provider = FakeProvider(delay=0.2)
+    cache = make_cache(tmp_path, provider)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("AAA"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert provider.calls == [["AAA"]]
+    assert all(r["sector"] == "Technology" for r in results)
+
+
+def test_invalidate_refreshes_fresh_rows(tmp_path):
+    provider = FakeProvider()
+    cache = make_cache(tmp_path, provider)
+    cache.get("AAA")
+    assert cache._state(["AAA"])[2] == []
+
+    cache.invalidate()
+    assert cache._state(["AAA"])[2] == ["AAA"]
+    cache.prefetch(["AAA"], wait=True)
+    assert provider.calls == [["AAA"], ["AAA"]]
+    assert cache._state(["AAA"])[2] == []
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from src.monte_carlo import MC_CHUNK_SIZE, DEFAULT_QUANTILES, simulate_paths
+
+
+def reference_paths(last_price, drift, stdev, days, n_paths, seed, chunk_size=MC_CHUNK_SIZE, dtype=np.float32):
+    """Te same ścieżki co w simulate_paths (te same porcje i generatory), ale trzymane w całości."""
+    sizes = [min(chunk_size, n_paths - lo) for lo in range(0, n_paths, chunk_size)]
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(sizes))]
+    parts = []
+    for rng, n in zip(rngs, sizes):
+        log_paths = rng.standard_normal((n, days), dtype=dtype)
+        log_paths *= np.asarray(stdev, dtype=dtype)
+        log_paths += np.asarray(drift, dtype=dtype)
+        np.cumsum(log_paths, axis=1, out=log_paths)
+        log_paths += np.asarray(np.log(last_price), dtype=dtype)
+        parts.append(np.exp(log_paths).astype(np.float64))
+    return np.vstack(parts)
+
+
+@pytest.mark.parametrize("stdev", [0.01, 0.03])
+def test_bands_match_exact_percentiles(stdev):
+    result = simulate_paths(100.0, 0.0003, stdev, 365, 100_000, seed=1, max_workers=1)
+    paths = reference_paths(100.0, 0.0003, stdev, 365, 100_000, seed=1)
+    exact = np.percentile(paths, DEFAULT_QUANTILES, axis=0).T
+
+    bands = result["bands"].to_numpy()[1:]
+    assert np.abs(bands / exact - 1).max() < 5e-4
+    np.testing.assert_allclose(result["mean"].to_numpy()[1:], paths.mean(axis=0), rtol=1e-5)
+    assert result["final"]["min"] == pytest.approx(paths[:, -1].min(), rel=1e-6)
+    assert result["final"]["max"] == pytest.approx(paths[:, -1].max(), rel=1e-6)
+    assert result["final"]["prob_loss"] == pytest.approx((paths[:, -1] < 100.0).mean() * 100)
+
+
+def test_result_does_not_depend_on_worker_count():
+    one = simulate_paths(50.0, 0.0002, 0.02, 60, 25_000, seed=7, max_workers=1)
+    many = simulate_paths(50.0, 0.0002, 0.02, 60, 25_000, seed=7, max_workers=4)
+    np.testing.assert_array_equal(one["bands"].to_numpy(), many["bands"].to_numpy())
+    np.testing.assert_array_equal(one["samples"], many["samples"])
+
+
+def test_zero_volatility_gives_deterministic_path():
+    result = simulate_paths(100.0, 0.001, 0.0, 30, 1_000, sample_paths=5)
+    expected = 100.0 * np.exp(0.001 * np.arange(31))
+
+    for column in result["bands"]:
+        np.testing.assert_allclose(result["bands"][column].to_numpy(), expected)
+    np.testing.assert_allclose(result["mean"].to_numpy(), expected)
+    assert result["samples"].shape == (5, 31)
+    assert result["final"]["std"] == 0.0
+    assert result["final"]["prob_loss"] == 0.0
+    assert result["final"]["p5"] == pytest.approx(expected[-1])
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from src.price_store import PriceStore
+from tests.conftest import make_ohlcv
+
+
+class RecordingProvider:
+    """Dostawca zwracający wycinek stałej historii i zapisujący parametry zapytań."""
+    name = "test"
+
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def get_history(self, tickers, start=None, end=None, period=None, interval="1d"):
+        self.calls.append((tuple(tickers), start))
+        df = self.history if start is None else self.history.loc[self.history.index >= start]
+        return {t: df.copy() for t in tickers}
+
+
+def test_incremental_fetch_matches_full_download(tmp_path):
+    full = make_ohlcv(200)
+    provider = RecordingProvider(full.iloc[:150])
+    store = PriceStore(root=str(tmp_path), max_age_minutes=0, provider=provider)
+    start = full.index[0]
+    store.get_history_batch(["AAA"], start=start)
+
+    # Nowe świece u dostawcy - drugie pobranie tylko od ostatniej zapisanej świecy
+    provider.history = full
+    result = store.get_history_batch(["AAA"], start=start)["AAA"]
+
+    assert provider.calls[-1] == (("AAA",), full.index[149])
+    pd.testing.assert_frame_equal(result, full, check_freq=False)
+
+
+def test_fresh_store_does_not_call_provider(tmp_path):
+    provider = RecordingProvider(make_ohlcv(50))
+    store = PriceStore(root=str(tmp_path), max_age_minutes=60, provider=provider)
+    store.get_history_batch(["AAA"], period="max")
+    store.get_history_batch(["AAA"], period="max")
+    assert len(provider.calls) == 1
+
+
+def test_invalidate_forces_fetch_of_fresh_store(tmp_path):
+    full = make_ohlcv(60)
+    provider = RecordingProvider(full.iloc[:50])
+    store = PriceStore(root=str(tmp_path), max_age_minutes=60, provider=provider)
+    store.get_history_batch(["AAA"], period="max")
+
+    provider.history = full
+    store.invalidate()
+    result = store.get_history_batch(["AAA"], period="max")["AAA"]
+    store.get_history_batch(["AAA"], period="max")
+
+    # Jedno dociągnięcie od ostatniej zapisanej świecy, potem dane znów są świeże
+    assert provider.calls == [(("AAA",), None), (("AAA",), full.index[49])]
+    pd.testing.assert_frame_equal(result, full, check_freq=False)
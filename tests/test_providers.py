@@ -0,0 +1,34 @@
+import yfinance as yf
+
+from src import instruments
+from src.instruments import InstrumentIndex
+from src.providers import YFinanceProvider
+from tests.conftest import make_ohlcv
+
+
+class FakeMetadataCache:
+    def __init__(self, infos):
+        self.infos = infos
+        self.calls = []
+
+    def get_many(self, tickers):
+        self.calls.append(list(tickers))
+        return {t: self.infos.get(t, {}) for t in tickers}
+
+
+def test_quote_currencies_come_from_instrument_index(monkeypatch):
+    frames = {t: make_ohlcv(5, seed=i) for i, t in enumerate(["AAPL", "VOD.L", "PKO.WA"])}
+    cache = FakeMetadataCache({"AAPL": {"currency": "USD"}, "VOD.L": {"currency": "GBX"},
+                               "PKO.WA": {"currency": "PLN"}})
+    monkeypatch.setattr(instruments, "_instrument_index", InstrumentIndex(metadata_cache=cache))
+    monkeypatch.setattr(YFinanceProvider, "get_history", lambda self, tickers, **kwargs: frames)
+
+    def no_per_ticker_requests(ticker):
+        raise AssertionError(f"zapytanie o pojedynczy ticker: {ticker}")
+    monkeypatch.setattr(yf, "Ticker", no_per_ticker_requests)
+
+    quotes = YFinanceProvider().get_quotes(list(frames), with_currency=True)
+
+    assert {t: q["currency"] for t, q in quotes.items()} == {"AAPL": "USD", "VOD.L": "GBp", "PKO.WA": "PLN"}
+    assert quotes["AAPL"]["last_price"] == frames["AAPL"]["Close"].iloc[-1]
+    assert cache.calls == [["AAPL", "VOD.L", "PKO.WA"]]
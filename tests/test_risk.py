@@ -0,0 +1,71 @@
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+import pandas as pd
+
+from src.risk import INTERVAL_RISK_WINDOWS, rolling_risk
+from tests.conftest import make_ohlcv
+
+WINDOW = 21
+LEVEL = 0.95
+
+
+def reference_risk(returns, window=WINDOW, level=LEVEL):
+    """Te same metryki liczone wprost: rolling() z pandas i pętle po oknach."""
+    alpha = 1 - level
+    lo = int(np.floor(alpha * (window - 1)))
+    mean, std = returns.rolling(window).mean(), returns.rolling(window).std()
+
+    def drawdown(w):
+        levels = np.concatenate([[1.0], np.cumprod(1 + w)])
+        return (levels / np.maximum.accumulate(levels) - 1).min()
+
+    z = NormalDist().inv_cdf(alpha)
+    tail = NormalDist().pdf(z) / alpha
+    return pd.DataFrame({
+        "sharpe": mean / std * np.sqrt(252),
+        "max_drawdown": returns.rolling(window).apply(drawdown, raw=True),
+        "var_hist": -returns.rolling(window).quantile(alpha, interpolation="linear"),
+        "cvar_hist": -returns.rolling(window).apply(lambda w: np.sort(w)[:lo + 1].mean(), raw=True),
+        "var_param": -(mean + z * std),
+        "cvar_param": -(mean - tail * std),
+    })
+
+
+def returns_with_gap(seed):
+    returns = make_ohlcv(150, seed=seed)["Close"].pct_change()
+    returns.iloc[60] = np.nan
+    return returns
+
+
+def test_single_series_matches_pandas_rolling():
+    returns = returns_with_gap(0)
+    result = rolling_risk(returns, windows=(WINDOW,), level=LEVEL)[WINDOW]
+    expected = reference_risk(returns)
+    for name in expected.columns:
+        np.testing.assert_allclose(result[name].to_numpy(), expected[name].to_numpy(),
+                                   rtol=1e-7, atol=1e-10, equal_nan=True, err_msg=name)
+
+
+def test_panel_matches_single_series():
+    panel = pd.DataFrame({"AAA": returns_with_gap(1), "BBB": returns_with_gap(2)})
+    result = rolling_risk(panel, windows=(WINDOW,), level=LEVEL)[WINDOW]
+    for ticker in panel.columns:
+        single = rolling_risk(panel[ticker], windows=(WINDOW,), level=LEVEL)[WINDOW]
+        for name in single.columns:
+            np.testing.assert_allclose(result[(name, ticker)].to_numpy(), single[name].to_numpy(),
+                                       rtol=1e-12, equal_nan=True, err_msg=f"{name} {ticker}")
+
+
+@pytest.mark.parametrize("interval", ["1wk", "1mo"])
+def test_interval_windows_annualize_per_bar(interval):
+    periods, windows = INTERVAL_RISK_WINDOWS[interval]
+    returns = make_ohlcv(300, seed=3, freq="W-FRI" if interval == "1wk" else "MS")["Close"].pct_change()
+    result = rolling_risk(returns, windows=windows, periods_per_year=periods)
+
+    # Najdłuższe okno to rok świec danego interwału, Sharpe annualizowany liczbą świec w roku
+    assert windows[-1] == periods
+    mean, std = returns.rolling(windows[0]).mean(), returns.rolling(windows[0]).std()
+    np.testing.assert_allclose(result[windows[0]]["sharpe"].to_numpy(), (mean / std * np.sqrt(periods)).to_numpy(),
+                               rtol=1e-7, equal_nan=True)
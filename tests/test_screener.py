@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from src.analyzer import PanelAnalyzer, StockAnalyzer, score_history
+from src.screener import Screener
+from tests.conftest import make_ohlcv
+
+
+class FakeStore:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_history_batch(self, tickers, period="1y", interval="1d", start=None):
+        return {t: self.frames[t] for t in tickers if t in self.frames}
+
+
+def own_score(df):
+    analyzer = StockAnalyzer(df.copy())
+    analyzer.calculate_ema()
+    analyzer.calculate_macd()
+    analyzer.calculate_rsi()
+    return int(score_history(analyzer.df)["Score"].iloc[-1])
+
+
+def test_missing_last_bar_scores_on_own_last_session():
+    frames = {"AAA": make_ohlcv(200, seed=0), "BBB": make_ohlcv(200, seed=1).iloc[:-1]}
+    universe = pd.DataFrame({"ticker": ["AAA", "BBB"], "name": ["A", "B"]})
+    ranking = Screener(store=FakeStore(frames), metadata=object()).run(universe, fundamentals=False)
+
+    for t, df in frames.items():
+        assert ranking.loc[t, "Wynik tech."] == own_score(df)
+        assert np.isfinite(ranking.loc[t, "RSI"])
+    assert ranking.loc["BBB", "Cena"] == frames["BBB"]["Close"].iloc[-1]
+
+
+def test_panel_last_valid_skips_trailing_gaps():
+    close = pd.DataFrame({"AAA": [1.0, 2.0, 3.0], "BBB": [1.0, 5.0, np.nan], "CCC": [np.nan] * 3})
+    panel = PanelAnalyzer(close)
+    np.testing.assert_array_equal(panel.last_valid(close.to_numpy()), [3.0, 5.0, np.nan])
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import SignalBacktester, macd_crossover_signal
+from src.analyzer import StockAnalyzer
+from src.streaming import Bar, IndicatorStrategy, StreamingBacktester, StreamingMetrics, frame_bars
+from tests.conftest import make_ohlcv
+
+
+def run_stream(backtester, bars):
+    events = list(backtester.run(bars))
+    return events, backtester.summary()
+
+
+def test_single_symbol_matches_signal_backtester():
+    df = make_ohlcv(400, seed=11)
+    analyzer = StockAnalyzer(df.copy())
+    analyzer.calculate_ema()
+    analyzer.calculate_macd()
+    expected = SignalBacktester(df).run_signals(macd_crossover_signal(analyzer.df))
+
+    events, summary = run_stream(StreamingBacktester(IndicatorStrategy("macd")), frame_bars(df, "AAA"))
+    equity = pd.Series({e["time"]: e["equity"] for e in events if e["type"] == "equity"})
+
+    np.testing.assert_allclose(equity.to_numpy(), expected["equity"].to_numpy(), rtol=1e-9)
+    assert summary["trades"] == expected["metrics"]["trades"]
+    assert summary["fees"] == pytest.approx(expected["metrics"]["fees"])
+
+
+class ScheduleStrategy:
+    """Strategia testowa - z góry zadana ekspozycja dla kolejnych świec."""
+    def __init__(self, targets):
+        self.targets = iter(targets)
+
+    def on_bar(self, bar):
+        return next(self.targets)
+
+
+def test_exposure_change_rebalances_position():
+    closes = [10.0, 10.0, 20.0, 20.0, 30.0]
+    bars = [Bar(t, "AAA", c) for t, c in zip(pd.bdate_range("2024-01-01", periods=len(closes)), closes)]
+    bt = StreamingBacktester(ScheduleStrategy([1.0, 1.0, 0.5, None, None]), commission=0.0, slippage=0.0)
+    events, summary = run_stream(bt, bars)
+
+    fills = [e for e in events if e["type"] == "fill"]
+    assert [f["side"] for f in fills] == ["BUY", "SELL"]
+    # 1000 akcji po 10, przy 20 sprzedaż połowy: 10000 gotówki + 500 akcji po 30
+    assert fills[1]["shares"] == pytest.approx(500)
+    assert summary["final_value"] == pytest.approx(10000 + 500 * 30)
+    assert summary["trades"] == 1
+
+
+def test_minimum_commission_leaves_room_for_entry_fee():
+    closes = np.linspace(100.0, 120.0, 30)
+    bars = [Bar(t, "AAA", c) for t, c in zip(pd.bdate_range("2024-01-01", periods=len(closes)), closes)]
+    bt = StreamingBacktester(ScheduleStrategy([1.0] + [None] * 29), commission=0.001, commission_min=50.0,
+                             slippage=0.0)
+    events, summary = run_stream(bt, bars)
+
+    fills = [e for e in events if e["type"] == "fill"]
+    assert len(fills) == 1 and fills[0]["fee"] == 50.0
+    # Zakup po drugiej świecy, za kapitał pomniejszony o minimalną opłatę
+    assert fills[0]["shares"] == pytest.approx((10000.0 - 50.0) / closes[1])
+    assert summary["trades"] == 1
+    assert summary["final_value"] == pytest.approx(fills[0]["shares"] * closes[-1])
+
+    parity = SignalBacktester(pd.DataFrame({"Close": closes}, index=pd.bdate_range("2024-01-01", periods=30)),
+                              commission=0.001, commission_min=50.0, slippage=0.0).run_signals(np.ones(30))
+    assert summary["final_value"] == pytest.approx(parity["metrics"]["final_value"])
+
+
+@pytest.mark.parametrize("freq, expected", [("B", 261), ("W-FRI", 52), ("MS", 12)])
+def test_annualization_follows_bar_interval(freq, expected):
+    metrics = StreamingMetrics()
+    for i, time in enumerate(pd.date_range("2020-01-01", periods=200, freq=freq)):
+        metrics.update(time, 100.0 * (1.001 ** i) * (1 + 0.01 * (-1) ** i))
+    assert metrics.summary()["periods_per_year"] == pytest.approx(expected, rel=0.02)
+
+    fixed = StreamingMetrics(periods_per_year=252)
+    fixed.update(pd.Timestamp("2020-01-01"), 100.0)
+    fixed.update(pd.Timestamp("2020-01-02"), 101.0)
+    assert fixed.summary()["periods_per_year"] == 252
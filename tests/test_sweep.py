@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import SignalBacktester
+from src.sweep import ParameterSweep, SWEEP_STRATEGIES, WalkForward, attach_array, release_arrays, share_array
+from tests.conftest import make_ohlcv
+
+GRID = {"fast": [5, 10], "slow": [20, 40]}
+
+
+def test_sweep_in_worker_processes_matches_direct_backtests():
+    data = make_ohlcv(300, seed=7)[["Close"]]
+    results = ParameterSweep(data, strategy="EMA", grid=GRID, max_workers=2, batch_size=1).run()
+    assert len(results) == 4
+
+    signal_fn = SWEEP_STRATEGIES["EMA"][0]
+    close = data["Close"].to_numpy()
+    for row in results.itertuples():
+        m = SignalBacktester(data).run_signals(signal_fn(close, fast=row.fast, slow=row.slow))["metrics"]
+        assert row.total_return == m["total_return"]
+        assert row.trades == m["trades"]
+
+
+def test_shared_array_round_trip():
+    array = np.arange(12, dtype=np.float64).reshape(3, 4)
+    shm, spec = share_array(array)
+    try:
+        np.testing.assert_array_equal(attach_array(spec), array)
+    finally:
+        release_arrays(shm)
+
+
+def trending_prices(n):
+    close = 100 * 1.001 ** np.arange(n)
+    return pd.DataFrame({"Close": close}, index=pd.bdate_range("2015-01-01", periods=n))
+
+
+def test_walk_forward_carries_position_across_windows():
+    data = trending_prices(400)
+    wf = WalkForward(data, strategy="EMA", grid=GRID, train_size=100, test_size=50, max_workers=1)
+    result = wf.run()
+
+    # Stały trend - strategia cały czas w rynku: jedno wejście, bez opłat na granicach okien
+    assert len(wf) == 6
+    assert len(result["trades"]) == 1
+    assert result["trades"]["open"].iloc[0]
+    assert result["metrics"]["fees"] == result["trades"]["fees"].iloc[0]
+    assert result["windows"]["test_trades"].tolist() == [1, 0, 0, 0, 0, 0]
+
+    closes = data["Close"].iloc[99:]
+    expected = closes.iloc[-1] / closes.iloc[1]
+    assert result["equity"].iloc[-1] / result["equity"].iloc[1] == pytest.approx(expected)
+
+    # Benchmark zapisany razem z wynikiem (strona nie sięga po bieżące dane z panelu bocznego)
+    benchmark = result["benchmark_equity"]
+    assert benchmark.index.equals(result["equity"].index)
+    assert benchmark.iloc[0] == result["equity"].iloc[0]
+    assert benchmark.iloc[-1] / benchmark.iloc[0] == pytest.approx(closes.iloc[-1] / closes.iloc[0])